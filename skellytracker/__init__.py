@@ -33,6 +33,7 @@ try:
     )
     from skellytracker.trackers.mediapipe_tracker.mediapipe_model_info import (
         MediapipeModelInfo,
+        get_mediapipe_model_info,
     )
 except ModuleNotFoundError:
     print("To use mediapipe_holistic_tracker, install skellytracker[mediapipe]")
@@ -0,0 +1,276 @@
+from collections import deque
+from dataclasses import dataclass
+import logging
+import threading
+import time
+from typing import Callable, Deque, Dict, List, Optional
+
+import numpy as np
+
+from skellytracker.trackers.base_tracker.base_tracker import BaseTracker
+from skellytracker.trackers.base_tracker.frame_sink import FrameSink
+from skellytracker.trackers.demo_viewers.latest_frame_capture import (
+    CaptureSource,
+    LatestFrameCapture,
+    open_capture_source,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CameraResult:
+    """
+    Tracking result of a single camera frame.
+    """
+
+    camera_index: int
+    frame_index: int  # index of the frame in the capture source, including dropped frames
+    capture_time: float
+    result_time: float
+    landmarks: np.ndarray
+
+    @property
+    def latency_ms(self) -> float:
+        return (self.result_time - self.capture_time) * 1000
+
+
+@dataclass
+class SynchronizedFrame:
+    """
+    One result per camera, captured within the runner's `max_time_offset_ms` of each other.
+    """
+
+    capture_time: float
+    frame_indices: List[int]
+    landmarks: np.ndarray  # (cameras, points, dimensions)
+
+
+class CameraWorker:
+    """
+    Track the newest frames of one capture source on its own thread.
+    """
+
+    def __init__(
+        self,
+        camera_index: int,
+        tracker: BaseTracker,
+        cap,
+        history_length: int = 30,
+        frame_sinks: Optional[List[FrameSink]] = None,
+    ):
+        self.camera_index = camera_index
+        self.tracker = tracker
+        self.cap = cap
+        self.frame_sinks = frame_sinks or []
+        self.frame_capture = LatestFrameCapture(cap)
+        self.results: Deque[CameraResult] = deque(maxlen=history_length)
+        self.lock = threading.Lock()
+        self.running = False
+        self.thread: Optional[threading.Thread] = None
+        self.error: Optional[BaseException] = None
+
+    @property
+    def dropped_frames(self) -> int:
+        return self.frame_capture.dropped_frames
+
+    def start(self) -> None:
+        self.running = True
+        self.frame_capture.start()
+        self.thread = threading.Thread(
+            target=self.tracking_loop, name=f"camera_{self.camera_index}", daemon=True
+        )
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.running = False
+        self.frame_capture.stop()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        self.cap.release()
+        for frame_sink in self.frame_sinks:
+            frame_sink.close()
+
+    def tracking_loop(self) -> None:
+        try:
+            while self.running:
+                ret, frame, capture_time = self.frame_capture.read(timeout=0.1)
+                if not ret:
+                    if not self.frame_capture.running:
+                        logger.info(f"Camera {self.camera_index} has no more frames")
+                        break
+                    continue
+
+                tracked_objects = self.tracker.process_image(frame)
+                landmarks = self.tracker.recorder.tracked_objects_to_frame_array(
+                    tracked_objects, image_size=(frame.shape[1], frame.shape[0])
+                )
+                result = CameraResult(
+                    camera_index=self.camera_index,
+                    frame_index=self.frame_capture.last_read_frame_number,
+                    capture_time=capture_time,
+                    result_time=time.perf_counter(),
+                    landmarks=landmarks,
+                )
+                for frame_sink in self.frame_sinks:
+                    frame_sink.write_frame(
+                        result.frame_index, result.capture_time, result.landmarks
+                    )
+                with self.lock:
+                    self.results.append(result)
+        except Exception as e:
+            logger.exception(f"Tracking camera {self.camera_index} failed")
+            self.error = e
+        finally:
+            self.running = False
+
+    def get_results(self) -> List[CameraResult]:
+        with self.lock:
+            return list(self.results)
+
+
+class MultiCameraLiveRunner:
+    """
+    Track several live capture sources at once, with one tracker per camera each running on its own thread.
+
+    Each camera always tracks its newest frame, dropping frames it can not keep up with. Results are aligned
+    across cameras by capture time, see `get_synchronized_frame`.
+
+    Example:
+        with MultiCameraLiveRunner(lambda: BrightestPointTracker(), [0, 1]) as runner:
+            while runner.is_running:
+                synchronized_frame = runner.get_synchronized_frame()
+    """
+
+    def __init__(
+        self,
+        tracker_factory: Callable[[], BaseTracker],
+        capture_sources: List[CaptureSource],
+        max_time_offset_ms: float = 20.0,
+        max_latency_ms: float = 200.0,
+        loop_videos: bool = False,
+        frame_sinks: Optional[List[List[FrameSink]]] = None,
+    ):
+        """
+        :param tracker_factory: Creates the tracker of each camera, trackers are not shared between threads.
+        :param capture_sources: Camera indices, or video paths that are played at their native frame rate.
+        :param max_time_offset_ms: Maximum capture time difference between the results of a synchronized frame.
+        :param max_latency_ms: Maximum age of a synchronized frame, older frames are not returned.
+        :param loop_videos: Start video sources over when they end.
+        :param frame_sinks: One list of sinks per camera, written to from that camera's thread as soon as a frame is tracked.
+            Use a separate sink per camera, e.g. `UDPFrameSink(camera_id=camera_index)`.
+        """
+        self.max_time_offset_ms = max_time_offset_ms
+        self.max_latency_ms = max_latency_ms
+        self.workers: List[CameraWorker] = []
+        for camera_index, source in enumerate(capture_sources):
+            cap = open_capture_source(source, loop_videos=loop_videos)
+            if not cap.isOpened():
+                for worker in self.workers:
+                    worker.cap.release()
+                raise ValueError(f"Could not open capture source: {source}")
+            self.workers.append(
+                CameraWorker(
+                    camera_index=camera_index,
+                    tracker=tracker_factory(),
+                    cap=cap,
+                    frame_sinks=frame_sinks[camera_index] if frame_sinks else None,
+                )
+            )
+
+    @property
+    def number_of_cameras(self) -> int:
+        return len(self.workers)
+
+    @property
+    def is_running(self) -> bool:
+        return all(worker.running for worker in self.workers)
+
+    @property
+    def dropped_frames(self) -> List[int]:
+        return [worker.dropped_frames for worker in self.workers]
+
+    def start(self) -> "MultiCameraLiveRunner":
+        logger.info(f"Starting live tracking of {self.number_of_cameras} cameras")
+        for worker in self.workers:
+            worker.start()
+        return self
+
+    def stop(self) -> None:
+        for worker in self.workers:
+            worker.stop()
+        logger.info(f"Stopped live tracking, dropped frames per camera: {self.dropped_frames}")
+
+    def get_latest(self) -> Dict[int, CameraResult]:
+        """
+        Get the newest result of each camera that has produced one, without any alignment.
+        """
+        latest = {}
+        for worker in self.workers:
+            results = worker.get_results()
+            if results:
+                latest[worker.camera_index] = results[-1]
+        return latest
+
+    def get_synchronized_frame(self) -> Optional[SynchronizedFrame]:
+        """
+        Get the newest set of results, one per camera, that were captured within `max_time_offset_ms` of each other.
+
+        The reference time is the capture time of the camera that is furthest behind,
+        every other camera contributes its result captured closest to it.
+
+        :return: The synchronized frame, or None if the cameras have no aligned results within `max_latency_ms`.
+        """
+        camera_results = [worker.get_results() for worker in self.workers]
+        if not all(camera_results):
+            return None
+
+        reference_time = min(results[-1].capture_time for results in camera_results)
+        if (time.perf_counter() - reference_time) * 1000 > self.max_latency_ms:
+            return None
+
+        aligned_results = []
+        for results in camera_results:
+            closest_result = min(
+                results, key=lambda result: abs(result.capture_time - reference_time)
+            )
+            if (
+                abs(closest_result.capture_time - reference_time) * 1000
+                > self.max_time_offset_ms
+            ):
+                return None
+            aligned_results.append(closest_result)
+
+        return SynchronizedFrame(
+            capture_time=reference_time,
+            frame_indices=[result.frame_index for result in aligned_results],
+            landmarks=np.stack([result.landmarks for result in aligned_results]),
+        )
+
+    def __enter__(self) -> "MultiCameraLiveRunner":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
+
+
+if __name__ == "__main__":
+    from skellytracker.trackers.bright_point_tracker.brightest_point_tracker import (
+        BrightestPointTracker,
+    )
+
+    logging.basicConfig(level=logging.INFO)
+
+    with MultiCameraLiveRunner(
+        tracker_factory=lambda: BrightestPointTracker(num_points=1),
+        capture_sources=[0, 1],
+    ) as runner:
+        try:
+            while runner.is_running:
+                synchronized_frame = runner.get_synchronized_frame()
+                if synchronized_frame is not None:
+                    print(synchronized_frame.frame_indices, synchronized_frame.landmarks[:, 0])
+                time.sleep(1 / 30)
+        except KeyboardInterrupt:
+            pass
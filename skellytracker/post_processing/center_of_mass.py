@@ -0,0 +1,127 @@
+"""
+Virtual markers and center of mass from the definitions of a `ModelInfo`, for whole tracking arrays at once.
+"""
+
+from dataclasses import dataclass
+import logging
+from typing import Type, Union
+
+import numpy as np
+
+from skellytracker.post_processing.marker_model import MarkerModel
+from skellytracker.trackers.base_tracker.model_info import ModelInfo
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CenterOfMassResult:
+    virtual_markers: np.ndarray  # (..., virtual markers, dims)
+    segment_center_of_mass: np.ndarray  # (..., segments, dims)
+    total_body_center_of_mass: np.ndarray  # (..., dims)
+
+
+class CenterOfMassCalculator(MarkerModel):
+    """
+    Compile the segment and center of mass definitions of a `ModelInfo` into weight matrices.
+
+    Every virtual marker, segment center of mass and the total body center of mass is a weighted sum of tracked
+    points, so each is computed for all frames and cameras with a single matrix product over the points axis.
+    Works for any array with points and dimensions as its last two axes, e.g. 2D (cams, frames, points, 2)
+    output of `process_list_of_videos` or 3D (frames, points, 3) data.
+
+    An output is NaN in a frame if any point it depends on is missing in that frame. The total body center of mass
+    is NaN throughout for model infos without segments, e.g. mediapipe hands and face only.
+    """
+
+    def __init__(self, model_info: Union[ModelInfo, Type[ModelInfo]]):
+        """
+        :param model_info: Model info, or model info class, with `landmark_names`, `virtual_markers_definitions`,
+            `segment_connections` and `center_of_mass_definitions`.
+        """
+        super().__init__(model_info)
+
+        segment_connections = model_info.segment_connections or {}
+        center_of_mass_definitions = model_info.center_of_mass_definitions or {}
+        self.segment_names = list(center_of_mass_definitions.keys())
+        segment_rows = []
+        segment_mass_fractions = []
+        for segment_name, definition in center_of_mass_definitions.items():
+            if segment_name not in segment_connections:
+                raise ValueError(
+                    f"Center of mass of segment {segment_name} is defined, but the segment has no connection"
+                )
+            connection = segment_connections[segment_name]
+            proximal = self.get_marker_weights(connection["proximal"])
+            distal = self.get_marker_weights(connection["distal"])
+            # the segment center of mass sits `segment_com_length` of the way from the proximal to the distal end
+            com_length = definition["segment_com_length"]
+            segment_rows.append(proximal + com_length * (distal - proximal))
+            segment_mass_fractions.append(definition["segment_com_percentage"])
+
+        self.segment_com_weights = self.stack_rows(segment_rows)
+        self.segment_mass_fractions = np.array(segment_mass_fractions)
+        if self.segment_names:
+            total_mass_fraction = self.segment_mass_fractions.sum()
+            if not np.isclose(total_mass_fraction, 1.0, atol=1e-3):
+                logger.warning(
+                    f"Segment mass fractions of {self.model_name} sum to {total_mass_fraction:.4f}, normalizing to 1"
+                )
+            self.total_body_com_weights = (
+                self.segment_mass_fractions @ self.segment_com_weights
+            ) / total_mass_fraction
+        else:
+            # unused, the total body center of mass is NaN without segments
+            self.total_body_com_weights = np.zeros(self.number_of_points)
+
+    def compute_virtual_markers(self, data: np.ndarray) -> np.ndarray:
+        """
+        :return: (..., virtual markers, dims) array in the order of `virtual_marker_names`.
+        """
+        return self.apply_weights(self.virtual_marker_weights, data)
+
+    def compute_segment_center_of_mass(self, data: np.ndarray) -> np.ndarray:
+        """
+        :return: (..., segments, dims) array in the order of `segment_names`.
+        """
+        return self.apply_weights(self.segment_com_weights, data)
+
+    def compute_total_body_center_of_mass(self, data: np.ndarray) -> np.ndarray:
+        """
+        :return: (..., dims) array of the mass weighted average of the segment centers of mass.
+        """
+        total_body_center_of_mass = self.apply_weights(
+            self.total_body_com_weights[np.newaxis], data
+        )[..., 0, :]
+        if not self.segment_names:
+            total_body_center_of_mass[...] = np.nan
+        return total_body_center_of_mass
+
+    def compute(self, data: np.ndarray) -> CenterOfMassResult:
+        """
+        Compute virtual markers, segment and total body center of mass in one pass over the data.
+        """
+        number_of_virtual_markers = len(self.virtual_marker_names)
+        number_of_segments = len(self.segment_names)
+        result = self.apply_weights(
+            np.vstack(
+                [
+                    self.virtual_marker_weights,
+                    self.segment_com_weights,
+                    self.total_body_com_weights,
+                ]
+            ),
+            data,
+        )
+        if not self.segment_names:
+            result[..., -1, :] = np.nan
+        return CenterOfMassResult(
+            virtual_markers=result[..., :number_of_virtual_markers, :],
+            segment_center_of_mass=result[
+                ...,
+                number_of_virtual_markers : number_of_virtual_markers
+                + number_of_segments,
+                :,
+            ],
+            total_body_center_of_mass=result[..., -1, :],
+        )
@@ -0,0 +1,191 @@
+"""
+Segment lengths and joint angles from the `segment_connections` and `joint_hierarchy` of a `ModelInfo`,
+for whole tracking arrays at once.
+"""
+
+from dataclasses import dataclass
+import logging
+from typing import Dict, List, Type, Union
+import warnings
+
+import numpy as np
+
+from skellytracker.post_processing.marker_model import MarkerModel
+from skellytracker.trackers.base_tracker.model_info import ModelInfo
+
+logger = logging.getLogger(__name__)
+
+# scales the median absolute deviation to the standard deviation of normally distributed data
+MAD_TO_STANDARD_DEVIATION = 1.4826
+DEFAULT_OUTLIER_THRESHOLD = 3.5
+
+
+@dataclass
+class SegmentLengthStatistics:
+    """
+    Per segment statistics over the frames of a session, each (..., segments).
+    """
+
+    median: np.ndarray
+    median_absolute_deviation: np.ndarray
+    mean: np.ndarray
+    standard_deviation: np.ndarray
+    valid_fraction: np.ndarray
+
+
+class SkeletonKinematics(MarkerModel):
+    """
+    Compile the segments and joints of a `ModelInfo` into proximal, distal and joint weight matrices.
+
+    Segment ends can be tracked points or virtual markers. Segment vectors and the two vectors of every joint angle
+    are computed for all frames and cameras with a matrix product over the points axis, then lengths and angles with
+    elementwise numpy operations. Works for 2D and 3D data with points and dimensions as the last two axes.
+    Missing points give NaN lengths and angles in the frames they are missing from.
+    """
+
+    def __init__(self, model_info: Union[ModelInfo, Type[ModelInfo]]):
+        """
+        :param model_info: Model info, or model info class, with `landmark_names`, `virtual_markers_definitions`,
+            `segment_connections` and `joint_hierarchy`.
+        """
+        super().__init__(model_info)
+
+        segment_connections = model_info.segment_connections or {}
+        self.segment_names = list(segment_connections.keys())
+        self.segment_vector_weights = self.stack_rows(
+            [
+                self.get_marker_weights(connection["distal"])
+                - self.get_marker_weights(connection["proximal"])
+                for connection in segment_connections.values()
+            ]
+        )
+
+        # a joint angle is measured at a marker between its parent and one of its children in the hierarchy
+        joint_hierarchy = model_info.joint_hierarchy or {}
+        parents: Dict[str, str] = {
+            child: parent
+            for parent, children in joint_hierarchy.items()
+            for child in children
+        }
+        self.joint_names: List[str] = []
+        proximal_rows = []
+        distal_rows = []
+        for joint, children in joint_hierarchy.items():
+            if joint not in parents:
+                continue
+            joint_weights = self.get_marker_weights(joint)
+            proximal_weights = self.get_marker_weights(parents[joint]) - joint_weights
+            for child in children:
+                self.joint_names.append(
+                    joint if len(children) == 1 else f"{joint}_to_{child}"
+                )
+                proximal_rows.append(proximal_weights)
+                distal_rows.append(self.get_marker_weights(child) - joint_weights)
+        self.joint_proximal_weights = self.stack_rows(proximal_rows)
+        self.joint_distal_weights = self.stack_rows(distal_rows)
+
+    def compute_segment_vectors(self, data: np.ndarray) -> np.ndarray:
+        """
+        :return: (..., segments, dims) proximal to distal vectors, in the order of `segment_names`.
+        """
+        return self.apply_weights(self.segment_vector_weights, data)
+
+    def compute_segment_lengths(self, data: np.ndarray) -> np.ndarray:
+        """
+        :return: (..., segments) lengths in the units of the data, in the order of `segment_names`.
+        """
+        return np.linalg.norm(self.compute_segment_vectors(data), axis=-1)
+
+    def compute_joint_angles(self, data: np.ndarray) -> np.ndarray:
+        """
+        Angle at each joint between the vector to its parent and the vector to its child, 180 degrees when straight.
+
+        :return: (..., joints) angles in degrees, in the order of `joint_names`.
+        """
+        proximal = self.apply_weights(self.joint_proximal_weights, data)
+        distal = self.apply_weights(self.joint_distal_weights, data)
+        dot = np.sum(proximal * distal, axis=-1)
+        if proximal.shape[-1] == 2:
+            cross_norm = np.abs(
+                proximal[..., 0] * distal[..., 1] - proximal[..., 1] * distal[..., 0]
+            )
+        else:
+            cross_norm = np.linalg.norm(np.cross(proximal, distal), axis=-1)
+        # arctan2 stays accurate near 0 and 180 degrees, unlike arccos of the normalized dot product
+        return np.degrees(np.arctan2(cross_norm, dot))
+
+    @staticmethod
+    def compute_segment_length_statistics(
+        segment_lengths: np.ndarray, frame_axis: int = -2
+    ) -> SegmentLengthStatistics:
+        """
+        Summarize segment lengths over the frames of a session, ignoring missing frames.
+
+        :param segment_lengths: (..., frames, segments) output of `compute_segment_lengths`.
+        :param frame_axis: Axis of `segment_lengths` that indexes frames.
+        """
+        with warnings.catch_warnings():
+            # segments that are missing in every frame get NaN statistics
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            median = np.nanmedian(segment_lengths, axis=frame_axis)
+            median_absolute_deviation = np.nanmedian(
+                np.abs(segment_lengths - np.expand_dims(median, frame_axis)),
+                axis=frame_axis,
+            )
+            return SegmentLengthStatistics(
+                median=median,
+                median_absolute_deviation=median_absolute_deviation,
+                mean=np.nanmean(segment_lengths, axis=frame_axis),
+                standard_deviation=np.nanstd(segment_lengths, axis=frame_axis),
+                valid_fraction=np.mean(~np.isnan(segment_lengths), axis=frame_axis),
+            )
+
+    @classmethod
+    def find_segment_length_outliers(
+        cls,
+        segment_lengths: np.ndarray,
+        threshold: float = DEFAULT_OUTLIER_THRESHOLD,
+        frame_axis: int = -2,
+    ) -> np.ndarray:
+        """
+        Flag segment lengths that are far from the session median, using the robust z-score
+        `|length - median| / (1.4826 * MAD)`.
+
+        :param segment_lengths: (..., frames, segments) output of `compute_segment_lengths`.
+        :param threshold: Robust z-score above which a length is an outlier.
+        :param frame_axis: Axis of `segment_lengths` that indexes frames.
+        :return: Boolean array shaped like `segment_lengths`, missing lengths are not outliers.
+        """
+        statistics = cls.compute_segment_length_statistics(segment_lengths, frame_axis)
+        median = np.expand_dims(statistics.median, frame_axis)
+        scale = MAD_TO_STANDARD_DEVIATION * np.expand_dims(
+            statistics.median_absolute_deviation, frame_axis
+        )
+        deviation = np.abs(segment_lengths - median)
+        with np.errstate(invalid="ignore"):
+            # with a MAD of 0, any deviation from the median is an outlier
+            return np.where(
+                scale > 0, deviation > threshold * scale, deviation > 0
+            ) & ~np.isnan(segment_lengths)
+
+    def find_bad_frames(
+        self,
+        data: np.ndarray,
+        threshold: float = DEFAULT_OUTLIER_THRESHOLD,
+        frame_axis: int = -3,
+    ) -> np.ndarray:
+        """
+        Flag frames in which any segment length is an outlier.
+
+        :param data: (..., frames, points, dims) tracking data.
+        :param threshold: Robust z-score above which a segment length is an outlier.
+        :param frame_axis: Axis of `data` that indexes frames.
+        :return: Boolean (..., frames) array.
+        """
+        if frame_axis < 0:
+            frame_axis += data.ndim
+        segment_lengths = self.compute_segment_lengths(data)
+        outliers = self.find_segment_length_outliers(
+            segment_lengths, threshold=threshold, frame_axis=frame_axis
+        )
+        return outliers.any(axis=-1)
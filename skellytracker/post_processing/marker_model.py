@@ -0,0 +1,90 @@
+import logging
+from typing import Dict, List, Type, Union
+
+import numpy as np
+
+from skellytracker.trackers.base_tracker.model_info import ModelInfo
+
+logger = logging.getLogger(__name__)
+
+
+class MarkerModel:
+    """
+    Tracked and virtual markers of a `ModelInfo`, each compiled to a row of weights over the tracked points.
+
+    Anything that is a linear combination of markers (segment vectors, centers of mass) can then be computed for
+    every frame and camera at once with `apply_weights`.
+    """
+
+    def __init__(self, model_info: Union[ModelInfo, Type[ModelInfo]]):
+        """
+        :param model_info: Model info, or model info class, with `landmark_names` and `virtual_markers_definitions`.
+        """
+        self.model_name = model_info.name
+        self.landmark_names: List[str] = list(model_info.landmark_names)
+        self.point_index: Dict[str, int] = {}
+        for index, name in enumerate(self.landmark_names):
+            # the first occurrence wins, e.g. body landmarks before hand landmarks of the same name
+            self.point_index.setdefault(name, index)
+        self.number_of_points = len(self.landmark_names)
+
+        self.marker_weights: Dict[str, np.ndarray] = {
+            name: self.one_hot(index) for name, index in self.point_index.items()
+        }
+
+        virtual_markers_definitions = model_info.virtual_markers_definitions or {}
+        self.virtual_marker_names = list(virtual_markers_definitions.keys())
+        for name, definition in virtual_markers_definitions.items():
+            marker_names = definition["marker_names"]
+            marker_weights = definition["marker_weights"]
+            if len(marker_names) != len(marker_weights):
+                raise ValueError(
+                    f"Virtual marker {name} has {len(marker_names)} markers but {len(marker_weights)} weights"
+                )
+            self.marker_weights[name] = sum(
+                weight * self.get_marker_weights(marker_name)
+                for marker_name, weight in zip(marker_names, marker_weights)
+            )
+        self.virtual_marker_weights = self.stack_rows(
+            [self.marker_weights[name] for name in self.virtual_marker_names]
+        )
+
+    def one_hot(self, index: int) -> np.ndarray:
+        weights = np.zeros(self.number_of_points)
+        weights[index] = 1.0
+        return weights
+
+    def stack_rows(self, rows: List[np.ndarray]) -> np.ndarray:
+        if not rows:
+            return np.zeros((0, self.number_of_points))
+        return np.vstack(rows)
+
+    def get_marker_weights(self, marker_name: str) -> np.ndarray:
+        if marker_name not in self.marker_weights:
+            raise ValueError(
+                f"{marker_name} is not a landmark or previously defined virtual marker of {self.model_name}"
+            )
+        return self.marker_weights[marker_name]
+
+    def apply_weights(self, weights: np.ndarray, data: np.ndarray) -> np.ndarray:
+        """
+        Compute weighted sums of points, (outputs, points) weights applied to (..., points, dims) data.
+
+        Only the points with a nonzero weight are read, so missing points that are not used do not matter.
+
+        :return: (..., outputs, dims) array, NaN where a point with a nonzero weight is missing.
+        """
+        data = np.asarray(data)
+        if data.shape[-2] < self.number_of_points:
+            raise ValueError(
+                f"Expected at least {self.number_of_points} points for {self.model_name}, got {data.shape[-2]}"
+            )
+        used_point_indices = np.flatnonzero(np.any(weights != 0, axis=0))
+        used_weights = weights[:, used_point_indices]
+        used_points = data[..., used_point_indices, :]
+        missing_points = np.isnan(used_points).any(axis=-1)
+
+        result = np.matmul(used_weights, np.nan_to_num(used_points, nan=0.0))
+        missing_outputs = np.matmul(missing_points, (used_weights != 0).T)
+        result[missing_outputs] = np.nan
+        return result
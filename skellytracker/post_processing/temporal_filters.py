@@ -0,0 +1,335 @@
+"""
+Offline temporal filters for tracking arrays, e.g. the (cams, frames, points, dims) output of `process_list_of_videos`.
+
+Every filter runs along the frame axis for all cameras, points and dimensions at once.
+Missing (NaN) values do not spread into neighbouring frames and are NaN again in the output,
+so trackers can run frame by frame without smoothing state and be smoothed afterwards.
+"""
+
+import logging
+from pathlib import Path
+from typing import Literal, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+logger = logging.getLogger(__name__)
+
+FilterName = Literal["butterworth", "one_euro", "median"]
+
+
+def to_frame_major(data: np.ndarray, frame_axis: int) -> Tuple[np.ndarray, tuple]:
+    """
+    Move the frame axis first and flatten the rest, giving a (frames, series) float array.
+    """
+    frame_major = np.moveaxis(np.asarray(data, dtype=np.float64), frame_axis, 0)
+    return frame_major.reshape(frame_major.shape[0], -1), frame_major.shape
+
+
+def from_frame_major(
+    series: np.ndarray, frame_major_shape: tuple, frame_axis: int
+) -> np.ndarray:
+    return np.moveaxis(series.reshape(frame_major_shape), 0, frame_axis)
+
+
+def interpolate_gaps(series: np.ndarray) -> np.ndarray:
+    """
+    Fill NaN values of (frames, series) data by linear interpolation along the frames.
+
+    Leading and trailing gaps take the nearest valid value, series without any valid value are filled with 0.
+    """
+    number_of_frames = series.shape[0]
+    valid = ~np.isnan(series)
+    frame_indices = np.arange(number_of_frames)[:, np.newaxis]
+
+    previous_valid = np.maximum.accumulate(np.where(valid, frame_indices, -1), axis=0)
+    next_valid = np.minimum.accumulate(
+        np.where(valid, frame_indices, number_of_frames)[::-1], axis=0
+    )[::-1]
+    has_previous = previous_valid >= 0
+    has_next = next_valid < number_of_frames
+    previous_valid = np.where(has_previous, previous_valid, next_valid)
+    next_valid = np.where(has_next, next_valid, previous_valid)
+    previous_valid = np.clip(previous_valid, 0, number_of_frames - 1)
+    next_valid = np.clip(next_valid, 0, number_of_frames - 1)
+
+    previous_values = np.take_along_axis(series, previous_valid, axis=0)
+    next_values = np.take_along_axis(series, next_valid, axis=0)
+    span = next_valid - previous_valid
+    weight = np.divide(
+        frame_indices - previous_valid,
+        span,
+        out=np.zeros(series.shape),
+        where=span > 0,
+    )
+    filled = previous_values + weight * (next_values - previous_values)
+    filled[valid] = series[valid]
+    return np.nan_to_num(filled, nan=0.0)
+
+
+def butterworth_lowpass_coefficients(
+    cutoff_hz: float, sampling_rate_hz: float, order: int = 4
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Design a digital Butterworth low-pass filter with the bilinear transform.
+
+    :return: Numerator and denominator coefficients (b, a).
+    """
+    nyquist_hz = sampling_rate_hz / 2
+    if not 0 < cutoff_hz < nyquist_hz:
+        raise ValueError(
+            f"Cutoff frequency must be between 0 and {nyquist_hz} Hz, got {cutoff_hz}"
+        )
+    # pre-warp the cutoff so the digital filter cuts off at cutoff_hz
+    warped_cutoff = 2 * sampling_rate_hz * np.tan(np.pi * cutoff_hz / sampling_rate_hz)
+    analog_poles = warped_cutoff * np.exp(
+        1j * np.pi * (2 * np.arange(order) + order + 1) / (2 * order)
+    )
+    digital_poles = (2 * sampling_rate_hz + analog_poles) / (
+        2 * sampling_rate_hz - analog_poles
+    )
+    b = np.real(np.poly(-np.ones(order)))
+    a = np.real(np.poly(digital_poles))
+    # unity gain at 0 Hz
+    b *= a.sum() / b.sum()
+    return b, a
+
+
+def lfilter_steady_state(b: np.ndarray, a: np.ndarray) -> np.ndarray:
+    """
+    Initial filter state for a step response, scaled by the first sample to start the filter without a transient.
+    """
+    number_of_coefficients = len(a)
+    companion = np.zeros((number_of_coefficients - 1, number_of_coefficients - 1))
+    companion[0] = -a[1:]
+    companion[1:, :-1] = np.eye(number_of_coefficients - 2)
+    return np.linalg.solve(
+        np.eye(number_of_coefficients - 1) - companion.T, b[1:] - a[1:] * b[0]
+    )
+
+
+def lfilter(
+    b: np.ndarray, a: np.ndarray, series: np.ndarray, initial_state: np.ndarray
+) -> np.ndarray:
+    """
+    Direct form II transposed IIR filter along the frames of (frames, series) data.
+
+    :param initial_state: (order, series) filter state.
+    """
+    state = initial_state.copy()
+    filtered = np.empty_like(series)
+    order = len(a) - 1
+    for frame_index in range(series.shape[0]):
+        value = series[frame_index]
+        output = b[0] * value + state[0]
+        for state_index in range(order - 1):
+            state[state_index] = (
+                b[state_index + 1] * value
+                - a[state_index + 1] * output
+                + state[state_index + 1]
+            )
+        state[order - 1] = b[order] * value - a[order] * output
+        filtered[frame_index] = output
+    return filtered
+
+
+def filtfilt(b: np.ndarray, a: np.ndarray, series: np.ndarray) -> np.ndarray:
+    """
+    Zero phase filtering of (frames, series) data: filter forward, then backward.
+
+    The ends are padded with an odd reflection of the data to reduce edge transients,
+    so like `scipy.signal.filtfilt` the series must be longer than the padding.
+    """
+    pad_length = 3 * max(len(a), len(b))
+    if series.shape[0] <= pad_length:
+        raise ValueError(
+            f"Filtering needs more than {pad_length} frames, got {series.shape[0]}"
+        )
+    start = 2 * series[0] - series[pad_length:0:-1]
+    end = 2 * series[-1] - series[-2 : -pad_length - 2 : -1]
+    padded = np.concatenate([start, series, end])
+
+    steady_state = lfilter_steady_state(b, a)[:, np.newaxis]
+    forward = lfilter(b, a, padded, steady_state * padded[0])
+    backward = lfilter(b, a, forward[::-1], steady_state * forward[-1])[::-1]
+    return backward[pad_length:-pad_length]
+
+
+def butterworth_filter(
+    data: np.ndarray,
+    sampling_rate_hz: float,
+    cutoff_hz: float = 6.0,
+    order: int = 4,
+    frame_axis: int = 1,
+) -> np.ndarray:
+    """
+    Zero phase Butterworth low-pass filter.
+
+    :param data: Tracking data, e.g. (cams, frames, points, dims), NaN for missing values.
+    :param sampling_rate_hz: Frame rate of the data.
+    :param cutoff_hz: Cutoff frequency.
+    :param order: Filter order, the effective order is doubled by filtering forward and backward.
+    :param frame_axis: Axis of `data` that indexes frames.
+    :return: Filtered float64 data of the same shape, NaN where `data` is NaN.
+    """
+    series, frame_major_shape = to_frame_major(data, frame_axis)
+    missing = np.isnan(series)
+    b, a = butterworth_lowpass_coefficients(cutoff_hz, sampling_rate_hz, order)
+    filtered = filtfilt(b, a, interpolate_gaps(series))
+    filtered[missing] = np.nan
+    return from_frame_major(filtered, frame_major_shape, frame_axis)
+
+
+def one_euro_filter(
+    data: np.ndarray,
+    sampling_rate_hz: float,
+    min_cutoff_hz: float = 1.0,
+    beta: float = 0.0,
+    derivative_cutoff_hz: float = 1.0,
+    frame_axis: int = 1,
+) -> np.ndarray:
+    """
+    One-Euro filter (Casiez et al., 2012): a low-pass filter whose cutoff rises with speed,
+    smoothing jitter at rest while keeping lag low during fast movement.
+
+    Missing frames hold the filter state and stay NaN in the output.
+
+    :param data: Tracking data, e.g. (cams, frames, points, dims), NaN for missing values.
+    :param sampling_rate_hz: Frame rate of the data.
+    :param min_cutoff_hz: Cutoff frequency at rest, lower is smoother.
+    :param beta: How fast the cutoff rises with speed, higher reduces lag.
+    :param derivative_cutoff_hz: Cutoff frequency for the speed estimate.
+    :param frame_axis: Axis of `data` that indexes frames.
+    :return: Filtered float64 data of the same shape, NaN where `data` is NaN.
+    """
+
+    def smoothing_factor(cutoff_hz):
+        time_constant = 1 / (2 * np.pi * cutoff_hz)
+        return 1 / (1 + time_constant * sampling_rate_hz)
+
+    series, frame_major_shape = to_frame_major(data, frame_axis)
+    filtered = np.full_like(series, np.nan)
+    previous_value = np.full(series.shape[1], np.nan)
+    previous_derivative = np.zeros(series.shape[1])
+    derivative_alpha = smoothing_factor(derivative_cutoff_hz)
+
+    for frame_index in range(series.shape[0]):
+        value = series[frame_index]
+        valid = ~np.isnan(value)
+        started = valid & ~np.isnan(previous_value)
+
+        derivative = np.where(
+            started, (value - previous_value) * sampling_rate_hz, 0.0
+        )
+        derivative = previous_derivative + derivative_alpha * (
+            derivative - previous_derivative
+        )
+        alpha = smoothing_factor(min_cutoff_hz + beta * np.abs(derivative))
+        smoothed = np.where(
+            started, previous_value + alpha * (value - previous_value), value
+        )
+
+        previous_value = np.where(valid, smoothed, previous_value)
+        previous_derivative = np.where(started, derivative, previous_derivative)
+        filtered[frame_index] = np.where(valid, smoothed, np.nan)
+
+    return from_frame_major(filtered, frame_major_shape, frame_axis)
+
+
+def median_filter(
+    data: np.ndarray,
+    window_frames: int = 5,
+    frame_axis: int = 1,
+) -> np.ndarray:
+    """
+    Sliding median filter, good at removing single frame outliers such as swapped or misdetected points.
+
+    NaN values inside the window are ignored.
+
+    :param data: Tracking data, e.g. (cams, frames, points, dims), NaN for missing values.
+    :param window_frames: Odd window length in frames.
+    :param frame_axis: Axis of `data` that indexes frames.
+    :return: Filtered float64 data of the same shape, NaN where `data` is NaN.
+    """
+    if window_frames < 1 or window_frames % 2 == 0:
+        raise ValueError(f"Window length must be a positive odd number, got {window_frames}")
+
+    series, frame_major_shape = to_frame_major(data, frame_axis)
+    half_window = window_frames // 2
+    padded = np.pad(series, ((half_window, half_window), (0, 0)), mode="edge")
+    windows = sliding_window_view(padded, window_frames, axis=0)
+    filtered = np.median(windows, axis=-1)
+    # the much slower nanmedian is only needed for windows that contain a gap
+    window_has_gap = np.isnan(filtered) & ~np.isnan(series)
+    filtered[window_has_gap] = np.nanmedian(windows[window_has_gap], axis=-1)
+    filtered[np.isnan(series)] = np.nan
+    return from_frame_major(filtered, frame_major_shape, frame_axis)
+
+
+def apply_temporal_filter(
+    data: np.ndarray,
+    filter_name: FilterName,
+    sampling_rate_hz: float,
+    frame_axis: int = 1,
+    **filter_kwargs,
+) -> np.ndarray:
+    """
+    Apply one of the temporal filters by name.
+
+    :param filter_name: "butterworth", "one_euro" or "median".
+    :param filter_kwargs: Parameters of the chosen filter.
+    """
+    if filter_name == "butterworth":
+        return butterworth_filter(
+            data, sampling_rate_hz, frame_axis=frame_axis, **filter_kwargs
+        )
+    elif filter_name == "one_euro":
+        return one_euro_filter(
+            data, sampling_rate_hz, frame_axis=frame_axis, **filter_kwargs
+        )
+    elif filter_name == "median":
+        return median_filter(data, frame_axis=frame_axis, **filter_kwargs)
+    else:
+        raise ValueError(f"Invalid filter: {filter_name}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from skellytracker.trackers.base_tracker.output_precision import (
+        load_tracking_array,
+    )
+
+    parser = argparse.ArgumentParser(
+        description="Filter a saved (cams, frames, points, dims) tracking array"
+    )
+    parser.add_argument("input_path", type=Path)
+    parser.add_argument(
+        "--filter", choices=["butterworth", "one_euro", "median"], default="butterworth"
+    )
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--cutoff", type=float, default=6.0, help="Butterworth cutoff in Hz")
+    parser.add_argument("--window", type=int, default=5, help="Median window in frames")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.filter == "butterworth":
+        filter_kwargs = {"cutoff_hz": args.cutoff}
+    elif args.filter == "median":
+        filter_kwargs = {"window_frames": args.window}
+    else:
+        filter_kwargs = {}
+
+    tracking_data = load_tracking_array(args.input_path)
+    filtered_data = apply_temporal_filter(
+        tracking_data,
+        args.filter,
+        sampling_rate_hz=args.fps,
+        frame_axis=1 if tracking_data.ndim == 4 else 0,
+        **filter_kwargs,
+    )
+    output_path = args.input_path.with_name(
+        f"{args.input_path.stem}_{args.filter}_filtered.npy"
+    )
+    np.save(output_path, filtered_data)
+    logger.info(f"Filtered data saved to {output_path}")
@@ -1,17 +1,37 @@
+from dataclasses import asdict
 import logging
 import numpy as np
 from multiprocessing import Pool, cpu_count
+from multiprocessing.pool import ThreadPool
+import os
 from pathlib import Path
-from typing import Optional
+import shutil
+from typing import Dict, Iterator, List, Literal, Optional, Tuple, Union
+
+import cv2
+from numpy.lib.format import open_memmap
 from pydantic import BaseModel
 
 
 from skellytracker.system.constants import BASE_2D_FILE_NAME
+from skellytracker.system.logging_configuration import (
+    configure_worker_logging,
+    start_queue_listener,
+)
 from skellytracker.trackers.base_tracker.base_tracker import BaseTracker
 from skellytracker.trackers.base_tracker.model_info import ModelInfo
+from skellytracker.trackers.base_tracker.output_precision import (
+    OutputPrecision,
+    save_precision_sidecar,
+)
 from skellytracker.trackers.bright_point_tracker.brightest_point_tracker import (
     BrightestPointTracker,
 )
+from skellytracker.utilities.chunked_tracking_store import (
+    ChunkedTrackingStore,
+    ChunkedTrackingStoreWriter,
+    get_chunked_store_path,
+)
 from skellytracker.utilities.get_video_paths import get_video_paths
 
 try:
@@ -33,6 +53,7 @@ try:
     )
     from skellytracker.trackers.mediapipe_tracker.mediapipe_model_info import (
         MediapipeTrackingParams,
+        get_mediapipe_model_info,
     )
 except ModuleNotFoundError:
     print("To use mediapipe_holistic_tracker, install skellytracker[mediapipe]")
@@ -61,7 +82,10 @@ def process_folder_of_videos(
     output_folder_path: Optional[Path] = None,
     annotated_video_path: Optional[Path] = None,
     num_processes: Optional[int] = None,
-) -> np.ndarray:
+    logger_levels: Optional[Dict[str, Union[int, str]]] = None,
+    rate_limited_loggers: Optional[List[str]] = None,
+    output_format: Literal["npy", "chunked"] = "npy",
+) -> Union[np.ndarray, ChunkedTrackingStore]:
     """
     Process a folder of synchronized videos with the given tracker.
     Tracked data will be saved to a .npy file with the shape (numCams, numFrames, numTrackedPoints, pixelXYZ).
@@ -72,7 +96,10 @@ def process_folder_of_videos(
     :param output_folder_path: Path to save tracked data to.
     :param annotated_video_path: Path to save annotated videos to.
     :param num_processes: Number of processes to use, 1 to disable multiprocessing.
-    :return: Array of tracking data
+    :param logger_levels: Optional per-logger levels for the worker processes, see `process_list_of_videos`.
+    :param rate_limited_loggers: Worker loggers to rate limit, see `process_list_of_videos`.
+    :param output_format: "npy" or "chunked", see `process_list_of_videos`.
+    :return: Tracking data, see `process_list_of_videos`
     """
     video_paths = get_video_paths(synchronized_video_path)
     return process_list_of_videos(
@@ -82,6 +109,9 @@ def process_folder_of_videos(
         output_folder_path=output_folder_path,
         annotated_video_path=annotated_video_path,
         num_processes=num_processes,
+        logger_levels=logger_levels,
+        rate_limited_loggers=rate_limited_loggers,
+        output_format=output_format,
     )
 
 
@@ -92,10 +122,16 @@ def process_list_of_videos(
     output_folder_path: Optional[Path] = None,
     annotated_video_path: Optional[Path] = None,
     num_processes: Optional[int] = None,
-) -> np.ndarray:
+    logger_levels: Optional[Dict[str, Union[int, str]]] = None,
+    rate_limited_loggers: Optional[List[str]] = None,
+    output_format: Literal["npy", "chunked"] = "npy",
+) -> Union[np.ndarray, ChunkedTrackingStore]:
     """
     Process a folder of synchronized videos with the given tracker.
     Tracked data will be saved to a .npy file with the shape (numCams, numFrames, numTrackedPoints, pixelXYZ).
+    The data is in the `output_dtype` of the tracking params, fixed point dtypes save their scale to a .json sidecar.
+    Frame counts are checked before any video is processed, and each camera's data is written into a preallocated
+    memory mapped output file as soon as its video finishes, so the videos are never stacked in memory.
 
     :param model_info: Model info for tracker.
     :param tracking_params: Tracking parameters to use.
@@ -103,9 +139,24 @@ def process_list_of_videos(
     :param output_folder_path: Path to save tracked data to.
     :param annotated_video_path: Path to save annotated videos to.
     :param num_processes: Number of processes to use, 1 to disable multiprocessing.
-    :return: Array of tracking data
+    :param logger_levels: Optional per-logger levels for the worker processes, e.g. `{"skellytracker": "INFO"}`.
+    :param rate_limited_loggers: Loggers of per-frame messages whose INFO/DEBUG records are rate limited in the
+        worker processes, e.g. `["skellytracker.trackers"]`. Nothing is rate limited by default.
+    :param output_format: "npy" saves a single .npy file, "chunked" a compressed chunked store folder
+        (see `skellytracker.utilities.chunked_tracking_store`) with the tracker, params and landmark names as metadata.
+    :return: Array of tracking data memory mapped onto the saved .npy file for the "npy" output format, and a
+        `ChunkedTrackingStore` that reads the saved store lazily for the "chunked" output format
     """
 
+    if (
+        model_info.tracker_name in ("MediapipeHolisticTracker", "YOLOMediapipeComboTracker")
+        and getattr(tracking_params, "landmark_groups", None) is not None
+    ):
+        # the output layout, and so the saved landmark metadata, follows the landmark groups in the params
+        tracker_name = model_info.tracker_name
+        model_info = get_mediapipe_model_info(tracking_params.landmark_groups)()
+        model_info.tracker_name = tracker_name
+
     if num_processes is None:
         num_processes = min((cpu_count() - 1), len(video_paths))
     else:
@@ -146,28 +197,193 @@ def process_list_of_videos(
         )
         for video_path in video_paths
     ]
-    if num_processes > 1:
-        logging.info("Using multiprocessing to run pose estimation")
-        with Pool(processes=num_processes) as pool:
-            array_list = pool.starmap(process_single_video, tasks)
-    else:
-        array_list = []
-        for task in tasks:
-            array_list.append(process_single_video(*task))
-
-    if len(array_list) != len(video_paths):
+    # fail before any processing if the videos can not be combined into one array
+    frame_counts = probe_frame_counts(video_paths)
+    if len(set(frame_counts)) > 1:
         raise ValueError(
-            f"Expected {len(video_paths)} outputs, but got {len(array_list)}. "
-            "This may indicate that some videos were not processed correctly."
+            "Videos must have the same number of frames to be combined, got "
+            + ", ".join(
+                f"{video_path.name}: {frame_count}"
+                for video_path, frame_count in zip(video_paths, frame_counts)
+            )
         )
 
-    combined_array = np.stack(array_list)
+    output_precision = OutputPrecision.from_params(tracking_params)
+    if output_format == "chunked":
+        store_path = get_chunked_store_path(output_folder_path)
+        metadata = {
+            "tracker_name": model_info.tracker_name,
+            "model_name": model_info.name,
+            "tracking_params": tracking_params.model_dump(mode="json"),
+            "landmark_names": list(getattr(model_info, "landmark_names", [])),
+            "landmark_groups": dict(
+                getattr(model_info, "landmark_groups", None) or {}
+            ),
+            "video_names": [video_path.name for video_path in video_paths],
+            "output_precision": asdict(output_precision),
+        }
+    # everything is written to a partial output that only replaces the previous output once every camera is in,
+    # so a failing video never leaves a half filled output behind or destroys the previous one
+    if output_format == "chunked":
+        partial_path = store_path.with_name(f"{store_path.name}.partial")
+    else:
+        partial_path = output_folder_path.with_suffix(".partial.npy")
+    chunked_store_writer = None
+    combined_array = None
+    camera_shape = None
+
+    indexed_tasks = list(enumerate(tasks))
+    try:
+        for camera_index, camera_array in iterate_video_results(
+            indexed_tasks=indexed_tasks,
+            tracker_name=model_info.tracker_name,
+            num_processes=num_processes,
+            logger_levels=logger_levels,
+            rate_limited_loggers=rate_limited_loggers,
+        ):
+            video_name = video_paths[camera_index].name
+            if camera_array is None:
+                raise ValueError(f"No tracking data was returned for {video_name}")
+
+            if camera_shape is None:
+                if camera_array.shape[0] != frame_counts[0]:
+                    logger.warning(
+                        f"{video_name} produced {camera_array.shape[0]} frames of data, but reports {frame_counts[0]} frames"
+                    )
+                number_of_points = getattr(model_info, "num_tracked_points", None)
+                if number_of_points is not None and camera_array.shape[1] != number_of_points:
+                    raise ValueError(
+                        f"{video_name} produced {camera_array.shape[1]} points per frame, but {model_info.name} model "
+                        f"info describes {number_of_points}, pass model info that matches the tracking params"
+                    )
+                camera_shape = camera_array.shape
+                combined_shape = (len(video_paths), *camera_shape)
+                if output_format == "chunked":
+                    # each camera is streamed into the store, the session is never held in memory as a whole
+                    chunked_store_writer = ChunkedTrackingStoreWriter(
+                        partial_path,
+                        number_of_cameras=len(video_paths),
+                        number_of_points=camera_array.shape[1],
+                        number_of_dimensions=camera_array.shape[2],
+                        dtype=camera_array.dtype,
+                        metadata=metadata,
+                    )
+                else:
+                    combined_array = open_memmap(
+                        partial_path,
+                        mode="w+",
+                        dtype=camera_array.dtype,
+                        shape=combined_shape,
+                    )
+            elif camera_array.shape != camera_shape:
+                raise ValueError(
+                    f"{video_name} produced data of shape {camera_array.shape}, "
+                    f"but other videos produced {camera_shape}"
+                )
+
+            if chunked_store_writer is not None:
+                chunked_store_writer.append(camera_index, camera_array)
+                chunked_store_writer.flush()
+            else:
+                combined_array[camera_index] = camera_array
+
+        if chunked_store_writer is not None:
+            chunked_store_writer.close()
+        else:
+            combined_array.flush()
+            # release the memory map before the file is moved
+            del combined_array
+    except BaseException:
+        combined_array = None
+        if partial_path.is_dir():
+            shutil.rmtree(partial_path)
+        else:
+            partial_path.unlink(missing_ok=True)
+        raise
+
+    logger.info(f"Shape of output array: {(len(video_paths), *camera_shape)}")
+    if output_format == "chunked":
+        replace_chunked_store(partial_path, store_path)
+        logger.info(f"Data saved to: {store_path}")
+        return ChunkedTrackingStore(store_path)
 
-    logger.info(f"Shape of output array: {combined_array.shape}")
-    np.save(output_folder_path, combined_array)
+    os.replace(partial_path, output_folder_path)
+    save_precision_sidecar(output_folder_path, output_precision)
     logger.info(f"Data saved to: {output_folder_path}")
+    return open_memmap(output_folder_path, mode="r+")
 
-    return combined_array
+
+def replace_chunked_store(partial_path: Path, store_path: Path) -> None:
+    """
+    Move a finished store folder onto `store_path`, removing the store that was there.
+    """
+    if not store_path.exists():
+        os.replace(partial_path, store_path)
+        return
+    # folders can not be replaced in one step, the previous store is moved aside until the new one is in place
+    previous_path = store_path.with_name(f"{store_path.name}.previous")
+    if previous_path.exists():
+        shutil.rmtree(previous_path)
+    os.replace(store_path, previous_path)
+    os.replace(partial_path, store_path)
+    shutil.rmtree(previous_path)
+
+
+def probe_frame_counts(video_paths: List[Path]) -> List[int]:
+    """
+    Read the number of frames of each video from its header, without decoding it.
+    """
+    frame_counts = []
+    for video_path in video_paths:
+        cap = cv2.VideoCapture(str(video_path))
+        if not cap.isOpened():
+            raise ValueError(f"Could not open video: {video_path}")
+        frame_counts.append(int(cap.get(cv2.CAP_PROP_FRAME_COUNT)))
+        cap.release()
+    return frame_counts
+
+
+def iterate_video_results(
+    indexed_tasks: List[Tuple[int, tuple]],
+    tracker_name: str,
+    num_processes: int,
+    logger_levels: Optional[Dict[str, Union[int, str]]] = None,
+    rate_limited_loggers: Optional[List[str]] = None,
+) -> Iterator[Tuple[int, Optional[np.ndarray]]]:
+    """
+    Run `process_single_video` for each task, yielding (camera index, result) as each video finishes.
+    """
+    if num_processes > 1 and tracker_name == "OpenPoseTracker":
+        # OpenPose runs in its own subprocess, threads are enough to keep num_processes of them going at once
+        logger.info(f"Running up to {num_processes} OpenPose processes at once")
+        with ThreadPool(processes=num_processes) as pool:
+            yield from pool.imap_unordered(process_indexed_video, indexed_tasks)
+    elif num_processes > 1:
+        logging.info("Using multiprocessing to run pose estimation")
+        # workers send log records to a single listener here instead of all writing to stdout and the log file
+        log_queue, log_listener = start_queue_listener()
+        try:
+            with Pool(
+                processes=num_processes,
+                initializer=configure_worker_logging,
+                initargs=(log_queue, logger_levels, rate_limited_loggers),
+            ) as pool:
+                yield from pool.imap_unordered(process_indexed_video, indexed_tasks)
+        finally:
+            log_listener.stop()
+    else:
+        for indexed_task in indexed_tasks:
+            yield process_indexed_video(indexed_task)
+
+
+def process_indexed_video(
+    indexed_task: Tuple[int, tuple],
+) -> Tuple[int, Optional[np.ndarray]]:
+    """
+    Run `process_single_video` on a task, keeping track of which camera it belongs to.
+    """
+    camera_index, task = indexed_task
+    return camera_index, process_single_video(*task)
 
 
 def process_single_video(
@@ -196,6 +412,10 @@ def process_single_video(
         )  # TODO: fix it so blender output doesn't require mediapipe addendum here
 
     tracker = get_tracker(tracker_name=tracker_name, tracking_params=tracking_params)
+    if tracker.recorder is not None:
+        tracker.recorder.output_precision = OutputPrecision.from_params(
+            tracking_params, default_scales=tracker.recorder.fixed_point_scales
+        )
     logger.info(
         f"Processing video: {video_name} with tracker: {tracker.__class__.__name__}"
     )
@@ -203,6 +423,7 @@ def process_single_video(
         input_video_filepath=video_path,
         output_video_filepath=annotated_video_path / video_name,
         save_data_bool=False,
+        num_threads=getattr(tracking_params, "num_threads_per_video", 1),
     )  # TODO: raise a custom error here if output_array is None?
     return output_array
 
@@ -222,6 +443,7 @@ def get_tracker(tracker_name: str, tracking_params: BaseModel) -> BaseTracker:
             min_detection_confidence=tracking_params.min_detection_confidence,
             min_tracking_confidence=tracking_params.min_tracking_confidence,
             static_image_mode=tracking_params.static_image_mode,
+            landmark_groups=tracking_params.landmark_groups,
         )
 
     elif tracker_name == "YOLOMediapipeComboTracker":
@@ -233,6 +455,7 @@ def get_tracker(tracker_name: str, tracking_params: BaseModel) -> BaseTracker:
             static_image_mode=True,  # yolo cropping must be run with static image mode due to changing size of bounding boxes
             bounding_box_buffer_percentage=tracking_params.bounding_box_buffer_percentage,
             buffer_size_method=tracking_params.buffer_size_method,
+            landmark_groups=tracking_params.landmark_groups,
         )
 
     elif tracker_name == "YOLOPoseTracker":
@@ -252,6 +475,9 @@ def get_tracker(tracker_name: str, tracking_params: BaseModel) -> BaseTracker:
             track_faces=tracking_params.track_face,
             track_hands=tracking_params.track_hands,
             output_resolution=tracking_params.output_resolution,
+            incremental_ingestion=tracking_params.incremental_ingestion,
+            write_video=tracking_params.write_video,
+            openpose_executable_path=tracking_params.openpose_executable_path,
         )
 
     elif tracker_name == "CharucoTracker":
@@ -260,6 +486,8 @@ def get_tracker(tracker_name: str, tracking_params: BaseModel) -> BaseTracker:
             squares_x=tracking_params.charuco_squares_x_in,
             squares_y=tracking_params.charuco_squares_y_in,
             dict_id=tracking_params.charuco_dict_id,
+            detection_mode=tracking_params.charuco_detection_mode,
+            detector_preset=tracking_params.charuco_detector_preset,
         )
 
     else:
@@ -290,9 +518,6 @@ def get_tracker_params(tracker_name: str) -> BaseModel:
 
 
 if __name__ == "__main__":
-    from skellytracker.trackers.mediapipe_tracker.mediapipe_model_info import (
-        MediapipeModelInfo,
-    )
     from skellytracker.trackers.yolo_tracker.yolo_model_info import YOLOModelInfo
     from skellytracker.trackers.charuco_tracker.charuco_model_info import (
         CharucoModelInfo,
@@ -305,10 +530,12 @@ if __name__ == "__main__":
     tracker_name = "MediapipeHolisticTracker"
     num_processes = 3
 
+    tracking_params = get_tracker_params(tracker_name=tracker_name)
+
     if tracker_name == "MediapipeHolisticTracker":
-        model_info = MediapipeModelInfo()
+        model_info = get_mediapipe_model_info(tracking_params.landmark_groups)()
     elif tracker_name == "YOLOMediapipeComboTracker":
-        model_info = MediapipeModelInfo()
+        model_info = get_mediapipe_model_info(tracking_params.landmark_groups)()
         model_info.tracker_name = "YOLOMediapipeComboTracker"  # this is not ideal in the least - just a patch so we don't need to make any freemocap changes
     elif tracker_name == "YOLOPoseTracker":
         model_info = YOLOModelInfo()
@@ -317,7 +544,7 @@ if __name__ == "__main__":
 
     process_folder_of_videos(
         model_info=model_info,
-        tracking_params=get_tracker_params(tracker_name=tracker_name),
+        tracking_params=tracking_params,
         synchronized_video_path=synchronized_video_path,
         num_processes=num_processes,
     )
@@ -0,0 +1,94 @@
+import argparse
+import time
+from typing import Dict
+
+import cv2
+import numpy as np
+
+from skellytracker.trackers.bright_point_tracker.brightest_point_tracker import (
+    BrightestPointTracker,
+)
+
+DETECTION_ENGINES = ["contours", "connected_components"]
+
+
+def create_highlight_image(
+    width: int = 1920,
+    height: int = 1080,
+    number_of_highlights: int = 200,
+    seed: int = 0,
+) -> np.ndarray:
+    """
+    Create a dark image sprinkled with bright circular highlights of random size.
+    """
+    rng = np.random.default_rng(seed)
+    image = np.zeros((height, width, 3), dtype=np.uint8)
+    for _ in range(number_of_highlights):
+        center = (int(rng.integers(0, width)), int(rng.integers(0, height)))
+        radius = int(rng.integers(1, 12))
+        cv2.circle(image, center, radius, (255, 255, 255), -1)
+    return image
+
+
+def benchmark_brightest_point_engines(
+    image: np.ndarray,
+    num_points: int = 4,
+    number_of_iterations: int = 200,
+) -> Dict[str, float]:
+    """
+    Time `process_image` for each detection engine.
+
+    :return: Mean milliseconds per frame for each detection engine.
+    """
+    results = {}
+    centroids = {}
+    for detection_engine in DETECTION_ENGINES:
+        tracker = BrightestPointTracker(
+            num_points=num_points, detection_engine=detection_engine
+        )
+        tracker.process_image(image)  # warm up
+
+        start = time.perf_counter()
+        for _ in range(number_of_iterations):
+            tracker.process_image(image)
+        elapsed = time.perf_counter() - start
+
+        results[detection_engine] = elapsed / number_of_iterations * 1000
+        centroids[detection_engine] = sorted(
+            (tracked_object.pixel_x, tracked_object.pixel_y)
+            for tracked_object in tracker.tracked_objects.values()
+            if tracked_object.pixel_x is not None
+        )
+
+    if centroids["contours"] != centroids["connected_components"]:
+        print(
+            "Warning: engines found different centroids: "
+            f"{centroids['contours']} != {centroids['connected_components']}"
+        )
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the BrightestPointTracker detection engines on a synthetic image."
+    )
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--highlights", type=int, default=200)
+    parser.add_argument("--num-points", type=int, default=4)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    image = create_highlight_image(
+        width=args.width, height=args.height, number_of_highlights=args.highlights
+    )
+    results = benchmark_brightest_point_engines(
+        image=image, num_points=args.num_points, number_of_iterations=args.iterations
+    )
+    for detection_engine, milliseconds in results.items():
+        print(f"{detection_engine:>22}: {milliseconds:.3f} ms/frame")
+
+
+if __name__ == "__main__":
+    main()
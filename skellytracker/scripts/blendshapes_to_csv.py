@@ -1,54 +1,87 @@
 import argparse
 from pathlib import Path
-from typing import Generator
-import pandas as pd
+from typing import List
 
+import cv2
+import numpy as np
+
+from skellytracker.trackers.base_tracker.frame_sink import CSVFrameSink
+from skellytracker.trackers.mediapipe_blendshape_tracker.mediapipe_blendshape_model_info import (
+    MediapipeBlendshapeModelInfo,
+)
 from skellytracker.trackers.mediapipe_blendshape_tracker.mediapipe_blendshape_tracker import (
     MediapipeBlendshapeTracker,
 )
 
 
-def create_timestamp_generator() -> Generator[str, None, None]:
+def format_timecode(timestamp_s: float, fps: float) -> str:
+    """
+    Format a timestamp as a "HH:MM:SS:FF.mmm" timecode, where FF is the frame within the second at the given fps
+    and mmm the fraction of a frame.
+    """
+    whole_seconds = int(timestamp_s)
+    frames = (timestamp_s - whole_seconds) * fps
+    hours, remainder = divmod(whole_seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}:{int(frames):02d}.{int((frames % 1) * 1000):03d}"
+
+
+class BlendshapeCSVFrameSink(CSVFrameSink):
     """
-    Create a generator that generates timestamps in the format "00:00:00:00.000", with leading values rolling over before 30
+    Streams blendshapes to a CSV with a timecode and blendshape count column, without the "_neutral" blendshape.
     """
-    count = 1
-    refresh_value = 30
-    while True:
-        parts = [(count // (refresh_value**i)) % refresh_value for i in range(4)]
-        yield f"{parts[3]:02d}:{parts[2]:02d}:{parts[1]:02d}:{parts[0]:02d}.{count % 1000:03d}"
-        count += 1
+
+    def __init__(self, file_path: Path, fps: float, flush_interval_frames: int = 30):
+        super().__init__(
+            file_path=file_path,
+            landmark_names=MediapipeBlendshapeModelInfo.landmark_names,
+            flush_interval_frames=flush_interval_frames,
+        )
+        self.fps = fps
+        self.blendshape_columns = [
+            index
+            for index, name in enumerate(MediapipeBlendshapeModelInfo.landmark_names)
+            if name != "_neutral"
+        ]
+
+    def get_header(self, frame_array: np.ndarray) -> List[str]:
+        return ["Timestamp", "BlendShapeCount"] + [
+            MediapipeBlendshapeModelInfo.landmark_names[index]
+            for index in self.blendshape_columns
+        ]
+
+    def get_row(
+        self, frame_number: int, timestamp_s: float, frame_array: np.ndarray
+    ) -> list:
+        return [
+            format_timecode(timestamp_s, self.fps),
+            MediapipeBlendshapeModelInfo.num_tracked_points,
+        ] + frame_array.reshape(-1)[self.blendshape_columns].tolist()
 
 
 def blendshapes_to_csv(
     input_video_filepath: Path,
     output_video_filepath: Path,
     output_csv_filepath: Path,
+    save_data_bool: bool = False,
 ):
-    tracker = MediapipeBlendshapeTracker()
-    output_array = tracker.process_video(
+    """
+    Track blendshapes in a video, streaming them to a CSV as each frame is processed.
+
+    :param save_data_bool: Whether to also keep all frames in memory and save them to a .npy next to the input video.
+    """
+    cap = cv2.VideoCapture(str(input_video_filepath))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    cap.release()
+
+    tracker = MediapipeBlendshapeTracker(running_mode="video")
+    tracker.process_video(
         input_video_filepath=Path(input_video_filepath),
         output_video_filepath=Path(output_video_filepath),
-        save_data_bool=True,
+        save_data_bool=save_data_bool,
+        frame_sinks=[BlendshapeCSVFrameSink(Path(output_csv_filepath), fps=fps)],
+        keep_recorded_data=save_data_bool,
     )
-    if output_array is None:
-        raise ValueError("output_array is None, aborting")
-
-    output_array = output_array.reshape(
-        output_array.shape[0], -1
-    )  # ensure output array is 2D
-
-    df = pd.DataFrame(
-        output_array,
-        columns=tracker.model_info.landmark_names,
-    ).drop(columns=["_neutral"])
-
-    timestamp_generator = create_timestamp_generator()
-    df.insert(0, "Timestamp", [next(timestamp_generator) for _ in range(len(df))])
-
-    df.insert(1, "BlendShapeCount", tracker.model_info.num_tracked_points)
-
-    df.to_csv(Path(output_csv_filepath), index=False)
 
 
 def main():
@@ -67,6 +100,11 @@ def main():
     parser.add_argument(
         "-c", "--output-csv", type=Path, help="Path to save the output CSV file to."
     )
+    parser.add_argument(
+        "--save-npy",
+        action="store_true",
+        help="Also save the blendshapes to a .npy file next to the input video.",
+    )
 
     args = parser.parse_args()
 
@@ -91,7 +129,9 @@ def main():
         print("Output CSV path must be a .csv file, changing extension to .csv")
         output_csv_path = output_csv_path.with_suffix(".csv")
 
-    blendshapes_to_csv(input_path, output_video_path, output_csv_path)
+    blendshapes_to_csv(
+        input_path, output_video_path, output_csv_path, save_data_bool=args.save_npy
+    )
 
 
 if __name__ == "__main__":
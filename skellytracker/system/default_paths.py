@@ -1,4 +1,5 @@
 from datetime import datetime
+import os
 import time
 from pathlib import Path
 
@@ -7,6 +8,8 @@ from skellytracker import __package_name__
 BASE_FOLDER_NAME = f"{__package_name__}_data"
 LOGS_INFO_AND_SETTINGS_FOLDER_NAME = "logs_info_and_settings"
 LOG_FILE_FOLDER_NAME = "logs"
+MODELS_FOLDER_NAME = "models"
+MODELS_FOLDER_ENVIRONMENT_VARIABLE = "SKELLYTRACKER_MODELS_FOLDER"
 FIGSHARE_TEST_IMAGE_URL = "https://figshare.com/ndownloader/files/47043898"
 FIGSHARE_CHARUCO_TEST_IMAGE_URL = "https://figshare.com/ndownloader/files/47127685"
 
@@ -28,6 +31,19 @@ def get_log_file_path():
     return log_file_path
 
 
+def get_models_folder_path():
+    """
+    Folder model weights are cached in, `SKELLYTRACKER_MODELS_FOLDER` overrides the default inside the base folder.
+    """
+    models_folder_override = os.environ.get(MODELS_FOLDER_ENVIRONMENT_VARIABLE)
+    if models_folder_override:
+        models_folder_path = Path(models_folder_override)
+    else:
+        models_folder_path = get_base_folder_path() / MODELS_FOLDER_NAME
+    models_folder_path.mkdir(exist_ok=True, parents=True)
+    return models_folder_path
+
+
 def create_log_file_name():
     return "log_" + get_iso6201_time_string() + ".log"
 
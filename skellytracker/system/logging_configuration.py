@@ -1,12 +1,17 @@
 import logging
 import logging.handlers
+import multiprocessing
 import sys
+import time
 from logging.config import dictConfig
-from typing import Optional
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 
 
 DEFAULT_LOGGING = {"version": 1, "disable_existing_loggers": False}
 
+# Loggers that emit per-frame messages are throttled to this interval (seconds) when rate limiting is enabled for them
+DEFAULT_RATE_LIMIT_INTERVAL_SECONDS = 1.0
+
 
 def get_logging_handlers(log_file_path: Optional[str] = ""):
     dictConfig(DEFAULT_LOGGING)
@@ -40,3 +45,116 @@ def configure_logging(log_file_path: Optional[str] = ""):
     else:
         logger = logging.getLogger(__name__)
         logger.info("Logging already configured!")
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Drop repeated records from the same call site that arrive faster than `min_interval_seconds`.
+
+    Only records at or below `max_level` are throttled, so warnings and errors always get through.
+    """
+
+    def __init__(
+        self,
+        min_interval_seconds: float = DEFAULT_RATE_LIMIT_INTERVAL_SECONDS,
+        max_level: int = logging.INFO,
+        logger_names: Optional[Sequence[str]] = None,
+    ):
+        """
+        :param logger_names: Only throttle records of these loggers and their children, e.g. the loggers of
+            per-frame code, None throttles every logger.
+        """
+        super().__init__()
+        self.min_interval_seconds = min_interval_seconds
+        self.max_level = max_level
+        self.logger_names = None if logger_names is None else tuple(logger_names)
+        self._last_emit_times: Dict[Tuple[str, int], float] = {}
+
+    def is_rate_limited_logger(self, logger_name: str) -> bool:
+        if self.logger_names is None:
+            return True
+        return any(
+            logger_name == name or logger_name.startswith(f"{name}.")
+            for name in self.logger_names
+        )
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.max_level or not self.is_rate_limited_logger(record.name):
+            return True
+        call_site = (record.name, record.lineno)
+        now = time.monotonic()
+        last_emit_time = self._last_emit_times.get(call_site)
+        if last_emit_time is not None and now - last_emit_time < self.min_interval_seconds:
+            return False
+        self._last_emit_times[call_site] = now
+        return True
+
+
+def set_logger_levels(logger_levels: Optional[Dict[str, Union[int, str]]] = None) -> None:
+    """
+    Set the level of individual loggers, e.g. `{"skellytracker.trackers": "INFO"}`.
+
+    :param logger_levels: Mapping of logger name to level, `""` refers to the root logger.
+    """
+    if logger_levels is None:
+        return
+    for logger_name, level in logger_levels.items():
+        logging.getLogger(logger_name).setLevel(level)
+
+
+def start_queue_listener(
+    handlers: Optional[List[logging.Handler]] = None,
+) -> Tuple[multiprocessing.Queue, logging.handlers.QueueListener]:
+    """
+    Start a listener in the parent process that owns the real logging handlers.
+
+    Worker processes configured with `configure_worker_logging` send their records through the returned queue,
+    so only this process writes to stdout and the log file.
+
+    :param handlers: Handlers to write records to, defaults to the handlers currently on the root logger.
+    :return: The queue to hand to worker processes and the running listener, stop it with `listener.stop()`.
+    """
+    if handlers is None:
+        handlers = list(logging.getLogger().handlers)
+    log_queue = multiprocessing.Queue(-1)
+    listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    listener.start()
+    return log_queue, listener
+
+
+def configure_worker_logging(
+    log_queue: multiprocessing.Queue,
+    logger_levels: Optional[Dict[str, Union[int, str]]] = None,
+    rate_limited_loggers: Optional[Sequence[str]] = None,
+    rate_limit_interval_seconds: float = DEFAULT_RATE_LIMIT_INTERVAL_SECONDS,
+) -> None:
+    """
+    Route every record of this (worker) process through `log_queue` instead of its own handlers.
+
+    Intended as a `multiprocessing.Pool` initializer, paired with `start_queue_listener` in the parent.
+
+    :param log_queue: Queue returned by `start_queue_listener`.
+    :param logger_levels: Optional per-logger levels, see `set_logger_levels`.
+    :param rate_limited_loggers: Loggers of per-frame messages to rate limit, with their children,
+        e.g. `["skellytracker.trackers"]`. Nothing is rate limited by default.
+    :param rate_limit_interval_seconds: Minimum interval between INFO/DEBUG records from the same call site
+        of a rate limited logger.
+    """
+    root_logger = logging.getLogger()
+    for handler in list(root_logger.handlers):
+        root_logger.removeHandler(handler)
+        handler.close()
+
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    if rate_limited_loggers:
+        queue_handler.addFilter(
+            RateLimitFilter(
+                min_interval_seconds=rate_limit_interval_seconds,
+                logger_names=rate_limited_loggers,
+            )
+        )
+    root_logger.addHandler(queue_handler)
+    root_logger.setLevel(logging.DEBUG)
+    set_logger_levels(logger_levels)
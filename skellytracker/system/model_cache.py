@@ -0,0 +1,329 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import requests
+
+from skellytracker.system.default_paths import get_models_folder_path
+
+logger = logging.getLogger(__name__)
+
+OFFLINE_ENVIRONMENT_VARIABLE = "SKELLYTRACKER_OFFLINE"
+MODEL_MANIFEST_FILE_NAME = "model_manifest.json"
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+MEDIAPIPE_MODELS_URL = "https://storage.googleapis.com/mediapipe-models"
+ULTRALYTICS_ASSETS_URL = "https://github.com/ultralytics/assets/releases/download/v8.3.0"
+
+MODEL_URLS = {
+    "face_landmarker.task": f"{MEDIAPIPE_MODELS_URL}/face_landmarker/face_landmarker/float16/1/face_landmarker.task",
+    "sam_b.pt": f"{ULTRALYTICS_ASSETS_URL}/sam_b.pt",
+    **{
+        f"yolo11{size}{task}.pt": f"{ULTRALYTICS_ASSETS_URL}/yolo11{size}{task}.pt"
+        for size in ["n", "s", "m", "l", "x"]
+        for task in ["", "-pose"]
+    },
+}
+
+# Names models used to be cached under -> their current name, cached files under a legacy name are renamed on use
+LEGACY_MODEL_NAMES = {
+    "face_landmarker_v2_with_blendshapes.task": "face_landmarker.task",
+}
+
+# Checksums of the published model files, checked when they are downloaded and first loaded in each process.
+# Only models without a pinned checksum are recorded in the manifest when they are downloaded, and checked against it.
+MODEL_SHA256: Dict[str, str] = {}
+
+# verify_models statuses, models that are "verified" or "unpinned" can be loaded
+VERIFIED = "verified"  # matches its pinned checksum
+UNPINNED = "unpinned"  # no pinned checksum, matches the checksum recorded when it was downloaded
+UNKNOWN = "unknown"  # no pinned or recorded checksum to check it against
+CORRUPTED = "corrupted"  # does not match its pinned or recorded checksum
+MISSING = "missing"
+
+# model name -> (path, size, modification time) of the cached file last verified in this process
+_verified_models: Dict[str, Tuple[str, int, int]] = {}
+
+
+def is_offline_mode() -> bool:
+    """
+    Whether `SKELLYTRACKER_OFFLINE` is set, in which case models are never downloaded.
+    """
+    return os.environ.get(OFFLINE_ENVIRONMENT_VARIABLE, "").lower() in {
+        "1",
+        "true",
+        "yes",
+    }
+
+
+def compute_sha256(file_path: Union[str, Path]) -> str:
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def load_model_manifest() -> Dict[str, Dict[str, Union[str, int]]]:
+    """
+    Load the checksums and sizes of the cached models, recorded when they were downloaded.
+    """
+    manifest_path = get_models_folder_path() / MODEL_MANIFEST_FILE_NAME
+    if not manifest_path.exists():
+        return {}
+    return json.loads(manifest_path.read_text())
+
+
+def get_expected_sha256(
+    model_name: str, manifest: Optional[Dict[str, Dict[str, Union[str, int]]]] = None
+) -> Optional[str]:
+    """
+    The pinned checksum of a model, or the one recorded when it was downloaded, None if neither is known.
+    """
+    if model_name in MODEL_SHA256:
+        return MODEL_SHA256[model_name]
+    if manifest is None:
+        manifest = load_model_manifest()
+    model_record = manifest.get(model_name)
+    return None if model_record is None else str(model_record["sha256"])
+
+
+def get_file_state(model_path: Path) -> Tuple[str, int, int]:
+    stat = model_path.stat()
+    return str(model_path), stat.st_size, stat.st_mtime_ns
+
+
+def check_cached_model(model_name: str, model_path: Path) -> bool:
+    """
+    Check a cached model against its expected checksum, hashing each file only once per process.
+    """
+    if _verified_models.get(model_name) == get_file_state(model_path):
+        return True
+    expected_sha256 = get_expected_sha256(model_name)
+    if expected_sha256 is None:
+        logger.warning(f"Cached {model_name} has no known checksum to verify it against")
+        return False
+    if compute_sha256(model_path) != expected_sha256:
+        logger.warning(f"Cached {model_name} does not match its expected checksum")
+        return False
+    _verified_models[model_name] = get_file_state(model_path)
+    return True
+
+
+def adopt_legacy_model(model_name: str) -> None:
+    """
+    Rename a model cached under a legacy name to `model_name`, together with its manifest record.
+    """
+    models_folder_path = get_models_folder_path()
+    for legacy_name, current_name in LEGACY_MODEL_NAMES.items():
+        legacy_path = models_folder_path / legacy_name
+        if current_name != model_name or not legacy_path.exists():
+            continue
+        logger.info(f"Renaming cached {legacy_name} to {model_name}")
+        os.replace(legacy_path, models_folder_path / model_name)
+        manifest = load_model_manifest()
+        if legacy_name in manifest:
+            manifest[model_name] = manifest.pop(legacy_name)
+            write_model_manifest(manifest)
+        return
+
+
+def write_model_manifest(manifest: Dict[str, Dict[str, Union[str, int]]]) -> None:
+    manifest_path = get_models_folder_path() / MODEL_MANIFEST_FILE_NAME
+    temporary_path = manifest_path.with_name(f"{manifest_path.name}.{os.getpid()}.tmp")
+    temporary_path.write_text(json.dumps(manifest, indent=4))
+    os.replace(temporary_path, manifest_path)
+
+
+def record_model_in_manifest(
+    model_name: str, model_path: Path, sha256: Optional[str] = None
+) -> Dict[str, Union[str, int]]:
+    """
+    Record the checksum and size of a cached model file.
+    """
+    manifest = load_model_manifest()
+    manifest[model_name] = {
+        "sha256": sha256 or compute_sha256(model_path),
+        "size": model_path.stat().st_size,
+        "url": MODEL_URLS.get(model_name, ""),
+    }
+    write_model_manifest(manifest)
+    return manifest[model_name]
+
+
+def download_model(model_name: str) -> Path:
+    """
+    Download a model into the cache and record its checksum.
+
+    Downloads go to a temporary file first, so an interrupted download never leaves a partial model in the cache.
+
+    :return: Path to the downloaded model.
+    :raise ValueError: If the download does not match the pinned checksum of the model.
+    """
+    if model_name not in MODEL_URLS:
+        raise KeyError(
+            f"No download URL known for model {model_name}, known models are {list(MODEL_URLS)}"
+        )
+    model_path = get_models_folder_path() / model_name
+    temporary_path = model_path.with_name(f"{model_name}.{os.getpid()}.part")
+
+    logger.info(f"Downloading {model_name} from {MODEL_URLS[model_name]}...")
+    try:
+        with requests.get(MODEL_URLS[model_name], stream=True, timeout=(5, 60)) as r:
+            r.raise_for_status()
+            with open(temporary_path, "wb") as f:
+                for chunk in r.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+        sha256 = compute_sha256(temporary_path)
+        if model_name in MODEL_SHA256 and sha256 != MODEL_SHA256[model_name]:
+            raise ValueError(
+                f"Downloaded {model_name} has sha256 {sha256}, expected {MODEL_SHA256[model_name]}"
+            )
+        os.replace(temporary_path, model_path)
+    finally:
+        temporary_path.unlink(missing_ok=True)
+
+    if model_name not in MODEL_SHA256:
+        # trusted on first use, later loads are checked against this download
+        record_model_in_manifest(model_name, model_path, sha256=sha256)
+    _verified_models[model_name] = get_file_state(model_path)
+    logger.info(f"Saved {model_name} to {model_path} (sha256 {sha256})")
+    return model_path
+
+
+def get_model_path(model_name: str, offline: Optional[bool] = None) -> Path:
+    """
+    Get the path to a cached model, downloading it on first use.
+
+    The cached file is checked against its expected checksum the first time it is loaded in a process, and
+    downloaded again if it does not match or has no known checksum.
+
+    :param model_name: File name of the model, e.g. "yolo11n-pose.pt", legacy names are accepted too.
+    :param offline: Never download, defaults to whether `SKELLYTRACKER_OFFLINE` is set.
+    :return: Path to the model in the cache.
+    :raise FileNotFoundError: If the model is not cached and can not be downloaded in offline mode.
+    :raise ValueError: If the cached model fails verification in offline mode.
+    """
+    if offline is None:
+        offline = is_offline_mode()
+
+    model_name = LEGACY_MODEL_NAMES.get(model_name, model_name)
+    model_path = get_models_folder_path() / model_name
+    if not model_path.exists():
+        adopt_legacy_model(model_name)
+    if model_path.exists():
+        if check_cached_model(model_name, model_path):
+            return model_path
+        if offline:
+            raise ValueError(
+                f"Cached {model_name} at {model_path} could not be verified and offline mode is enabled, "
+                f"copy it over together with {MODEL_MANIFEST_FILE_NAME} from a cache where "
+                f"`skellytracker_models verify {model_name}` passes"
+            )
+        logger.warning(f"Redownloading {model_name}")
+
+    if offline:
+        raise FileNotFoundError(
+            f"Model {model_name} is not in the model cache at {model_path.parent} and offline mode is enabled, "
+            f"run `skellytracker_models prefetch {model_name}` on a machine with internet access "
+            "and copy the models folder over"
+        )
+    return download_model(model_name)
+
+
+def get_ultralytics_model(model_name: str, offline: Optional[bool] = None) -> str:
+    """
+    Get the model argument for an ultralytics model, from the cache when we know where to download it from.
+
+    Models without a known URL are passed to ultralytics by name, which resolves them itself.
+    """
+    if offline is None:
+        offline = is_offline_mode()
+    if model_name in MODEL_URLS:
+        return str(get_model_path(model_name, offline=offline))
+    if (get_models_folder_path() / model_name).exists():
+        # a model of the user's own, there is nothing to download or verify it against
+        return str(get_models_folder_path() / model_name)
+    if offline:
+        raise FileNotFoundError(
+            f"Model {model_name} is not in the model cache at {get_models_folder_path()} and offline mode is enabled"
+        )
+    logger.warning(
+        f"No download URL known for {model_name}, letting ultralytics resolve it outside the model cache"
+    )
+    return model_name
+
+
+def prefetch_models(model_names: Optional[List[str]] = None) -> List[Path]:
+    """
+    Download models into the cache ahead of time, by default every known model.
+
+    :return: Paths to the cached models.
+    """
+    return [get_model_path(model_name, offline=False) for model_name in model_names or MODEL_URLS]
+
+
+def verify_models(model_names: Optional[List[str]] = None) -> Dict[str, str]:
+    """
+    Check cached models against their pinned checksums, or the checksums recorded when they were downloaded.
+
+    :param model_names: Models to verify, by default every cached model.
+    :return: Status of each model, `VERIFIED` for a match with its pinned checksum, `UNPINNED` for a match with
+        the checksum recorded at download, otherwise `UNKNOWN`, `CORRUPTED` or `MISSING`.
+    """
+    manifest = load_model_manifest()
+    models_folder_path = get_models_folder_path()
+    if model_names is None:
+        model_names = sorted(
+            set(manifest)
+            | {path.name for path in models_folder_path.iterdir() if path.name in MODEL_URLS}
+        )
+
+    results = {}
+    for model_name in model_names:
+        model_path = models_folder_path / model_name
+        expected_sha256 = get_expected_sha256(model_name, manifest)
+        if not model_path.exists():
+            results[model_name] = MISSING
+        elif expected_sha256 is None:
+            results[model_name] = UNKNOWN
+        elif compute_sha256(model_path) != expected_sha256:
+            results[model_name] = CORRUPTED
+        else:
+            results[model_name] = VERIFIED if model_name in MODEL_SHA256 else UNPINNED
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="skellytracker_models",
+        description=f"Manage the skellytracker model cache in {get_models_folder_path()}.",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    prefetch_parser = subparsers.add_parser(
+        "prefetch", help="Download models into the cache, by default every known model."
+    )
+    prefetch_parser.add_argument("models", nargs="*", help=f"Models to download, from {list(MODEL_URLS)}")
+    verify_parser = subparsers.add_parser(
+        "verify", help="Check cached models against their pinned or recorded checksums."
+    )
+    verify_parser.add_argument("models", nargs="*", help="Models to verify, by default every cached model.")
+    args = parser.parse_args()
+
+    if args.command == "prefetch":
+        for model_path in prefetch_models(args.models or None):
+            print(f"cached: {model_path}")
+    else:
+        results = verify_models(args.models or None)
+        for model_name, status in results.items():
+            print(f"{status}: {model_name}")
+        if any(status not in (VERIFIED, UNPINNED) for status in results.values()):
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
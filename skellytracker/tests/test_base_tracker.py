@@ -0,0 +1,256 @@
+import asyncio
+import csv
+import json
+from pathlib import Path
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from skellytracker.trackers.base_tracker.frame_sink import (
+    CSVFrameSink,
+    NDJSONFrameSink,
+    get_column_names,
+)
+from skellytracker.trackers.bright_point_tracker.brightest_point_tracker import (
+    BrightestPointTracker,
+)
+from skellytracker.trackers.charuco_tracker.charuco_tracker import CharucoTracker
+
+
+@pytest.fixture()
+def moving_points_video_path(tmp_path: Path) -> Path:
+    """
+    Write a short video of two bright spots moving across the frame.
+    """
+    video_path = tmp_path / "moving_points.mp4"
+    video_writer = cv2.VideoWriter(
+        str(video_path), cv2.VideoWriter.fourcc(*"mp4v"), 30, (320, 240)
+    )
+    for frame_number in range(40):
+        image = np.zeros((240, 320, 3), dtype=np.uint8)
+        cv2.circle(image, (40 + 5 * frame_number, 80), 8, (255, 255, 255), -1)
+        cv2.circle(image, (280 - 4 * frame_number, 160), 12, (255, 255, 255), -1)
+        video_writer.write(image)
+    video_writer.release()
+    return video_path
+
+
+def test_frame_parallel_matches_sequential(moving_points_video_path, tmp_path):
+    sequential_output = BrightestPointTracker(num_points=2).process_video(
+        moving_points_video_path, use_tqdm=False
+    )
+    parallel_output = BrightestPointTracker(num_points=2).process_video(
+        moving_points_video_path,
+        output_video_filepath=tmp_path / "annotated.mp4",
+        use_tqdm=False,
+        num_threads=4,
+    )
+
+    assert sequential_output.shape == (40, 2, 2)
+    assert np.array_equal(sequential_output, parallel_output)
+
+    cap = cv2.VideoCapture(str(tmp_path / "annotated.mp4"))
+    assert int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) == 40
+    cap.release()
+
+
+def test_stateful_tracker_falls_back_to_sequential(moving_points_video_path):
+    tracker = BrightestPointTracker(num_points=2, search_mode="predictive_roi")
+    assert not tracker.is_stateless
+
+    output = tracker.process_video(
+        moving_points_video_path, use_tqdm=False, num_threads=4
+    )
+    assert output.shape == (40, 2, 2)
+    assert not np.isnan(output).any()
+
+
+def test_stateless_trackers_copy_their_parameters():
+    tracker = CharucoTracker(squares_x=5, squares_y=3, detector_preset="fast")
+    thread_copy = tracker.copy_for_thread()
+
+    assert tracker.is_stateless
+    assert thread_copy is not tracker
+    assert thread_copy.tracked_object_names == tracker.tracked_object_names
+    assert thread_copy.detector_preset == "fast"
+
+
+def test_process_video_passes_capture_timestamps(moving_points_video_path):
+    class TimestampRecordingTracker(BrightestPointTracker):
+        def process_image(self, image, **kwargs):
+            self.timestamps_ms.append(kwargs.get("timestamp_ms"))
+            return super().process_image(image, **kwargs)
+
+    tracker = TimestampRecordingTracker(num_points=2)
+    tracker.timestamps_ms = []
+    tracker.process_video(moving_points_video_path, use_tqdm=False)
+
+    assert len(tracker.timestamps_ms) == 40
+    assert np.allclose(tracker.timestamps_ms, np.arange(40) * 1000 / 30)
+
+
+def test_get_column_names():
+    assert get_column_names(np.zeros((2, 2)), ["nose", "neck"]) == [
+        "nose_x",
+        "nose_y",
+        "neck_x",
+        "neck_y",
+    ]
+    assert get_column_names(np.zeros((2, 1))) == ["point_0", "point_1"]
+
+
+def test_process_video_streams_frames_to_sinks(moving_points_video_path, tmp_path):
+    output_array = BrightestPointTracker(num_points=2).process_video(
+        moving_points_video_path,
+        use_tqdm=False,
+        frame_sinks=[
+            CSVFrameSink(tmp_path / "points.csv"),
+            NDJSONFrameSink(tmp_path / "points.ndjson"),
+        ],
+    )
+
+    with open(tmp_path / "points.csv", newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["frame_number", "timestamp_s", "point_0_x", "point_0_y", "point_1_x", "point_1_y"]
+    assert len(rows) == 41
+    csv_values = np.array([[float(value) for value in row[2:]] for row in rows[1:]])
+    assert np.array_equal(csv_values, output_array.reshape(40, -1))
+    assert np.isclose(float(rows[31][1]), 30 / 30)
+
+    with open(tmp_path / "points.ndjson") as f:
+        frames = [json.loads(line) for line in f]
+    assert [frame["frame_number"] for frame in frames] == list(range(40))
+    assert np.array_equal(np.array([frame["data"] for frame in frames]), output_array)
+
+
+def test_streaming_without_keeping_data(moving_points_video_path, tmp_path):
+    tracker = BrightestPointTracker(num_points=2)
+    output_array = tracker.process_video(
+        moving_points_video_path,
+        use_tqdm=False,
+        frame_sinks=[NDJSONFrameSink(tmp_path / "points.ndjson", flush_interval_frames=1)],
+        keep_recorded_data=False,
+    )
+
+    assert output_array is None
+    assert tracker.recorder.recorded_objects == []
+    with open(tmp_path / "points.ndjson") as f:
+        assert len(f.readlines()) == 40
+
+
+def test_ndjson_writes_missing_values_as_null(tmp_path):
+    frame_sink = NDJSONFrameSink(tmp_path / "frames.ndjson")
+    frame_sink.write_frame(0, 0.0, np.array([[1.0, np.nan]]))
+    frame_sink.close()
+
+    with open(tmp_path / "frames.ndjson") as f:
+        assert json.loads(f.readline())["data"] == [[1.0, None]]
+
+
+def test_aprocess_video_matches_process_video(moving_points_video_path, tmp_path):
+    sequential_output = BrightestPointTracker(num_points=2).process_video(
+        moving_points_video_path, use_tqdm=False
+    )
+
+    async def process_two_videos():
+        return await asyncio.gather(
+            BrightestPointTracker(num_points=2).aprocess_video(
+                moving_points_video_path,
+                output_video_filepath=tmp_path / "annotated.mp4",
+            ),
+            BrightestPointTracker(num_points=2).aprocess_video(
+                moving_points_video_path
+            ),
+        )
+
+    async def process_and_read_back():
+        async_outputs = await process_two_videos()
+        # read before the loop shuts down, the video must be finalized when the call returns
+        cap = cv2.VideoCapture(str(tmp_path / "annotated.mp4"))
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        cap.release()
+        return async_outputs, frame_count
+
+    async_outputs, frame_count = asyncio.run(process_and_read_back())
+
+    for async_output in async_outputs:
+        assert np.array_equal(async_output, sequential_output)
+    assert frame_count == 40
+
+
+def test_aiter_video_frames_yields_frames_in_order(moving_points_video_path):
+    async def collect_timestamps():
+        return [
+            timestamp_ms
+            async for _, _, _, timestamp_ms in BrightestPointTracker(
+                num_points=2
+            ).aiter_video_frames(moving_points_video_path)
+        ]
+
+    timestamps_ms = asyncio.run(collect_timestamps())
+    assert np.allclose(timestamps_ms, np.arange(40) * 1000 / 30)
+
+
+def test_aiter_video_frames_yields_each_frames_own_objects(moving_points_video_path):
+    async def collect_tracked_objects():
+        results = []
+        async for tracked_objects, _, _, _ in BrightestPointTracker(
+            num_points=2
+        ).aiter_video_frames(moving_points_video_path):
+            # the next frame is processed while the consumer waits
+            await asyncio.sleep(0.001)
+            results.append(tracked_objects)
+        return results
+
+    results = asyncio.run(collect_tracked_objects())
+    pixel_x = [tracked_objects["brightest_point_1"].pixel_x for tracked_objects in results]
+    assert len(results) == 40
+    assert np.all(np.diff(pixel_x) > 0)
+
+
+def test_aprocess_video_cancels_without_blocking_the_loop(
+    moving_points_video_path, tmp_path
+):
+    class SlowTracker(BrightestPointTracker):
+        def process_image(self, image, **kwargs):
+            time.sleep(0.02)
+            return super().process_image(image, **kwargs)
+
+    class CleanupCheckingTracker(SlowTracker):
+        processing = False
+        cleaned_up_while_processing = False
+
+        def process_image(self, image, **kwargs):
+            self.processing = True
+            try:
+                return super().process_image(image, **kwargs)
+            finally:
+                self.processing = False
+
+        def cleanup(self):
+            self.cleaned_up_while_processing |= self.processing
+            super().cleanup()
+
+    frame_sink = NDJSONFrameSink(tmp_path / "points.ndjson", flush_interval_frames=1)
+    tracker = CleanupCheckingTracker(num_points=2)
+
+    async def cancel_processing():
+        ticks = 0
+        processing = asyncio.create_task(
+            tracker.aprocess_video(moving_points_video_path, frame_sinks=[frame_sink])
+        )
+        for _ in range(20):
+            await asyncio.sleep(0.01)
+            ticks += 1
+        processing.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await processing
+        # outputs are closed by the time the cancelled call finishes
+        return ticks, frame_sink.file.closed
+
+    assert asyncio.run(cancel_processing()) == (20, True)
+    assert not tracker.cleaned_up_while_processing
+    with open(tmp_path / "points.ndjson") as f:
+        assert 0 < len(f.readlines()) < 40
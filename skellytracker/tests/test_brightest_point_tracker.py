@@ -87,3 +87,147 @@ def test_record(sample_image):
     assert len(tracker.recorder.recorded_objects) == 1
 
     assert len(tracker.recorder.recorded_objects[0]) == 2
+
+
+@pytest.mark.parametrize("num_points", [1, 2, 5])
+def test_connected_components_engine_approximates_contours(sample_image, num_points):
+    contour_tracker = BrightestPointTracker(num_points=num_points)
+    connected_components_tracker = BrightestPointTracker(
+        num_points=num_points, detection_engine="connected_components"
+    )
+
+    contour_objects = contour_tracker.process_image(sample_image)
+    connected_components_objects = connected_components_tracker.process_image(sample_image)
+
+    # pixel means and contour moments differ slightly, and near ties in size may rank differently,
+    # so every contour centroid only has to be close to one of the connected components centroids
+    connected_components_centroids = np.array(
+        [
+            (tracked_object.pixel_x, tracked_object.pixel_y)
+            for tracked_object in connected_components_objects.values()
+            if tracked_object.pixel_x is not None
+        ]
+    )
+    contour_centroids = [
+        (tracked_object.pixel_x, tracked_object.pixel_y)
+        for tracked_object in contour_objects.values()
+        if tracked_object.pixel_x is not None
+    ]
+    assert len(contour_centroids) == len(connected_components_centroids)
+    for contour_centroid in contour_centroids:
+        distances = np.linalg.norm(
+            connected_components_centroids - contour_centroid, axis=1
+        )
+        assert distances.min() <= 2
+
+
+def moving_points_video(number_of_frames: int = 10):
+    """
+    Yield frames with two bright spots moving in opposite directions.
+    """
+    for frame_number in range(number_of_frames):
+        image = np.zeros((200, 300, 3), dtype=np.uint8)
+        cv2.circle(image, (50 + 5 * frame_number, 60), 6, (255, 255, 255), -1)
+        cv2.circle(image, (250 - 5 * frame_number, 140), 8, (255, 255, 255), -1)
+        yield image
+
+
+@pytest.mark.parametrize("motion_model", ["constant_velocity", "kalman"])
+def test_predictive_roi_follows_points(motion_model):
+    tracker = BrightestPointTracker(
+        num_points=2,
+        search_mode="predictive_roi",
+        search_window_radius=15,
+        motion_model=motion_model,
+    )
+
+    for frame_number, image in enumerate(moving_points_video()):
+        tracked_objects = tracker.process_image(image)
+
+        # point identity is kept from the first frame, where the larger spot comes first
+        assert tracked_objects["brightest_point_0"].pixel_x == 250 - 5 * frame_number
+        assert tracked_objects["brightest_point_0"].pixel_y == 140
+        assert tracked_objects["brightest_point_1"].pixel_x == 50 + 5 * frame_number
+        assert tracked_objects["brightest_point_1"].pixel_y == 60
+
+
+def test_predictive_roi_reacquires_lost_point(sample_image):
+    tracker = BrightestPointTracker(
+        num_points=2, search_mode="predictive_roi", reacquire_interval_frames=1
+    )
+    tracker.process_image(sample_image)
+
+    missing_point_image = sample_image.copy()
+    cv2.circle(missing_point_image, (30, 30), 10, (0, 0, 0), -1)
+    tracked_objects = tracker.process_image(missing_point_image)
+    assert tracked_objects["brightest_point_0"].pixel_x == 70
+    assert tracked_objects["brightest_point_1"].pixel_x is None
+
+    tracked_objects = tracker.process_image(sample_image)
+    assert tracked_objects["brightest_point_0"].pixel_x == 70
+    assert tracked_objects["brightest_point_1"].pixel_x == 30
+    assert tracked_objects["brightest_point_1"].pixel_y == 30
+
+
+def test_predictive_roi_points_do_not_share_a_patch():
+    image = np.zeros((120, 160, 3), dtype=np.uint8)
+    cv2.circle(image, (50, 60), 6, (255, 255, 255), -1)
+    cv2.circle(image, (70, 60), 4, (255, 255, 255), -1)
+    tracker = BrightestPointTracker(
+        num_points=2, search_mode="predictive_roi", search_window_radius=30
+    )
+    tracker.process_image(image)
+
+    # both windows cover the remaining spot, only the first point may claim it
+    cv2.circle(image, (70, 60), 4, (0, 0, 0), -1)
+    tracked_objects = tracker.process_image(image)
+    assert tracked_objects["brightest_point_0"].pixel_x == 50
+    assert tracked_objects["brightest_point_1"].pixel_x is None
+    assert "thresholdedimage" not in tracked_objects["brightest_point_0"].extra
+
+
+def test_thresholded_image_is_updated_for_missing_points(sample_image):
+    tracker = BrightestPointTracker(num_points=3)
+    tracker.process_image(sample_image)
+    tracked_objects = tracker.process_image(np.zeros_like(sample_image))
+
+    for tracked_object in tracked_objects.values():
+        assert not tracked_object.extra["thresholdedimage"].any()
+
+
+def test_predictive_roi_throttles_full_frame_scans_for_missing_points():
+    tracker = BrightestPointTracker(
+        num_points=3, search_mode="predictive_roi", reacquire_interval_frames=5
+    )
+    full_frame_scans = []
+    threshold_image = tracker.threshold_image
+
+    def record_full_frame_scans(image):
+        if image.shape[:2] == (200, 300):
+            full_frame_scans.append(image)
+        return threshold_image(image)
+
+    tracker.threshold_image = record_full_frame_scans
+    for tracked_objects in map(tracker.process_image, moving_points_video(10)):
+        assert tracked_objects["brightest_point_2"].pixel_x is None
+
+    # only two spots for three points, the third is searched for on frames 0 and 5
+    assert len(full_frame_scans) == 2
+
+
+def test_predictive_roi_window_grows_to_take_in_a_whole_patch():
+    image = np.zeros((200, 300, 3), dtype=np.uint8)
+    cv2.circle(image, (100, 100), 5, (255, 255, 255), -1)
+    tracker = BrightestPointTracker(
+        num_points=1, search_mode="predictive_roi", search_window_radius=20
+    )
+    tracker.process_image(image)
+
+    # the spot grows into a bar that reaches well past the search window
+    cv2.rectangle(image, (100, 95), (180, 105), (255, 255, 255), -1)
+    tracked_objects = tracker.process_image(image)
+    expected_objects = BrightestPointTracker(
+        num_points=1, detection_engine="connected_components"
+    ).process_image(image)
+    assert tracked_objects["brightest_point_0"].pixel_x == expected_objects["brightest_point_0"].pixel_x
+    assert tracked_objects["brightest_point_0"].pixel_y == expected_objects["brightest_point_0"].pixel_y
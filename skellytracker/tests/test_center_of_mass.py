@@ -0,0 +1,110 @@
+import numpy as np
+import pytest
+
+from skellytracker.post_processing.center_of_mass import CenterOfMassCalculator
+from skellytracker.trackers.openpose_tracker.openpose_model_info import (
+    OpenPoseModelInfo,
+)
+from skellytracker.trackers.yolo_tracker.yolo_model_info import YOLOModelInfo
+
+
+def compute_frame_by_frame(model_info, frame: np.ndarray):
+    """
+    Straightforward per frame computation of the definitions, to check the compiled weights against.
+    """
+    markers = {name: frame[index] for index, name in enumerate(model_info.landmark_names)}
+    for name, definition in model_info.virtual_markers_definitions.items():
+        markers[name] = sum(
+            weight * markers[marker_name]
+            for marker_name, weight in zip(
+                definition["marker_names"], definition["marker_weights"]
+            )
+        )
+    segment_coms = {}
+    for name, definition in model_info.center_of_mass_definitions.items():
+        proximal = markers[model_info.segment_connections[name]["proximal"]]
+        distal = markers[model_info.segment_connections[name]["distal"]]
+        segment_coms[name] = proximal + definition["segment_com_length"] * (
+            distal - proximal
+        )
+    total_body_com = sum(
+        definition["segment_com_percentage"] * segment_coms[name]
+        for name, definition in model_info.center_of_mass_definitions.items()
+    ) / sum(
+        definition["segment_com_percentage"]
+        for definition in model_info.center_of_mass_definitions.values()
+    )
+    return (
+        np.array([markers[name] for name in model_info.virtual_markers_definitions]),
+        np.array(list(segment_coms.values())),
+        total_body_com,
+    )
+
+
+@pytest.mark.parametrize("model_info", [YOLOModelInfo, OpenPoseModelInfo])
+@pytest.mark.parametrize("number_of_dimensions", [2, 3])
+def test_matches_frame_by_frame_computation(model_info, number_of_dimensions):
+    data = np.random.default_rng(0).uniform(
+        0, 1000, size=(2, 6, model_info.num_tracked_points, number_of_dimensions)
+    )
+    result = CenterOfMassCalculator(model_info).compute(data)
+
+    assert result.total_body_center_of_mass.shape == (2, 6, number_of_dimensions)
+    for camera_index in range(2):
+        for frame_index in range(6):
+            virtual_markers, segment_coms, total_body_com = compute_frame_by_frame(
+                model_info, data[camera_index, frame_index]
+            )
+            assert np.allclose(
+                result.virtual_markers[camera_index, frame_index], virtual_markers
+            )
+            assert np.allclose(
+                result.segment_center_of_mass[camera_index, frame_index], segment_coms
+            )
+            assert np.allclose(
+                result.total_body_center_of_mass[camera_index, frame_index],
+                total_body_com,
+            )
+
+
+def test_missing_points_only_affect_dependent_outputs():
+    calculator = CenterOfMassCalculator(YOLOModelInfo)
+    data = np.random.default_rng(0).uniform(0, 1000, size=(4, 17, 2))
+    data[1, YOLOModelInfo.landmark_names.index("left_ear")] = np.nan
+    # the nose is not part of any definition
+    data[2, YOLOModelInfo.landmark_names.index("nose")] = np.nan
+
+    virtual_markers = calculator.compute_virtual_markers(data)
+    head_center = calculator.virtual_marker_names.index("head_center")
+    neck_center = calculator.virtual_marker_names.index("neck_center")
+    assert np.isnan(virtual_markers[1, head_center]).all()
+    assert not np.isnan(virtual_markers[1, neck_center]).any()
+
+    total_body_com = calculator.compute_total_body_center_of_mass(data)
+    assert np.isnan(total_body_com[1]).all()
+    assert not np.isnan(total_body_com[[0, 2, 3]]).any()
+
+
+def test_unknown_marker_raises():
+    class BrokenModelInfo(YOLOModelInfo):
+        virtual_markers_definitions = {
+            "chin": {"marker_names": ["jaw"], "marker_weights": [1.0]}
+        }
+
+    with pytest.raises(ValueError, match="jaw"):
+        CenterOfMassCalculator(BrokenModelInfo)
+
+
+def test_total_body_center_of_mass_is_nan_without_segments():
+    class HeadModelInfo(YOLOModelInfo):
+        segment_connections = None
+        center_of_mass_definitions = None
+
+    calculator = CenterOfMassCalculator(HeadModelInfo)
+    data = np.random.default_rng(0).uniform(0, 1000, size=(4, 17, 2))
+
+    assert np.isnan(calculator.compute_total_body_center_of_mass(data)).all()
+    result = calculator.compute(data)
+    assert np.isnan(result.total_body_center_of_mass).all()
+    assert result.segment_center_of_mass.shape == (4, 0, 2)
+    assert not np.isnan(result.virtual_markers).any()
@@ -3,6 +3,7 @@ import pytest
 import numpy as np
 
 
+from skellytracker.trackers.charuco_tracker.charuco_recorder import CharucoRecorder
 from skellytracker.trackers.charuco_tracker.charuco_tracker import CharucoTracker
 
 
@@ -141,3 +142,128 @@ def test_record(charuco_test_image):
     # )
     # assert np.allclose(processed_results[:, :, :2], expected_results[:, :, :2], atol=1e-2)
     # assert np.isnan(processed_results[:, :, 2]).all()
+
+
+def synthetic_charuco_image(offset_x: int = 0, offset_y: int = 0) -> np.ndarray:
+    """
+    Render a 7x5 charuco board in perspective onto a 1280x720 frame.
+
+    Uses a marker length of 0.7, with 0.8 the rendered markers are too close to their squares to all be detected.
+    """
+    board = cv2.aruco.CharucoBoard(
+        size=(7, 5),
+        squareLength=1,
+        markerLength=0.7,
+        dictionary=cv2.aruco.getPredefinedDictionary(cv2.aruco.DICT_4X4_250),
+    )
+    board_image = board.generateImage((700, 500), marginSize=20)
+    source = np.float32([[0, 0], [700, 0], [700, 500], [0, 500]])
+    destination = np.float32(
+        [[300, 150], [850, 175], [830, 560], [320, 530]]
+    ) + np.float32([offset_x, offset_y])
+    gray_image = cv2.warpPerspective(
+        board_image,
+        cv2.getPerspectiveTransform(source, destination),
+        (1280, 720),
+        borderValue=255,
+    )
+    return cv2.cvtColor(gray_image, cv2.COLOR_GRAY2BGR)
+
+
+@pytest.mark.parametrize("detector_preset", ["default", "fast", "accurate"])
+def test_pyramid_mode_matches_full_resolution(detector_preset):
+    image = synthetic_charuco_image()
+    full_resolution_tracker = CharucoTracker(squares_x=7, squares_y=5, marker_length=0.7)
+    pyramid_tracker = CharucoTracker(
+        squares_x=7,
+        squares_y=5,
+        marker_length=0.7,
+        detection_mode="pyramid",
+        detector_preset=detector_preset,
+    )
+
+    expected_objects = full_resolution_tracker.process_image(image)
+    tracked_objects = pyramid_tracker.process_image(image)
+
+    assert pyramid_tracker.board_region is not None
+    for id, expected_corner in expected_objects.items():
+        assert expected_corner.pixel_x is not None
+        assert np.allclose(
+            (tracked_objects[id].pixel_x, tracked_objects[id].pixel_y),
+            (expected_corner.pixel_x, expected_corner.pixel_y),
+            atol=0.5,
+        )
+
+
+def test_pyramid_mode_falls_back_when_board_leaves_region():
+    tracker = CharucoTracker(
+        squares_x=7, squares_y=5, marker_length=0.7, detection_mode="pyramid"
+    )
+    tracker.process_image(synthetic_charuco_image())
+    first_region = tracker.board_region
+
+    detected_image_shapes = []
+    charuco_detector = tracker.charuco_detector
+
+    class RecordingCharucoDetector:
+        def detectBoard(self, image, **kwargs):
+            detected_image_shapes.append(image.shape)
+            return charuco_detector.detectBoard(image, **kwargs)
+
+    tracker.charuco_detector = RecordingCharucoDetector()
+    tracked_objects = tracker.process_image(synthetic_charuco_image(offset_x=400, offset_y=150))
+
+    # a single full resolution detection, rather than a second pyramid pass over the full frame
+    assert detected_image_shapes == [(720, 1280)]
+    assert tracker.board_region != first_region
+    assert all(
+        tracked_object.pixel_x is not None for tracked_object in tracked_objects.values()
+    )
+
+    tracker.process_image(np.full((720, 1280, 3), 255, dtype=np.uint8))
+    assert tracker.board_region is None
+
+
+def test_recorder_writes_typed_nan_filled_array():
+    tracker = CharucoTracker(squares_x=7, squares_y=5, marker_length=0.7)
+    tracker.recorder = CharucoRecorder(
+        tracked_object_names=tracker.tracked_object_names, dtype=np.float32
+    )
+
+    for image in (
+        synthetic_charuco_image(),
+        np.full((720, 1280, 3), 255, dtype=np.uint8),
+        synthetic_charuco_image(),
+    ):
+        tracker.recorder.record(tracked_objects=tracker.process_image(image))
+
+    processed_results = tracker.recorder.process_tracked_objects()
+    assert processed_results.dtype == np.float32
+    assert processed_results.shape == (3, 24, 2)
+    assert not np.isnan(processed_results[[0, 2]]).any()
+    assert np.isnan(processed_results[1]).all()
+    assert np.allclose(processed_results[0], processed_results[2])
+
+
+def test_each_frame_gets_its_own_tracked_objects():
+    tracker = CharucoTracker(squares_x=7, squares_y=5, marker_length=0.7)
+    board_objects = tracker.process_image(synthetic_charuco_image())
+    blank_objects = tracker.process_image(np.full((720, 1280, 3), 255, dtype=np.uint8))
+
+    assert board_objects["0"].pixel_x is not None
+    assert blank_objects["0"].pixel_x is None
+
+
+def test_recorder_keeps_recorded_objects_lists():
+    tracker = CharucoTracker(squares_x=7, squares_y=5, marker_length=0.7)
+    for image in (synthetic_charuco_image(), np.full((720, 1280, 3), 255, dtype=np.uint8)):
+        tracker.recorder.record(tracked_objects=tracker.process_image(image))
+
+    recorded_objects = tracker.recorder.recorded_objects
+    assert [len(frame_objects) for frame_objects in recorded_objects] == [24, 24]
+    assert recorded_objects[0][5].object_id == "5"
+    assert (recorded_objects[0][5].pixel_x, recorded_objects[0][5].pixel_y) == tuple(
+        tracker.recorder.corner_array[0, 5]
+    )
+    assert recorded_objects[1][5].pixel_x is None
+    assert tracker.recorder.corner_array.shape == (2, 24, 2)
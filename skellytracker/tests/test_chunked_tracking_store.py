@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+
+from skellytracker.utilities.chunked_tracking_store import (
+    ChunkedTrackingStore,
+    ChunkedTrackingStoreWriter,
+    save_chunked_tracking_data,
+)
+
+
+@pytest.fixture()
+def mostly_nan_tracking_data() -> np.ndarray:
+    rng = np.random.default_rng(0)
+    tracking_data = np.full((3, 1000, 543, 3), np.nan)
+    tracking_data[:, :, :33] = rng.uniform(0, 1920, size=(3, 1000, 33, 3))
+    return tracking_data
+
+
+def test_round_trip_and_compression(mostly_nan_tracking_data, tmp_path):
+    store_path = save_chunked_tracking_data(
+        tmp_path / "session.chunks",
+        mostly_nan_tracking_data,
+        metadata={"tracker_name": "MediapipeHolisticTracker"},
+        chunk_frames=128,
+    )
+    store = ChunkedTrackingStore(store_path)
+
+    assert store.shape == mostly_nan_tracking_data.shape
+    assert store.metadata["tracker_name"] == "MediapipeHolisticTracker"
+    assert np.array_equal(store.to_array(), mostly_nan_tracking_data, equal_nan=True)
+
+    stored_bytes = sum(path.stat().st_size for path in store_path.glob("*.chunk"))
+    assert stored_bytes < mostly_nan_tracking_data.nbytes / 5
+
+
+def test_frame_window_slicing(mostly_nan_tracking_data, tmp_path):
+    store = ChunkedTrackingStore(
+        save_chunked_tracking_data(
+            tmp_path / "session.chunks", mostly_nan_tracking_data, chunk_frames=128
+        )
+    )
+
+    assert np.array_equal(
+        store[:, 300:420], mostly_nan_tracking_data[:, 300:420], equal_nan=True
+    )
+    assert np.array_equal(
+        store[1, 990:], mostly_nan_tracking_data[1, 990:], equal_nan=True
+    )
+    assert np.array_equal(
+        store.read(100, 140, cameras=[2, 0]),
+        mostly_nan_tracking_data[[2, 0], 100:140],
+        equal_nan=True,
+    )
+
+
+def test_append_across_writers(tmp_path):
+    store_path = tmp_path / "session.chunks"
+    frames = np.arange(2 * 50 * 4 * 2, dtype=np.float32).reshape(2, 50, 4, 2)
+
+    writer = ChunkedTrackingStoreWriter(
+        store_path, 2, 4, 2, dtype=np.float32, chunk_frames=16
+    )
+    for frame_number in range(30):
+        writer.append(0, frames[0, frame_number])
+    writer.append(1, frames[1, :30])
+    writer.close()
+
+    with ChunkedTrackingStoreWriter(
+        store_path, 2, 4, 2, dtype=np.float32, chunk_frames=16, append=True
+    ) as writer:
+        writer.append(0, frames[0, 30:])
+        writer.append(1, frames[1, 30:])
+
+    store = ChunkedTrackingStore(store_path)
+    assert store.dtype == np.float32
+    assert np.array_equal(store.to_array(), frames)
+
+
+def test_saving_again_replaces_the_store(tmp_path):
+    store_path = tmp_path / "session.chunks"
+    save_chunked_tracking_data(store_path, np.zeros((1, 10, 2, 2)), chunk_frames=4)
+    save_chunked_tracking_data(store_path, np.ones((1, 10, 2, 2)), chunk_frames=4)
+
+    store = ChunkedTrackingStore(store_path)
+    assert store.shape == (1, 10, 2, 2)
+    assert np.array_equal(store.to_array(), np.ones((1, 10, 2, 2)))
+    assert len(list(store_path.glob("*.chunk"))) == 3
+
+
+def test_corrupted_chunk_is_detected(tmp_path):
+    store_path = save_chunked_tracking_data(
+        tmp_path / "session.chunks", np.zeros((1, 10, 2, 2)), chunk_frames=5
+    )
+    chunk_path = sorted(store_path.glob("*.chunk"))[0]
+    chunk_bytes = bytearray(chunk_path.read_bytes())
+    chunk_bytes[-1] ^= 0xFF
+    chunk_path.write_bytes(bytes(chunk_bytes))
+
+    with pytest.raises(ValueError, match="Checksum"):
+        ChunkedTrackingStore(store_path).to_array()
+    assert ChunkedTrackingStore(store_path)[:, 5:].shape == (1, 5, 2, 2)
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from skellytracker.post_processing.kinematics import SkeletonKinematics
+from skellytracker.trackers.openpose_tracker.openpose_model_info import (
+    OpenPoseModelInfo,
+)
+from skellytracker.trackers.yolo_tracker.yolo_model_info import YOLOModelInfo
+
+
+def get_point(data: np.ndarray, name: str) -> np.ndarray:
+    return data[..., YOLOModelInfo.landmark_names.index(name), :]
+
+
+@pytest.fixture()
+def tracking_data() -> np.ndarray:
+    """
+    (cams, frames, points, 2) data of a skeleton whose points jitter around fixed positions.
+    """
+    rng = np.random.default_rng(0)
+    skeleton = rng.uniform(0, 1000, size=(17, 2))
+    return skeleton + rng.normal(scale=1.0, size=(2, 200, 17, 2))
+
+
+def test_segment_lengths(tracking_data):
+    kinematics = SkeletonKinematics(YOLOModelInfo)
+    segment_lengths = kinematics.compute_segment_lengths(tracking_data)
+
+    assert segment_lengths.shape == (2, 200, len(YOLOModelInfo.segment_connections))
+    right_shank = segment_lengths[..., kinematics.segment_names.index("right_shank")]
+    assert np.allclose(
+        right_shank,
+        np.linalg.norm(
+            get_point(tracking_data, "right_ankle")
+            - get_point(tracking_data, "right_knee"),
+            axis=-1,
+        ),
+    )
+    # the neck runs between two virtual markers
+    neck = segment_lengths[..., kinematics.segment_names.index("neck")]
+    head_center = (get_point(tracking_data, "left_ear") + get_point(tracking_data, "right_ear")) / 2
+    neck_center = (
+        get_point(tracking_data, "left_shoulder") + get_point(tracking_data, "right_shoulder")
+    ) / 2
+    assert np.allclose(neck, np.linalg.norm(neck_center - head_center, axis=-1))
+
+
+def test_joint_angles():
+    kinematics = SkeletonKinematics(YOLOModelInfo)
+    data = np.zeros((2, 17, 3))
+    point_index = {name: index for index, name in enumerate(YOLOModelInfo.landmark_names)}
+    data[:, point_index["left_shoulder"]] = [0, 0, 0]
+    data[:, point_index["left_elbow"]] = [0, -1, 0]
+    data[0, point_index["left_wrist"]] = [0, -2, 0]
+    data[1, point_index["left_wrist"]] = [1, -1, 0]
+    data[1, point_index["right_elbow"]] = np.nan
+
+    joint_angles = kinematics.compute_joint_angles(data)
+
+    left_elbow = kinematics.joint_names.index("left_elbow")
+    assert np.allclose(joint_angles[:, left_elbow], [180.0, 90.0])
+    assert np.isnan(joint_angles[1, kinematics.joint_names.index("right_elbow")])
+    assert "head_center_to_nose" in kinematics.joint_names
+
+
+def test_outliers_flag_bad_frames(tracking_data):
+    kinematics = SkeletonKinematics(YOLOModelInfo)
+    left_knee = YOLOModelInfo.landmark_names.index("left_knee")
+    tracking_data[1, 50, left_knee] += 300
+    tracking_data[0, 120, left_knee] = np.nan
+
+    segment_lengths = kinematics.compute_segment_lengths(tracking_data)
+    statistics = kinematics.compute_segment_length_statistics(segment_lengths)
+    left_thigh = kinematics.segment_names.index("left_thigh")
+    assert statistics.median.shape == (2, len(kinematics.segment_names))
+    assert np.isclose(statistics.valid_fraction[0, left_thigh], 199 / 200)
+
+    bad_frames = kinematics.find_bad_frames(tracking_data)
+    assert bad_frames.shape == (2, 200)
+    assert bad_frames[1, 50]
+    assert not bad_frames[0, 120]
+    assert bad_frames.sum() < 10
+
+
+def test_three_dimensional_openpose_data():
+    kinematics = SkeletonKinematics(OpenPoseModelInfo)
+    data = np.random.default_rng(0).uniform(size=(30, OpenPoseModelInfo.num_tracked_points, 3))
+    assert kinematics.compute_segment_lengths(data).shape == (30, len(kinematics.segment_names))
+    joint_angles = kinematics.compute_joint_angles(data)
+    assert ((joint_angles >= 0) & (joint_angles <= 180)).all()
@@ -0,0 +1,73 @@
+import logging
+import multiprocessing
+
+from skellytracker.system.logging_configuration import (
+    RateLimitFilter,
+    configure_worker_logging,
+    start_queue_listener,
+)
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__(level=logging.DEBUG)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def _log_from_worker(log_queue):
+    configure_worker_logging(
+        log_queue,
+        logger_levels={"noisy": "WARNING"},
+        rate_limited_loggers=["frames"],
+    )
+    logging.getLogger("worker").info("hello from worker")
+    logging.getLogger("noisy").info("should be filtered by level")
+    for frame_number in range(3):
+        logging.getLogger("worker").info(f"worker message {frame_number}")
+        logging.getLogger("frames.tracker").info(f"frame {frame_number}")
+
+
+def test_rate_limit_filter_throttles_same_call_site():
+    rate_limit_filter = RateLimitFilter(min_interval_seconds=60)
+    record = logging.LogRecord("frames", logging.DEBUG, __file__, 10, "frame", None, None)
+    warning = logging.LogRecord("frames", logging.WARNING, __file__, 10, "uh oh", None, None)
+
+    assert rate_limit_filter.filter(record)
+    assert not rate_limit_filter.filter(record)
+    assert rate_limit_filter.filter(warning)
+
+
+def test_rate_limit_filter_is_scoped_to_its_loggers():
+    rate_limit_filter = RateLimitFilter(min_interval_seconds=60, logger_names=["frames"])
+    frame_record = logging.LogRecord("frames.tracker", logging.INFO, __file__, 10, "frame", None, None)
+    other_record = logging.LogRecord("framesets", logging.INFO, __file__, 10, "other", None, None)
+
+    assert rate_limit_filter.filter(frame_record)
+    assert not rate_limit_filter.filter(frame_record)
+    assert rate_limit_filter.filter(other_record)
+    assert rate_limit_filter.filter(other_record)
+
+
+def test_worker_records_reach_parent_listener():
+    list_handler = ListHandler()
+    log_queue, listener = start_queue_listener(handlers=[list_handler])
+    try:
+        process = multiprocessing.Process(target=_log_from_worker, args=(log_queue,))
+        process.start()
+        process.join(timeout=30)
+    finally:
+        listener.stop()
+
+    messages = [record.getMessage() for record in list_handler.records]
+    assert "hello from worker" in messages
+    assert "should be filtered by level" not in messages
+    # only the rate limited logger is throttled
+    assert [message for message in messages if message.startswith("worker message")] == [
+        "worker message 0",
+        "worker message 1",
+        "worker message 2",
+    ]
+    assert [message for message in messages if message.startswith("frame ")] == ["frame 0"]
@@ -1,9 +1,16 @@
+from types import SimpleNamespace
+
 import pytest
 import numpy as np
 
 
 from skellytracker.trackers.mediapipe_tracker.mediapipe_model_info import (
     MediapipeModelInfo,
+    get_mediapipe_model_info,
+)
+from skellytracker.trackers.base_tracker.tracked_object import TrackedObject
+from skellytracker.trackers.mediapipe_tracker.mediapipe_holistic_recorder import (
+    MediapipeHolisticRecorder,
 )
 from skellytracker.trackers.mediapipe_tracker.mediapipe_holistic_tracker import (
     MediapipeHolisticTracker,
@@ -122,3 +129,89 @@ def test_record(test_image):
     assert np.allclose(
         processed_results[:, :60, :], expected_results[:, :60, :], atol=1
     )
+
+
+def test_reduced_model_info_layout():
+    assert get_mediapipe_model_info(["body", "hands", "face"]) is MediapipeModelInfo
+
+    body_and_hands = get_mediapipe_model_info(["body", "hands"])
+    assert body_and_hands.num_tracked_points == 75
+    assert body_and_hands.num_tracked_points_face == 0
+    assert body_and_hands.landmark_groups == {
+        "body": (0, 33),
+        "right_hand": (33, 54),
+        "left_hand": (54, 75),
+    }
+    assert body_and_hands.get_point_names() == MediapipeModelInfo.point_names[:75]
+
+    face = get_mediapipe_model_info(["face"])
+    assert face.landmark_groups == {"face": (0, 478)}
+    assert face.tracked_object_names == ["face_landmarks"]
+    assert face.segment_connections is None
+
+    with pytest.raises(ValueError):
+        get_mediapipe_model_info(["feet"])
+
+
+@pytest.mark.usefixtures("test_image")
+def test_record_without_face(test_image):
+    tracker = MediapipeHolisticTracker(
+        model_complexity=0, landmark_groups=["body", "hands"]
+    )
+    tracked_objects = tracker.process_image(test_image)
+    assert "face_landmarks" not in tracked_objects
+    tracker.recorder.record(tracked_objects=tracked_objects)
+
+    processed_results = tracker.recorder.process_tracked_objects(
+        image_size=test_image.shape[:2]
+    )
+    assert processed_results.shape == (1, 75, 3)
+
+    full_tracker = MediapipeHolisticTracker(model_complexity=0)
+    full_tracker.recorder.record(
+        tracked_objects=full_tracker.process_image(test_image)
+    )
+    full_results = full_tracker.recorder.process_tracked_objects(
+        image_size=test_image.shape[:2]
+    )
+    assert np.allclose(
+        processed_results, full_results[:, :75], atol=1, equal_nan=True
+    )
+
+
+@pytest.mark.parametrize("landmark_groups", [["body", "hands", "face"], ["body", "face"]])
+def test_sparse_matches_dense(landmark_groups):
+    rng = np.random.default_rng(0)
+    # holistic without refined face landmarks detects 468 of the 478 face points
+    detected_points = {
+        "pose_landmarks": 33,
+        "right_hand_landmarks": 21,
+        "left_hand_landmarks": 21,
+        "face_landmarks": 468,
+    }
+    recorder = MediapipeHolisticRecorder(landmark_groups=landmark_groups)
+    for frame_index in range(5):
+        tracked_objects = {}
+        for name, number_of_points in detected_points.items():
+            tracked_objects[name] = TrackedObject(object_id=name)
+            detected = frame_index == 0 or rng.uniform() < 0.5
+            tracked_objects[name].extra["landmarks"] = (
+                SimpleNamespace(
+                    landmark=[
+                        SimpleNamespace(x=x, y=y, z=z)
+                        for x, y, z in rng.uniform(size=(number_of_points, 3))
+                    ]
+                )
+                if detected
+                else None
+            )
+        recorder.record(tracked_objects)
+
+    dense = recorder.process_tracked_objects(image_size=(640, 480))
+    sparse = recorder.process_tracked_objects_sparse(image_size=(640, 480))
+
+    assert dense.shape == (5, recorder.model_info.num_tracked_points, 3)
+    assert np.array_equal(sparse.to_dense(), dense, equal_nan=True)
+    face_start, face_stop = recorder.model_info.landmark_groups["face"]
+    assert np.isnan(dense[0, face_stop - 10 : face_stop]).all()
+    assert not np.isnan(dense[0, face_start : face_stop - 10]).any()
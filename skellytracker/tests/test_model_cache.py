@@ -0,0 +1,143 @@
+import functools
+import hashlib
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from skellytracker.system import model_cache
+
+
+@pytest.fixture()
+def model_server(tmp_path: Path, monkeypatch):
+    """
+    Serve a fake model over local HTTP and point the model cache at a temporary folder.
+    """
+    served_folder = tmp_path / "served"
+    served_folder.mkdir()
+    (served_folder / "fake_model.pt").write_bytes(b"weights" * 1000)
+
+    requested_paths = []
+
+    class RecordingHandler(SimpleHTTPRequestHandler):
+        def do_GET(self):
+            requested_paths.append(self.path)
+            super().do_GET()
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", 0),
+        functools.partial(RecordingHandler, directory=str(served_folder)),
+    )
+    server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+    server_thread.start()
+
+    monkeypatch.setenv("SKELLYTRACKER_MODELS_FOLDER", str(tmp_path / "models"))
+    monkeypatch.delenv(model_cache.OFFLINE_ENVIRONMENT_VARIABLE, raising=False)
+    monkeypatch.setitem(
+        model_cache.MODEL_URLS,
+        "fake_model.pt",
+        f"http://127.0.0.1:{server.server_address[1]}/fake_model.pt",
+    )
+    yield requested_paths
+    server.shutdown()
+    server.server_close()
+
+
+def test_model_is_downloaded_once_and_recorded(model_server, tmp_path):
+    model_path = model_cache.get_model_path("fake_model.pt")
+
+    assert model_path == tmp_path / "models" / "fake_model.pt"
+    assert model_path.read_bytes() == b"weights" * 1000
+    assert model_cache.load_model_manifest()["fake_model.pt"]["sha256"] == (
+        model_cache.compute_sha256(model_path)
+    )
+
+    assert model_cache.get_model_path("fake_model.pt") == model_path
+    assert model_server == ["/fake_model.pt"]
+
+
+def test_offline_mode_fails_fast_without_cached_model(model_server, monkeypatch):
+    monkeypatch.setenv(model_cache.OFFLINE_ENVIRONMENT_VARIABLE, "1")
+
+    with pytest.raises(FileNotFoundError, match="offline mode"):
+        model_cache.get_model_path("fake_model.pt")
+    assert model_server == []
+
+    model_cache.prefetch_models(["fake_model.pt"])
+    assert model_cache.get_model_path("fake_model.pt").exists()
+
+
+def test_verify_detects_corrupted_model(model_server):
+    model_path = model_cache.get_model_path("fake_model.pt")
+    assert model_cache.verify_models() == {"fake_model.pt": model_cache.UNPINNED}
+
+    model_path.write_bytes(b"corrupted" * 1000)
+    assert model_cache.verify_models(["fake_model.pt", "yolo11n.pt"]) == {
+        "fake_model.pt": model_cache.CORRUPTED,
+        "yolo11n.pt": model_cache.MISSING,
+    }
+
+
+def test_models_are_verified_on_load(model_server, tmp_path):
+    model_path = model_cache.get_model_path("fake_model.pt")
+    # same size, so only the checksum tells the corruption apart
+    model_path.write_bytes(b"WEIGHTS" * 1000)
+
+    assert model_cache.get_model_path("fake_model.pt").read_bytes() == b"weights" * 1000
+    assert model_server == ["/fake_model.pt", "/fake_model.pt"]
+
+
+def test_models_without_a_known_checksum_are_not_trusted(model_server, tmp_path, monkeypatch):
+    model_path = tmp_path / "models" / "fake_model.pt"
+    model_path.parent.mkdir(parents=True)
+    model_path.write_bytes(b"copied by hand")
+
+    assert model_cache.verify_models(["fake_model.pt"]) == {"fake_model.pt": model_cache.UNKNOWN}
+    assert model_cache.load_model_manifest() == {}
+    monkeypatch.setenv(model_cache.OFFLINE_ENVIRONMENT_VARIABLE, "1")
+    with pytest.raises(ValueError, match="could not be verified"):
+        model_cache.get_model_path("fake_model.pt")
+
+    monkeypatch.setitem(
+        model_cache.MODEL_SHA256, "fake_model.pt", model_cache.compute_sha256(model_path)
+    )
+    assert model_cache.get_model_path("fake_model.pt") == model_path
+    assert model_cache.verify_models(["fake_model.pt"]) == {"fake_model.pt": model_cache.VERIFIED}
+    assert model_server == []
+
+
+def test_pinned_models_are_not_recorded_in_the_manifest(model_server, tmp_path, monkeypatch):
+    monkeypatch.setitem(
+        model_cache.MODEL_SHA256, "fake_model.pt", hashlib.sha256(b"weights" * 1000).hexdigest()
+    )
+
+    model_cache.get_model_path("fake_model.pt")
+    assert model_cache.load_model_manifest() == {}
+    assert model_cache.verify_models() == {"fake_model.pt": model_cache.VERIFIED}
+
+
+def test_downloads_must_match_the_pinned_checksum(model_server, tmp_path, monkeypatch):
+    monkeypatch.setitem(model_cache.MODEL_SHA256, "fake_model.pt", "0" * 64)
+
+    with pytest.raises(ValueError, match="expected 0000"):
+        model_cache.get_model_path("fake_model.pt")
+    assert not (tmp_path / "models" / "fake_model.pt").exists()
+
+
+def test_models_cached_under_a_legacy_name_are_renamed(model_server, tmp_path, monkeypatch):
+    monkeypatch.setitem(model_cache.LEGACY_MODEL_NAMES, "old_fake_model.pt", "fake_model.pt")
+    monkeypatch.setenv(model_cache.OFFLINE_ENVIRONMENT_VARIABLE, "1")
+    legacy_path = tmp_path / "models" / "old_fake_model.pt"
+    legacy_path.parent.mkdir(parents=True)
+    legacy_path.write_bytes(b"weights" * 1000)
+    model_cache.record_model_in_manifest("old_fake_model.pt", legacy_path)
+
+    model_path = model_cache.get_model_path("old_fake_model.pt")
+    assert model_path == tmp_path / "models" / "fake_model.pt"
+    assert not legacy_path.exists()
+    assert list(model_cache.load_model_manifest()) == ["fake_model.pt"]
+    assert model_server == []
@@ -0,0 +1,85 @@
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+from skellytracker.multi_camera_live_runner import MultiCameraLiveRunner
+from skellytracker.trackers.bright_point_tracker.brightest_point_tracker import (
+    BrightestPointTracker,
+)
+from skellytracker.trackers.demo_viewers.latest_frame_capture import (
+    PacedVideoCapture,
+)
+
+NUMBER_OF_FRAMES = 15
+
+
+@pytest.fixture()
+def camera_video_paths(tmp_path: Path) -> list:
+    video_paths = []
+    for camera_index in range(2):
+        video_path = tmp_path / f"camera_{camera_index}.mp4"
+        video_writer = cv2.VideoWriter(
+            str(video_path), cv2.VideoWriter.fourcc(*"mp4v"), 30, (160, 120)
+        )
+        for frame_number in range(NUMBER_OF_FRAMES):
+            image = np.zeros((120, 160, 3), dtype=np.uint8)
+            cv2.circle(
+                image,
+                (20 + 5 * frame_number, 30 + 40 * camera_index),
+                6,
+                (255, 255, 255),
+                -1,
+            )
+            video_writer.write(image)
+        video_writer.release()
+        video_paths.append(video_path)
+    return video_paths
+
+
+def test_paced_video_capture_plays_at_native_fps(camera_video_paths):
+    cap = PacedVideoCapture(camera_video_paths[0])
+    start_time = time.perf_counter()
+    frames_read = 0
+    while cap.read()[0]:
+        frames_read += 1
+    cap.release()
+
+    assert frames_read == NUMBER_OF_FRAMES
+    assert time.perf_counter() - start_time >= (NUMBER_OF_FRAMES - 1) / 30
+
+
+def test_runner_aligns_cameras_by_capture_time(camera_video_paths):
+    synchronized_frames = []
+    with MultiCameraLiveRunner(
+        tracker_factory=lambda: BrightestPointTracker(num_points=1),
+        capture_sources=camera_video_paths,
+        max_time_offset_ms=30,
+        max_latency_ms=500,
+    ) as runner:
+        while runner.is_running:
+            synchronized_frame = runner.get_synchronized_frame()
+            if synchronized_frame is not None:
+                synchronized_frames.append(synchronized_frame)
+            time.sleep(0.01)
+        latest = runner.get_latest()
+
+    assert synchronized_frames
+    assert sorted(latest) == [0, 1]
+    synchronized_frame = synchronized_frames[-1]
+    assert synchronized_frame.landmarks.shape == (2, 1, 2)
+    # the second camera's point is lower in the image
+    assert (
+        synchronized_frame.landmarks[1, 0, 1] > synchronized_frame.landmarks[0, 0, 1]
+    )
+    assert all(result.latency_ms >= 0 for result in latest.values())
+
+
+def test_runner_rejects_missing_source(tmp_path):
+    with pytest.raises(ValueError, match="Could not open"):
+        MultiCameraLiveRunner(
+            tracker_factory=BrightestPointTracker,
+            capture_sources=[tmp_path / "missing.mp4"],
+        )
@@ -0,0 +1,146 @@
+import errno
+import logging
+import socket
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+from skellytracker.trackers.base_tracker.network_frame_sink import (
+    TCPFrameReceiver,
+    TCPFrameSink,
+    UDPFrameReceiver,
+    UDPFrameSink,
+    decode_frame_message,
+    encode_frame_message,
+)
+from skellytracker.trackers.bright_point_tracker.brightest_point_tracker import (
+    BrightestPointTracker,
+)
+
+
+@pytest.fixture()
+def bright_point_video_path(tmp_path: Path) -> Path:
+    video_path = tmp_path / "bright_point.mp4"
+    video_writer = cv2.VideoWriter(
+        str(video_path), cv2.VideoWriter.fourcc(*"mp4v"), 30, (160, 120)
+    )
+    for frame_number in range(10):
+        image = np.zeros((120, 160, 3), dtype=np.uint8)
+        cv2.circle(image, (20 + 10 * frame_number, 60), 6, (255, 255, 255), -1)
+        video_writer.write(image)
+    video_writer.release()
+    return video_path
+
+
+def test_frame_message_round_trip():
+    frame_array = np.array([[1.5, 2.5, np.nan], [3.0, 4.0, 5.0]])
+    frame_message = decode_frame_message(
+        encode_frame_message(3, 1234, 41.125, frame_array)
+    )
+
+    assert frame_message.camera_id == 3
+    assert frame_message.frame_number == 1234
+    assert frame_message.timestamp_s == 41.125
+    assert frame_message.frame_array.dtype == np.float32
+    assert np.array_equal(frame_message.frame_array, frame_array, equal_nan=True)
+
+
+def test_udp_sink_streams_process_video(bright_point_video_path):
+    receiver = UDPFrameReceiver(port=0)
+    output_array = BrightestPointTracker().process_video(
+        bright_point_video_path,
+        use_tqdm=False,
+        frame_sinks=[UDPFrameSink(port=receiver.port, camera_id=2)],
+    )
+
+    frame_messages = []
+    while (frame_message := receiver.receive(timeout=0.5)) is not None:
+        frame_messages.append(frame_message)
+    receiver.close()
+
+    assert [frame_message.frame_number for frame_message in frame_messages] == list(
+        range(10)
+    )
+    assert all(frame_message.camera_id == 2 for frame_message in frame_messages)
+    assert np.allclose(
+        np.stack([frame_message.frame_array for frame_message in frame_messages]),
+        output_array,
+    )
+
+
+def test_udp_sink_without_listener_does_not_raise():
+    frame_sink = UDPFrameSink(port=9)
+    for frame_number in range(5):
+        frame_sink.write_frame(frame_number, frame_number / 30, np.zeros((3, 2)))
+    frame_sink.close()
+
+
+class UnreachableSocket:
+    def sendto(self, message: bytes, address) -> int:
+        raise OSError(errno.ENETUNREACH, "Network is unreachable")
+
+    def close(self) -> None:
+        pass
+
+
+def test_udp_sink_logs_other_send_errors_once(caplog):
+    frame_sink = UDPFrameSink(port=9)
+    frame_sink.socket.close()
+    frame_sink.socket = UnreachableSocket()
+    with caplog.at_level(logging.WARNING):
+        for frame_number in range(5):
+            frame_sink.write_frame(frame_number, frame_number / 30, np.zeros((3, 2)))
+    frame_sink.close()
+
+    assert frame_sink.dropped_frames == 5
+    assert frame_sink.send_errors == 5
+    assert (
+        len([record for record in caplog.records if "Could not send" in record.message])
+        == 1
+    )
+
+
+def test_tcp_receiver_resumes_message_cut_off_by_timeout():
+    server = socket.create_server(("127.0.0.1", 0))
+    receiver = TCPFrameReceiver(port=server.getsockname()[1])
+    connection, _ = server.accept()
+    messages = [
+        encode_frame_message(0, frame_number, frame_number / 30, np.ones((4, 3)))
+        for frame_number in range(2)
+    ]
+
+    connection.sendall(messages[0][:10])
+    assert receiver.receive(timeout=0.1) is None
+    connection.sendall(messages[0][10:] + messages[1])
+
+    assert receiver.receive(timeout=1).frame_number == 0
+    assert receiver.receive(timeout=1).frame_number == 1
+    connection.close()
+    receiver.close()
+    server.close()
+
+
+def test_tcp_sink_drops_frames_for_slow_client():
+    frame_sink = TCPFrameSink(port=0, max_queued_frames=2)
+    receiver = TCPFrameReceiver(port=frame_sink.port)
+    deadline = time.perf_counter() + 2
+    while not frame_sink.clients and time.perf_counter() < deadline:
+        time.sleep(0.01)
+
+    # large frames fill the socket buffers, so the sink has to drop frames while the client is not reading
+    frame_array = np.zeros((200_000, 3))
+    for frame_number in range(50):
+        frame_sink.write_frame(frame_number, frame_number / 30, frame_array)
+    assert frame_sink.dropped_frames > 0
+
+    frame_numbers = []
+    while (frame_message := receiver.receive(timeout=0.5)) is not None:
+        frame_numbers.append(frame_message.frame_number)
+    receiver.close()
+    frame_sink.close()
+
+    assert frame_numbers == sorted(frame_numbers)
+    assert frame_numbers[-1] == 49
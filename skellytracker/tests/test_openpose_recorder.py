@@ -0,0 +1,112 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from skellytracker.trackers.openpose_tracker.openpose_model_info import (
+    OpenPoseModelInfo,
+)
+from skellytracker.trackers.openpose_tracker.openpose_recorder import (
+    OpenPoseRecorder,
+)
+
+
+def write_openpose_json(json_directory: Path, frame_index: int, value: float) -> None:
+    person = {
+        "pose_keypoints_2d": [value] * OpenPoseModelInfo.num_tracked_points_body * 3,
+        "hand_left_keypoints_2d": [value] * OpenPoseModelInfo.num_tracked_points_left_hand * 3,
+        "hand_right_keypoints_2d": [value] * OpenPoseModelInfo.num_tracked_points_right_hand * 3,
+        "face_keypoints_2d": [value] * OpenPoseModelInfo.num_tracked_points_face * 3,
+    }
+    # frame 3 has nobody in it
+    people = [] if frame_index == 3 else [person]
+    json_path = json_directory / f"video_{frame_index:012d}_keypoints.json"
+    json_path.write_text(json.dumps({"version": 1.3, "people": people}))
+
+
+@pytest.fixture()
+def json_directory(tmp_path: Path) -> Path:
+    json_directory = tmp_path / "openpose_jsons" / "video"
+    json_directory.mkdir(parents=True)
+    for frame_index in range(12):
+        write_openpose_json(json_directory, frame_index, float(frame_index))
+    return json_directory
+
+
+def test_extract_frame_index():
+    recorder = OpenPoseRecorder()
+    assert recorder.extract_frame_index("cam_1_000000000042_keypoints.json") == 42
+    assert recorder.extract_frame_index("cam_000000000007_keypoints_old.json") == 7
+    assert recorder.extract_frame_index("notes.json") is None
+
+
+def test_parse_openpose_jsons_orders_frames(json_directory):
+    recorder = OpenPoseRecorder(track_hands=True, track_faces=True, num_workers=4)
+    data_array = recorder.parse_openpose_jsons(json_directory)
+
+    assert data_array.shape == (12, OpenPoseModelInfo.num_tracked_points, 3)
+    assert np.isnan(data_array[3]).all()
+    for frame_index in [0, 1, 2, 4, 11]:
+        assert (data_array[frame_index] == frame_index).all()
+
+
+def test_keypoints_cache_is_reused_and_invalidated(json_directory):
+    recorder = OpenPoseRecorder(track_hands=True, track_faces=True)
+    first_array = recorder.parse_openpose_jsons(json_directory)
+
+    cache_path = recorder.get_cache_path(json_directory)
+    assert cache_path.parent == json_directory.parent
+    assert cache_path.exists()
+
+    cached_mtime = cache_path.stat().st_mtime_ns
+    assert np.array_equal(
+        recorder.parse_openpose_jsons(json_directory), first_array, equal_nan=True
+    )
+    assert cache_path.stat().st_mtime_ns == cached_mtime
+
+    write_openpose_json(json_directory, 12, 12.0)
+    updated_array = recorder.parse_openpose_jsons(json_directory)
+    assert updated_array.shape[0] == 13
+    assert (updated_array[12] == 12).all()
+
+    body_only_array = OpenPoseRecorder().parse_openpose_jsons(json_directory)
+    assert body_only_array.shape == (13, OpenPoseModelInfo.num_tracked_points_body, 3)
+
+
+def test_process_tracked_objects_sparse(json_directory):
+    recorder = OpenPoseRecorder(track_hands=True, track_faces=False)
+    sparse = recorder.process_tracked_objects_sparse(output_json_path=json_directory)
+
+    assert sparse.group_names == ["body", "left_hand", "right_hand"]
+    assert not sparse.validity[3].any()
+    assert sparse.validity[[0, 1, 2, 4, 11]].all()
+    assert np.array_equal(
+        sparse.to_dense(),
+        recorder.process_tracked_objects(output_json_path=json_directory),
+        equal_nan=True,
+    )
+
+
+@pytest.mark.parametrize(
+    "partial_contents",
+    [
+        b'{"version": 1.3, "people": [{"pose_keypoints_2d": [1.0, 2.0',
+        # cut off inside a multibyte character
+        '{"version": 1.3, "n\u00e4me": "'.encode("utf-8") + "\u00e4".encode("utf-8")[:1],
+        # a keypoint list that is not a multiple of three values
+        b'{"version": 1.3, "people": [{"pose_keypoints_2d": [1.0, 2.0, 3.0, 4.0]}]}',
+    ],
+    ids=["truncated", "multibyte_character", "keypoint_list"],
+)
+def test_partially_written_json_is_retried(json_directory, partial_contents):
+    recorder = OpenPoseRecorder(track_hands=True, track_faces=True)
+    json_path = json_directory / "video_000000000000_keypoints.json"
+    json_path.write_bytes(partial_contents)
+
+    assert recorder.try_load_keypoints_file(json_path, final_sweep=False) == (
+        False,
+        None,
+    )
+    with pytest.raises(ValueError):
+        recorder.try_load_keypoints_file(json_path, final_sweep=True)
@@ -0,0 +1,164 @@
+import os
+import stat
+import sys
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+from skellytracker.trackers.openpose_tracker.openpose_model_info import (
+    OpenPoseModelInfo,
+)
+from skellytracker.trackers.openpose_tracker.openpose_tracker import (
+    OpenPoseTracker,
+    resolve_openpose_executable,
+)
+
+NUMBER_OF_FRAMES = 10
+
+STUB_OPENPOSE = """#!{python}
+import json
+import sys
+import time
+from pathlib import Path
+
+arguments = sys.argv[1:]
+json_directory = Path(arguments[arguments.index("--write_json") + 1])
+person = {{"pose_keypoints_2d": [], "hand_left_keypoints_2d": [], "hand_right_keypoints_2d": [], "face_keypoints_2d": []}}
+for frame_index in range({number_of_frames}):
+    person["pose_keypoints_2d"] = [float(frame_index)] * {body} * 3
+    person["hand_left_keypoints_2d"] = [float(frame_index)] * 21 * 3
+    person["hand_right_keypoints_2d"] = [float(frame_index)] * 21 * 3
+    person["face_keypoints_2d"] = [float(frame_index)] * 70 * 3
+    text = json.dumps({{"version": 1.3, "people": [person]}})
+    json_path = json_directory / f"video_{{frame_index:012d}}_keypoints.json"
+    # write in two halves so the tracker can see partially written files
+    with open(json_path, "w") as f:
+        f.write(text[: len(text) // 2])
+        f.flush()
+        time.sleep(0.02)
+        f.write(text[len(text) // 2 :])
+sys.exit({exit_code})
+"""
+
+
+def create_stub_openpose(openpose_root: Path, exit_code: int = 0) -> None:
+    executable_path = openpose_root / "bin" / "OpenPoseDemo.exe"
+    executable_path.parent.mkdir(parents=True)
+    executable_path.write_text(
+        STUB_OPENPOSE.format(
+            python=sys.executable,
+            number_of_frames=NUMBER_OF_FRAMES,
+            body=OpenPoseModelInfo.num_tracked_points_body,
+            exit_code=exit_code,
+        )
+    )
+    executable_path.chmod(executable_path.stat().st_mode | stat.S_IEXEC)
+
+
+@pytest.fixture()
+def input_video_path(tmp_path: Path) -> Path:
+    video_path = tmp_path / "synchronized_videos" / "video.mp4"
+    video_path.parent.mkdir()
+    video_writer = cv2.VideoWriter(
+        str(video_path), cv2.VideoWriter.fourcc(*"mp4v"), 30, (64, 48)
+    )
+    for _ in range(NUMBER_OF_FRAMES):
+        video_writer.write(np.zeros((48, 64, 3), dtype=np.uint8))
+    video_writer.release()
+    return video_path
+
+
+@pytest.mark.skipif(os.name == "nt", reason="stub executable relies on a shebang")
+def test_incremental_ingestion_matches_batch_parsing(tmp_path, input_video_path):
+    openpose_root = tmp_path / "openpose"
+    create_stub_openpose(openpose_root)
+    tracker = OpenPoseTracker(
+        openpose_root_folder_path=openpose_root,
+        output_json_folder_path=tmp_path / "jsons",
+        incremental_ingestion=True,
+        ingestion_poll_interval_seconds=0.01,
+    )
+
+    output_array = tracker.process_video(
+        input_video_path, tmp_path / "video_openpose.avi", use_tqdm=False
+    )
+
+    assert output_array.shape == (
+        NUMBER_OF_FRAMES,
+        OpenPoseModelInfo.num_tracked_points,
+        3,
+    )
+    for frame_index in range(NUMBER_OF_FRAMES):
+        assert (output_array[frame_index] == frame_index).all()
+
+    tracker.recorder.use_cache = False
+    batch_array = tracker.recorder.parse_openpose_jsons(tmp_path / "jsons" / "video")
+    assert np.array_equal(output_array, batch_array)
+
+
+@pytest.mark.skipif(os.name == "nt", reason="stub executable relies on a shebang")
+def test_incremental_ingestion_reports_openpose_failure(
+    tmp_path, input_video_path, caplog
+):
+    openpose_root = tmp_path / "openpose"
+    create_stub_openpose(openpose_root, exit_code=1)
+    tracker = OpenPoseTracker(
+        openpose_root_folder_path=openpose_root,
+        output_json_folder_path=tmp_path / "jsons",
+        incremental_ingestion=True,
+        ingestion_poll_interval_seconds=0.01,
+    )
+
+    assert (
+        tracker.process_video(
+            input_video_path, tmp_path / "video_openpose.avi", use_tqdm=False
+        )
+        is None
+    )
+    assert any(
+        record.levelname == "ERROR" and "OpenPose failed" in record.message
+        for record in caplog.records
+    )
+
+
+def test_resolve_openpose_executable_on_linux_build(tmp_path, monkeypatch):
+    monkeypatch.setenv("PATH", "")
+    with pytest.raises(FileNotFoundError):
+        resolve_openpose_executable(tmp_path)
+
+    linux_executable = tmp_path / "build" / "examples" / "openpose" / "openpose.bin"
+    linux_executable.parent.mkdir(parents=True)
+    linux_executable.touch()
+    assert resolve_openpose_executable(tmp_path) == linux_executable
+
+    custom_executable = tmp_path / "custom" / "openpose"
+    custom_executable.parent.mkdir()
+    custom_executable.touch()
+    assert (
+        resolve_openpose_executable(tmp_path, Path("custom") / "openpose")
+        == custom_executable
+    )
+
+
+def test_data_only_mode_skips_rendering(tmp_path):
+    create_stub_openpose(tmp_path)
+    command_arguments = dict(
+        input_video_filepath="video.mp4",
+        output_video_filepath="video_openpose.avi",
+        json_output_path=tmp_path / "jsons",
+    )
+
+    rendering_command = OpenPoseTracker(
+        openpose_root_folder_path=tmp_path
+    ).build_openpose_command(**command_arguments)
+    assert "--write_video" in rendering_command
+    assert "--render_pose" not in rendering_command
+
+    data_only_command = OpenPoseTracker(
+        openpose_root_folder_path=tmp_path, write_video=False
+    ).build_openpose_command(**command_arguments)
+    assert "--write_video" not in data_only_command
+    assert data_only_command[data_only_command.index("--render_pose") + 1] == "0"
+    assert data_only_command[data_only_command.index("--display") + 1] == "0"
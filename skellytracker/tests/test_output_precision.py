@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from skellytracker.trackers.base_tracker.output_precision import (
+    OutputPrecision,
+    get_precision_sidecar_path,
+    load_tracking_array,
+    save_tracking_array,
+)
+from skellytracker.trackers.base_tracker.base_tracking_params import (
+    BaseTrackingParams,
+)
+from skellytracker.trackers.bright_point_tracker.brightest_point_recorder import (
+    BrightestPointRecorder,
+)
+from skellytracker.trackers.mediapipe_blendshape_tracker.mediapipe_blendshape_recorder import (
+    MediapipeBlendshapeRecorder,
+)
+from skellytracker.trackers.base_tracker.tracked_object import TrackedObject
+
+
+@pytest.fixture()
+def tracking_data() -> np.ndarray:
+    tracking_data = np.random.default_rng(0).uniform(0, 1920, size=(10, 5, 2))
+    tracking_data[3, 1] = np.nan
+    return tracking_data
+
+
+@pytest.mark.parametrize("dtype", ["int16", "int32"])
+def test_fixed_point_round_trip(tracking_data, dtype):
+    output_precision = OutputPrecision(dtype=dtype)
+    encoded = output_precision.encode(tracking_data)
+
+    assert encoded.dtype == np.dtype(dtype)
+    assert (encoded[3, 1] == output_precision.missing_value).all()
+
+    decoded = output_precision.decode(encoded)
+    assert np.isnan(decoded[3, 1]).all()
+    assert np.nanmax(np.abs(decoded - tracking_data)) <= 0.5 / output_precision.scale
+
+
+def test_saved_fixed_point_array_loads_as_floats(tracking_data, tmp_path):
+    file_path = tmp_path / "tracking_data.npy"
+    save_tracking_array(
+        file_path,
+        OutputPrecision(dtype="int16").encode(tracking_data),
+        OutputPrecision(dtype="int16"),
+    )
+
+    assert np.load(file_path).dtype == np.int16
+    assert get_precision_sidecar_path(file_path).exists()
+    assert np.allclose(load_tracking_array(file_path), tracking_data, atol=1 / 16, equal_nan=True)
+
+
+def test_recorder_outputs_requested_dtype():
+    recorder = BrightestPointRecorder(output_precision=OutputPrecision(dtype="float32"))
+    recorder.record(
+        {"brightest_point_0": TrackedObject("brightest_point_0", pixel_x=12.25, pixel_y=3.5)}
+    )
+
+    output_array = recorder.process_tracked_objects()
+    assert output_array.dtype == np.float32
+    assert output_array.tolist() == [[[12.25, 3.5]]]
+
+
+def test_recorders_use_their_own_fixed_point_scales():
+    class UnitIntervalRecorder(BrightestPointRecorder):
+        fixed_point_scales = {"int16": 2.0**14, "int32": 2.0**30}
+
+    recorder = UnitIntervalRecorder()
+    recorder.output_precision = OutputPrecision.from_params(
+        BaseTrackingParams(output_dtype="int16"),
+        default_scales=recorder.fixed_point_scales,
+    )
+    assert recorder.output_precision.scale == 2.0**14
+    assert OutputPrecision(dtype="int16").scale == 8.0
+
+    # blendshape scores are not pixels, pixel scales would quantize them to 1/8
+    with pytest.raises(ValueError, match="fixed point"):
+        MediapipeBlendshapeRecorder(output_precision=OutputPrecision(dtype="int16"))
+
+
+def test_saving_floats_removes_a_stale_sidecar(tracking_data, tmp_path):
+    file_path = tmp_path / "tracking.npy"
+    int16_precision = OutputPrecision(dtype="int16")
+    save_tracking_array(file_path, int16_precision.encode(tracking_data), int16_precision)
+    save_tracking_array(file_path, tracking_data, OutputPrecision())
+
+    assert not get_precision_sidecar_path(file_path).exists()
+    assert np.array_equal(load_tracking_array(file_path), tracking_data, equal_nan=True)
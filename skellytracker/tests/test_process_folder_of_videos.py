@@ -0,0 +1,169 @@
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+from skellytracker import process_folder_of_videos
+from skellytracker.process_folder_of_videos import process_list_of_videos
+from skellytracker.trackers.base_tracker.base_tracking_params import (
+    BaseTrackingParams,
+)
+from skellytracker.trackers.base_tracker.model_info import ModelInfo
+from skellytracker.trackers.base_tracker.output_precision import load_tracking_array
+from skellytracker.utilities.chunked_tracking_store import ChunkedTrackingStore
+
+
+class BrightestPointModelInfo(ModelInfo):
+    name = "brightest_point"
+    tracker_name = "BrightestPointTracker"
+    landmark_names = ["brightest_point"]
+    num_tracked_points = 1
+
+
+def write_moving_point_video(video_path: Path, number_of_frames: int, offset: int):
+    video_writer = cv2.VideoWriter(
+        str(video_path), cv2.VideoWriter.fourcc(*"mp4v"), 30, (160, 120)
+    )
+    for frame_number in range(number_of_frames):
+        image = np.zeros((120, 160, 3), dtype=np.uint8)
+        cv2.circle(image, (20 + 3 * frame_number, 40 + offset), 6, (255, 255, 255), -1)
+        video_writer.write(image)
+    video_writer.release()
+
+
+@pytest.fixture()
+def synchronized_videos_path(tmp_path: Path) -> Path:
+    synchronized_videos_path = tmp_path / "synchronized_videos"
+    synchronized_videos_path.mkdir()
+    for camera_index in range(2):
+        write_moving_point_video(
+            synchronized_videos_path / f"camera_{camera_index}.mp4",
+            number_of_frames=20,
+            offset=20 * camera_index,
+        )
+    return synchronized_videos_path
+
+
+def test_cameras_are_written_into_output_file(synchronized_videos_path, tmp_path):
+    video_paths = sorted(synchronized_videos_path.glob("*.mp4"))
+    combined_array = process_list_of_videos(
+        model_info=BrightestPointModelInfo(),
+        tracking_params=BaseTrackingParams(),
+        video_paths=video_paths,
+        output_folder_path=tmp_path / "output",
+        num_processes=1,
+    )
+
+    output_path = tmp_path / "output" / "brightest_point_2dData_numCams_numFrames_numTrackedPoints_pixelXY.npy"
+    saved_array = load_tracking_array(output_path)
+    assert isinstance(combined_array, np.memmap)
+    assert combined_array.shape == (2, 20, 1, 2)
+    assert np.array_equal(saved_array, combined_array)
+    # the second camera's point is lower in the image
+    assert (saved_array[1, :, 0, 1] > saved_array[0, :, 0, 1]).all()
+
+
+def test_chunked_output_is_streamed_to_the_store(synchronized_videos_path, tmp_path):
+    video_paths = sorted(synchronized_videos_path.glob("*.mp4"))
+    # a rerun replaces the store of the first run instead of appending to it
+    for _ in range(2):
+        store = process_list_of_videos(
+            model_info=BrightestPointModelInfo(),
+            tracking_params=BaseTrackingParams(),
+            video_paths=video_paths,
+            output_folder_path=tmp_path / "output",
+            num_processes=1,
+            output_format="chunked",
+        )
+
+    store_paths = list((tmp_path / "output").glob("*.chunks"))
+    assert store_paths == [store.store_path]
+    # the returned store reads the saved data lazily
+    assert isinstance(store, ChunkedTrackingStore)
+    assert store.shape == (2, 20, 1, 2)
+    assert store.metadata["video_names"] == ["camera_0.mp4", "camera_1.mp4"]
+    npy_array = process_list_of_videos(
+        model_info=BrightestPointModelInfo(),
+        tracking_params=BaseTrackingParams(),
+        video_paths=video_paths,
+        output_folder_path=tmp_path / "npy_output",
+        num_processes=1,
+    )
+    assert np.array_equal(store.to_array(), npy_array)
+
+
+def test_mismatched_frame_counts_fail_before_processing(
+    synchronized_videos_path, tmp_path
+):
+    write_moving_point_video(
+        synchronized_videos_path / "camera_2.mp4", number_of_frames=15, offset=40
+    )
+    video_paths = sorted(synchronized_videos_path.glob("*.mp4"))
+
+    with pytest.raises(ValueError, match="camera_2.mp4: 15"):
+        process_list_of_videos(
+            model_info=BrightestPointModelInfo(),
+            tracking_params=BaseTrackingParams(),
+            video_paths=video_paths,
+            output_folder_path=tmp_path / "output",
+            num_processes=1,
+        )
+
+    assert not list((tmp_path / "output").glob("*.npy"))
+    assert not list((tmp_path / "brightest_point_annotated_videos").glob("*.mp4"))
+
+
+def test_model_info_must_match_the_tracked_points(synchronized_videos_path, tmp_path):
+    class ThreePointModelInfo(BrightestPointModelInfo):
+        num_tracked_points = 3
+
+    with pytest.raises(ValueError, match="produced 1 points"):
+        process_list_of_videos(
+            model_info=ThreePointModelInfo(),
+            tracking_params=BaseTrackingParams(),
+            video_paths=sorted(synchronized_videos_path.glob("*.mp4")),
+            output_folder_path=tmp_path / "output",
+            num_processes=1,
+            output_format="chunked",
+        )
+
+
+@pytest.mark.parametrize("output_format", ["npy", "chunked"])
+def test_failing_camera_keeps_the_previous_output(
+    synchronized_videos_path, tmp_path, monkeypatch, output_format
+):
+    video_paths = sorted(synchronized_videos_path.glob("*.mp4"))
+
+    def process_videos():
+        return process_list_of_videos(
+            model_info=BrightestPointModelInfo(),
+            tracking_params=BaseTrackingParams(),
+            video_paths=video_paths,
+            output_folder_path=tmp_path / "output",
+            num_processes=1,
+            output_format=output_format,
+        )
+
+    previous_output = np.array(process_videos())
+    output_paths = sorted((tmp_path / "output").iterdir())
+
+    process_indexed_video = process_folder_of_videos.process_indexed_video
+
+    def fail_second_camera(indexed_task):
+        camera_index, camera_array = process_indexed_video(indexed_task)
+        return camera_index, None if camera_index == 1 else camera_array
+
+    monkeypatch.setattr(
+        process_folder_of_videos, "process_indexed_video", fail_second_camera
+    )
+    with pytest.raises(ValueError, match="No tracking data was returned for camera_1.mp4"):
+        process_videos()
+
+    # no partial output is left next to the previous output, which is untouched
+    assert sorted((tmp_path / "output").iterdir()) == output_paths
+    monkeypatch.undo()
+    if output_format == "chunked":
+        assert np.array_equal(ChunkedTrackingStore(output_paths[0]).to_array(), previous_output)
+    else:
+        assert np.array_equal(load_tracking_array(output_paths[0]), previous_output)
@@ -0,0 +1,82 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from skellytracker.trackers.base_tracker.output_precision import OutputPrecision
+from skellytracker.trackers.base_tracker.sparse_group_array import SparseGroupArray
+from skellytracker.trackers.base_tracker.tracked_object import TrackedObject
+from skellytracker.trackers.charuco_tracker.charuco_recorder import CharucoRecorder
+from skellytracker.trackers.openpose_tracker.openpose_model_info import (
+    OpenPoseModelInfo,
+)
+
+
+def make_intermittent_openpose_data() -> np.ndarray:
+    rng = np.random.default_rng(0)
+    dense = rng.uniform(0, 1000, size=(50, OpenPoseModelInfo.num_tracked_points, 3))
+    for group_name, (start, stop) in OpenPoseModelInfo.landmark_groups.items():
+        if group_name != "body":
+            dense[rng.uniform(size=50) < 0.6, start:stop] = np.nan
+    # partly missing groups are kept as they are
+    dense[4, 3] = np.nan
+    dense[7, 30, 1] = np.nan
+    return dense
+
+
+def test_dense_round_trip_is_lossless(tmp_path: Path):
+    dense = make_intermittent_openpose_data()
+    sparse = SparseGroupArray.from_dense(dense, OpenPoseModelInfo.landmark_groups)
+
+    assert np.array_equal(sparse.to_dense(), dense, equal_nan=True)
+    assert sparse.nbytes < dense.nbytes * 0.6
+    assert sparse.validity.shape == (50, 4)
+    assert sparse.validity[:, 0].all()
+    assert np.array_equal(sparse.get_group("face"), dense[:, 67:], equal_nan=True)
+
+    sparse.save(tmp_path / "openpose_2d.npz")
+    loaded = SparseGroupArray.load(tmp_path / "openpose_2d.npz")
+    assert loaded.group_names == ["body", "left_hand", "right_hand", "face"]
+    assert np.array_equal(loaded.to_dense(), dense, equal_nan=True)
+
+
+def test_fixed_point_round_trip():
+    output_precision = OutputPrecision(dtype="int16")
+    encoded = output_precision.encode(make_intermittent_openpose_data())
+    sparse = SparseGroupArray.from_dense(
+        encoded,
+        OpenPoseModelInfo.landmark_groups,
+        missing_value=output_precision.missing_value,
+    )
+
+    assert not sparse.validity.all()
+    assert np.array_equal(sparse.to_dense(), encoded)
+
+
+def test_groups_must_cover_every_point_once():
+    dense = np.zeros((2, 5, 2))
+    with pytest.raises(ValueError):
+        SparseGroupArray.from_dense(dense, {"a": (0, 3)})
+    with pytest.raises(ValueError):
+        SparseGroupArray.from_dense(dense, {"a": (0, 3), "b": (2, 5)})
+    assert SparseGroupArray.from_dense(dense).group_names == ["all"]
+
+
+def test_charuco_recorder_emits_sparse_corners():
+    recorder = CharucoRecorder(
+        tracked_object_names=[str(corner) for corner in range(4)]
+    )
+    for frame_index in range(6):
+        tracked_objects = {
+            str(corner): TrackedObject(object_id=str(corner)) for corner in range(4)
+        }
+        for corner in range(frame_index % 4):
+            tracked_objects[str(corner)].pixel_x = frame_index * 10.0 + corner
+            tracked_objects[str(corner)].pixel_y = frame_index * 20.0 + corner
+        recorder.record(tracked_objects)
+
+    sparse = recorder.process_tracked_objects_sparse()
+    assert sparse.validity.sum() == 0 + 1 + 2 + 3 + 0 + 1
+    assert np.array_equal(
+        sparse.to_dense(), recorder.process_tracked_objects(), equal_nan=True
+    )
@@ -0,0 +1,97 @@
+from typing import Tuple
+
+import numpy as np
+import pytest
+
+from skellytracker.post_processing.temporal_filters import (
+    apply_temporal_filter,
+    butterworth_filter,
+    butterworth_lowpass_coefficients,
+    interpolate_gaps,
+    median_filter,
+    one_euro_filter,
+)
+
+SAMPLING_RATE_HZ = 30.0
+
+
+@pytest.fixture()
+def tracking_data() -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Clean and noisy (cams, frames, points, dims) data of points moving on a slow sine wave, the noisy data has a gap.
+    """
+    times = np.arange(300) / SAMPLING_RATE_HZ
+    clean = np.sin(2 * np.pi * 0.1 * times)[np.newaxis, :, np.newaxis, np.newaxis]
+    clean = np.broadcast_to(clean * 20 + 500, (2, 300, 4, 2))
+    noisy = clean + np.random.default_rng(0).normal(scale=2.0, size=clean.shape)
+    noisy[1, 100:110, 2] = np.nan
+    return clean, noisy
+
+
+def test_butterworth_coefficients_match_reference_design():
+    # scipy.signal.butter(4, 6 / 15)
+    b, a = butterworth_lowpass_coefficients(6.0, SAMPLING_RATE_HZ, order=4)
+    assert np.allclose(
+        b, [0.04658291, 0.18633163, 0.27949744, 0.18633163, 0.04658291]
+    )
+    assert np.allclose(a, [1.0, -0.7820952, 0.67997853, -0.1826757, 0.03011888])
+
+
+def test_interpolate_gaps():
+    series = np.array([[np.nan, 1.0], [1.0, np.nan], [np.nan, np.nan], [3.0, 4.0]])
+    assert np.array_equal(
+        interpolate_gaps(series), [[1.0, 1.0], [1.0, 2.0], [2.0, 3.0], [3.0, 4.0]]
+    )
+
+
+@pytest.mark.parametrize(
+    "filter_name, filter_kwargs",
+    [
+        ("butterworth", {"cutoff_hz": 3.0}),
+        ("one_euro", {"min_cutoff_hz": 0.5, "beta": 0.05}),
+        ("median", {"window_frames": 7}),
+    ],
+)
+def test_filters_reduce_noise_and_keep_gaps(tracking_data, filter_name, filter_kwargs):
+    clean, noisy = tracking_data
+    filtered = apply_temporal_filter(
+        noisy, filter_name, SAMPLING_RATE_HZ, **filter_kwargs
+    )
+
+    assert filtered.shape == noisy.shape
+    assert np.array_equal(np.isnan(filtered), np.isnan(noisy))
+    noise_rms = np.sqrt(np.nanmean((noisy - clean) ** 2))
+    assert np.sqrt(np.nanmean((filtered - clean) ** 2)) < 0.6 * noise_rms
+
+
+def test_butterworth_is_zero_phase():
+    times = np.arange(300) / SAMPLING_RATE_HZ
+    signal = np.sin(2 * np.pi * 1.0 * times)[:, np.newaxis]
+    filtered = butterworth_filter(signal, SAMPLING_RATE_HZ, cutoff_hz=6.0, frame_axis=0)
+    assert np.abs(filtered - signal).max() < 0.01
+
+
+def test_butterworth_rejects_series_shorter_than_padding():
+    # order 4 gives 5 coefficients, so filtfilt pads 15 frames on each side
+    with pytest.raises(ValueError):
+        butterworth_filter(np.zeros((15, 2)), SAMPLING_RATE_HZ, frame_axis=0)
+    filtered = butterworth_filter(np.ones((16, 2)), SAMPLING_RATE_HZ, frame_axis=0)
+    assert np.allclose(filtered, 1.0)
+
+
+def test_one_euro_beta_reduces_lag():
+    step = np.repeat([0.0, 100.0], 30)[:, np.newaxis]
+    smooth = one_euro_filter(step, SAMPLING_RATE_HZ, beta=0.0, frame_axis=0)
+    responsive = one_euro_filter(step, SAMPLING_RATE_HZ, beta=1.0, frame_axis=0)
+    assert responsive[35, 0] > smooth[35, 0]
+
+
+def test_median_filter_removes_single_frame_outlier():
+    series = np.full((20, 1), 10.0)
+    series[8] = 1000.0
+    assert np.array_equal(median_filter(series, window_frames=3, frame_axis=0), np.full((20, 1), 10.0))
+
+
+def test_median_filter_rejects_even_window():
+    with pytest.raises(ValueError):
+        median_filter(np.zeros((10, 1)), window_frames=4, frame_axis=0)
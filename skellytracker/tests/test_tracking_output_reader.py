@@ -0,0 +1,79 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from skellytracker.trackers.base_tracker.output_precision import (
+    OutputPrecision,
+    save_tracking_array,
+)
+from skellytracker.trackers.openpose_tracker.openpose_model_info import (
+    OpenPoseModelInfo,
+)
+from skellytracker.trackers.yolo_tracker.yolo_model_info import YOLOModelInfo
+from skellytracker.utilities.tracking_output_reader import TrackingOutputReader
+
+
+@pytest.fixture
+def openpose_output(tmp_path: Path):
+    data = np.random.default_rng(0).uniform(
+        0, 1000, size=(3, 40, OpenPoseModelInfo.num_tracked_points, 3)
+    )
+    file_path = tmp_path / "openpose_2d.npy"
+    np.save(file_path, data)
+    return file_path, data
+
+
+def test_group_and_landmark_views(openpose_output):
+    file_path, data = openpose_output
+    reader = TrackingOutputReader(file_path, model_info=OpenPoseModelInfo)
+
+    body = reader.get_group("body", cameras=1, frames=(10, 20))
+    assert isinstance(reader.data, np.memmap)
+    assert np.shares_memory(body, reader.data)
+    assert np.array_equal(body, data[1, 10:20, :25])
+
+    face = reader.get_group("face")
+    assert face.shape == (3, 40, 70, 3)
+    assert np.array_equal(face, data[:, :, 67:])
+    assert reader.get_group_names("left_hand")[0] == "left_hand_0"
+
+    nose = reader.get_landmark("nose", frames=slice(0, 5))
+    assert np.shares_memory(nose, reader.data)
+    assert np.array_equal(nose, data[:, :5, 0])
+
+    shoulder_and_elbow = reader.select(landmarks=["right_shoulder", "right_elbow"])
+    assert np.shares_memory(shoulder_and_elbow, reader.data)
+    assert np.array_equal(shoulder_and_elbow, data[:, :, 2:4])
+
+    ears = reader.select(landmarks=["left_ear", "right_ear"])
+    assert np.array_equal(ears, data[:, :, [18, 17]])
+
+
+def test_single_video_output_and_errors(tmp_path: Path):
+    data = np.random.default_rng(0).uniform(0, 1000, size=(12, 17, 2))
+    file_path = tmp_path / "yolo_2d.npy"
+    np.save(file_path, data)
+    reader = TrackingOutputReader(file_path, model_info=YOLOModelInfo)
+
+    assert reader.number_of_cameras is None
+    assert np.array_equal(reader.get_landmark("left_knee", frames=3), data[3, 13])
+    with pytest.raises(ValueError):
+        reader.select(cameras=0)
+    with pytest.raises(KeyError):
+        reader.get_group("face")
+    with pytest.raises(ValueError):
+        TrackingOutputReader(file_path, model_info=OpenPoseModelInfo)
+
+
+def test_decodes_fixed_point_output(tmp_path: Path):
+    data = np.random.default_rng(0).uniform(0, 1000, size=(2, 5, 17, 2))
+    data[0, 1, 4] = np.nan
+    output_precision = OutputPrecision(dtype="int16")
+    file_path = tmp_path / "yolo_2d.npy"
+    save_tracking_array(file_path, output_precision.encode(data), output_precision)
+
+    reader = TrackingOutputReader(file_path, model_info=YOLOModelInfo)
+    decoded = reader.decode(reader.get_group("body", cameras=0))
+    assert np.isnan(decoded[1, 4]).all()
+    assert np.allclose(decoded, data[0], atol=1 / 16, equal_nan=True)
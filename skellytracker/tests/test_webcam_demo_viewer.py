@@ -0,0 +1,108 @@
+import logging
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from skellytracker.trackers.bright_point_tracker.brightest_point_tracker import (
+    BrightestPointTracker,
+)
+from skellytracker.trackers.demo_viewers.latest_frame_capture import (
+    LatestFrameCapture,
+)
+from skellytracker.trackers.demo_viewers.webcam_demo_viewer import WebcamDemoViewer
+
+
+class CountingCapture:
+    """
+    Capture that produces numbered frames at a fixed interval, like a camera would.
+    """
+
+    def __init__(self, number_of_frames: int, frame_interval_s: float):
+        self.number_of_frames = number_of_frames
+        self.frame_interval_s = frame_interval_s
+        self.frames_read = 0
+
+    def read(self):
+        if self.frames_read >= self.number_of_frames:
+            return False, None
+        time.sleep(self.frame_interval_s)
+        frame = np.full((4, 4, 3), self.frames_read, dtype=np.uint8)
+        self.frames_read += 1
+        return True, frame
+
+
+def test_slow_consumer_gets_newest_frame():
+    with LatestFrameCapture(CountingCapture(30, 0.002)) as frame_capture:
+        read_frame_numbers = []
+        while True:
+            ret, frame, _ = frame_capture.read(timeout=1)
+            if not ret:
+                break
+            read_frame_numbers.append(int(frame[0, 0, 0]))
+            time.sleep(0.01)
+
+    assert read_frame_numbers == sorted(set(read_frame_numbers))
+    assert read_frame_numbers[-1] == 29
+    assert frame_capture.dropped_frames > 0
+    assert frame_capture.dropped_frames + len(read_frame_numbers) == 30
+
+
+def test_fast_consumer_drops_nothing():
+    with LatestFrameCapture(CountingCapture(10, 0.05)) as frame_capture:
+        read_frame_numbers = []
+        while True:
+            ret, frame, _ = frame_capture.read(timeout=1)
+            if not ret:
+                break
+            read_frame_numbers.append(int(frame[0, 0, 0]))
+
+    assert read_frame_numbers == list(range(10))
+    assert frame_capture.dropped_frames == 0
+
+
+def write_bright_point_video(tmp_path: Path) -> Path:
+    video_path = tmp_path / "bright_point.mp4"
+    video_writer = cv2.VideoWriter(
+        str(video_path), cv2.VideoWriter.fourcc(*"mp4v"), 30, (160, 120)
+    )
+    for frame_number in range(20):
+        image = np.zeros((120, 160, 3), dtype=np.uint8)
+        cv2.circle(image, (20 + 5 * frame_number, 60), 6, (255, 255, 255), -1)
+        video_writer.write(image)
+    video_writer.release()
+    return video_path
+
+
+def test_headless_viewer_reports_latency(tmp_path: Path):
+    video_path = write_bright_point_video(tmp_path)
+
+    viewer = WebcamDemoViewer(
+        tracker=BrightestPointTracker(),
+        camera_id=str(video_path),
+        headless=True,
+        max_frames=5,
+    )
+    viewer.run()
+
+    summary = viewer.latency_summary()
+    assert summary["frames"] == len(viewer.latencies_ms) >= 1
+    assert summary["frames"] <= 5
+    assert summary["mean_latency_ms"] >= 0
+
+
+def test_video_source_plays_at_its_frame_rate_to_the_end(tmp_path: Path, caplog):
+    video_path = write_bright_point_video(tmp_path)
+    viewer = WebcamDemoViewer(
+        tracker=BrightestPointTracker(), camera_id=str(video_path), headless=True
+    )
+
+    start_time = time.perf_counter()
+    with caplog.at_level(logging.INFO):
+        viewer.run()
+
+    # 20 frames at 30 fps, instead of as fast as they decode
+    assert time.perf_counter() - start_time > 0.5
+    assert "Reached the end of" in caplog.text
+    assert not [record for record in caplog.records if record.levelno >= logging.ERROR]
@@ -1,10 +1,16 @@
 from abc import ABC, abstractmethod
 import logging
 from pathlib import Path
-from typing import Dict, Union, Optional
+from typing import Dict, Optional, Tuple, Union
 
 import numpy as np
 
+from skellytracker.trackers.base_tracker.output_precision import (
+    DEFAULT_FIXED_POINT_SCALES,
+    OutputPrecision,
+    save_tracking_array,
+)
+from skellytracker.trackers.base_tracker.sparse_group_array import SparseGroupArray
 from skellytracker.trackers.base_tracker.tracked_object import TrackedObject
 
 logger = logging.getLogger(__name__)
@@ -15,9 +21,29 @@ class BaseRecorder(ABC):
     An abstract base class for implementing different recording algorithms.
     """
 
-    def __init__(self):
+    # default fixed point scale per integer dtype for the values this recorder outputs,
+    # None for recorders whose values can't be stored as fixed point
+    fixed_point_scales: Optional[Dict[str, float]] = DEFAULT_FIXED_POINT_SCALES
+
+    def __init__(self, output_precision: Optional[OutputPrecision] = None):
+        """
+        :param output_precision: Data type of the processed array, float64 by default.
+        """
         self.recorded_objects = []
         self.recorded_objects_array = None
+        self.output_precision = output_precision or OutputPrecision()
+
+    @property
+    def output_precision(self) -> OutputPrecision:
+        return self._output_precision
+
+    @output_precision.setter
+    def output_precision(self, output_precision: OutputPrecision) -> None:
+        if output_precision.is_fixed_point and self.fixed_point_scales is None:
+            raise ValueError(
+                f"{self.__class__.__name__} does not support fixed point output, use a float output dtype"
+            )
+        self._output_precision = output_precision
 
     @abstractmethod
     def record(
@@ -40,6 +66,50 @@ class BaseRecorder(ABC):
         """
         pass
 
+    def tracked_objects_to_frame_array(
+        self, tracked_objects: Dict[str, TrackedObject], **kwargs
+    ) -> np.ndarray:
+        """
+        Convert the tracked objects of a single frame to the array format of `process_tracked_objects`.
+
+        Records the frame into an empty recording and processes it, leaving the existing recording untouched.
+        Recorders that can convert a frame directly should override this.
+
+        :param tracked_objects: A tracked objects dictionary.
+        :return: Float array of tracked data for the frame, one frame of the `process_tracked_objects` output.
+        """
+        recorded_objects = self.recorded_objects
+        recorded_objects_array = self.recorded_objects_array
+        self.recorded_objects = []
+        try:
+            self.record(tracked_objects)
+            return self.output_precision.decode(
+                self.process_tracked_objects(**kwargs)[0]
+            )
+        finally:
+            self.recorded_objects = recorded_objects
+            self.recorded_objects_array = recorded_objects_array
+
+    def get_landmark_groups(self) -> Optional[Dict[str, Tuple[int, int]]]:
+        """
+        (start, stop) points of each landmark group of the processed array, the units in which
+        `process_tracked_objects_sparse` stores or skips frames. None treats all points as one group.
+        """
+        return None
+
+    def process_tracked_objects_sparse(self, **kwargs) -> SparseGroupArray:
+        """
+        Process the recorded objects into a `SparseGroupArray`, which only stores the landmark groups detected in
+        each frame. Takes the same arguments as `process_tracked_objects`.
+
+        Recorders that can fill the groups without building the dense array should override this.
+        """
+        return SparseGroupArray.from_dense(
+            self.process_tracked_objects(**kwargs),
+            landmark_groups=self.get_landmark_groups(),
+            missing_value=self.output_precision.missing_value,
+        )
+
     def clear_recorded_objects(self):
         logger.info("Clearing recorded objects from recorder")
         self.recorded_objects = []
@@ -57,7 +127,21 @@ class BaseRecorder(ABC):
         else:
             recorded_objects_array = self.recorded_objects_array
         logger.info(f"Saving recorded objects to {file_path}")
-        np.save(file_path, recorded_objects_array)
+        save_tracking_array(file_path, recorded_objects_array, self.output_precision)
+
+    def save_sparse(self, file_path: Union[str, Path], **kwargs) -> SparseGroupArray:
+        """
+        Process the recorded objects with `process_tracked_objects_sparse` and save them as a `.npz` file.
+
+        :return: The saved sparse array.
+        """
+        sparse_array = self.process_tracked_objects_sparse(**kwargs)
+        logger.info(
+            f"Saving recorded objects to {file_path}, {sparse_array.nbytes} bytes instead of "
+            f"{int(np.prod(sparse_array.shape)) * sparse_array.dtype.itemsize} dense"
+        )
+        sparse_array.save(file_path)
+        return sparse_array
 
 
 class BaseCumulativeRecorder(BaseRecorder):
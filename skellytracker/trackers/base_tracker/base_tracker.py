@@ -1,14 +1,23 @@
 from abc import ABC, abstractmethod
+import asyncio
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
 import logging
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+import threading
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple, Union
 import cv2
 import numpy as np
 from tqdm import tqdm
 
 
 from skellytracker.trackers.base_tracker.base_recorder import BaseCumulativeRecorder, BaseRecorder
-from skellytracker.trackers.base_tracker.tracked_object import TrackedObject
+from skellytracker.trackers.base_tracker.frame_sink import FrameSink
+from skellytracker.trackers.base_tracker.tracked_object import (
+    TrackedObject,
+    copy_tracked_objects,
+)
 from skellytracker.trackers.base_tracker.video_handler import VideoHandler
 from skellytracker.trackers.demo_viewers.image_demo_viewer import ImageDemoViewer
 from skellytracker.trackers.demo_viewers.webcam_demo_viewer import (
@@ -59,12 +68,33 @@ class BaseTracker(ABC):
         """
         pass
 
+    @property
+    def is_stateless(self) -> bool:
+        """
+        Whether `process_image` keeps no state between frames.
+
+        Stateless trackers can process frames of a video in parallel on independent copies made by `copy_for_thread`.
+        Subclasses that implement `copy_for_thread` should override this.
+        """
+        return False
+
+    def copy_for_thread(self) -> "BaseTracker":
+        """
+        Create an independent tracker with the same parameters, for processing frames on another thread.
+        """
+        raise NotImplementedError(
+            f"{self.__class__.__name__} does not support frame parallel processing"
+        )
+
     def process_video(
         self,
         input_video_filepath: Union[str, Path],
         output_video_filepath: Optional[Union[str, Path]] = None,
         save_data_bool: bool = False,
         use_tqdm: bool = True,
+        num_threads: int = 1,
+        frame_sinks: Optional[List[FrameSink]] = None,
+        keep_recorded_data: bool = True,
     ) -> Union[np.ndarray, None]:
         """
         Run the tracker on a video.
@@ -73,8 +103,19 @@ class BaseTracker(ABC):
         :param output_video_filepath: Path to save annotated video to, does not save video if None.
         :param save_data_bool: Whether to save the data to a file.
         :param use_tqdm: Whether to use tqdm to show a progress bar
-        :return: Array of tracked keypoint data if tracker has an associated recorder
+        :param num_threads: Number of threads to process frames on, only used if the tracker `is_stateless`.
+            Results are put back in frame order before they are recorded and written to the video.
+        :param frame_sinks: Sinks that receive each frame's data as it is tracked, with the capture timestamp.
+            They need a recorder to convert the frame data, and are closed when the video is done or processing stops.
+        :param keep_recorded_data: Whether to keep every frame in the recorder, disable to stream long videos to
+            `frame_sinks` in constant memory.
+        :return: Array of tracked keypoint data if tracker has an associated recorder and data was kept
         """
+        frame_sinks = frame_sinks or []
+        if frame_sinks and self.recorder is None:
+            raise ValueError(
+                f"{self.__class__.__name__} has no recorder to convert frames for its frame sinks"
+            )
 
         cap = cv2.VideoCapture(str(input_video_filepath))
 
@@ -107,32 +148,349 @@ class BaseTracker(ABC):
         else:
             iterator = range(number_of_frames)
 
-        for _frame_number in iterator:
+        if num_threads > 1 and not self.is_stateless:
+            logger.warning(
+                f"{self.__class__.__name__} keeps state between frames, processing frames on a single thread"
+            )
+            num_threads = 1
+
+        if num_threads > 1:
+            frame_results = self.process_frames_in_parallel(
+                cap=cap,
+                frames=iterator,
+                first_frame=(ret, frame),
+                input_video_filepath=input_video_filepath,
+                num_threads=num_threads,
+            )
+        else:
+            frame_results = self.process_frames(
+                cap=cap,
+                frames=iterator,
+                first_frame=(ret, frame),
+                input_video_filepath=input_video_filepath,
+            )
+
+        try:
+            for frame_number, frame_result in enumerate(frame_results):
+                self.write_frame_outputs(
+                    frame_number=frame_number,
+                    frame_result=frame_result,
+                    image_size=image_size,
+                    frame_sinks=frame_sinks,
+                    video_handler=video_handler,
+                    keep_recorded_data=keep_recorded_data,
+                )
+        finally:
+            for frame_sink in frame_sinks:
+                frame_sink.close()
+
+        cap.release()
+        if video_handler is not None:
+            video_handler.close()
+
+        if keep_recorded_data:
+            output_array = self.process_and_save_tracked_objects(
+                input_video_filepath, save_data_bool, image_size
+            )
+        else:
+            output_array = None
+
+        self.cleanup()
+
+        return output_array
+
+    def process_frames(
+        self,
+        cap: cv2.VideoCapture,
+        frames: Iterator[int],
+        first_frame: Tuple[bool, Optional[np.ndarray]],
+        input_video_filepath: Union[str, Path],
+    ) -> Iterator[
+        Tuple[Dict[str, TrackedObject], Optional[np.ndarray], np.ndarray, float]
+    ]:
+        """
+        Process the frames of a video one at a time.
+
+        Each frame's capture timestamp is passed to `process_image` as `timestamp_ms`.
+
+        :return: Iterator of (tracked objects, annotated image, frame, timestamp in ms) for each frame, in order.
+        """
+        ret, frame = first_frame
+        for _frame_number in frames:
             if not ret or frame is None:
                 logger.error(
                     f"Failed to load an image from: {str(input_video_filepath)}"
                 )
                 raise ValueError("Failed to load an image from: " + str(input_video_filepath))
 
-            self.process_image(frame)
-            if self.recorder is not None:
-                self.recorder.record(self.tracked_objects)
-            if video_handler is not None:
-                if self.annotated_image is None:
-                    self.annotated_image = frame
-                video_handler.add_frame(self.annotated_image)
+            # the position of the frame that was just read, for trackers that track over time
+            timestamp_ms = cap.get(cv2.CAP_PROP_POS_MSEC)
+            self.process_image(frame, timestamp_ms=timestamp_ms)
+            yield self.tracked_objects, self.annotated_image, frame, timestamp_ms
 
             ret, frame = cap.read()
 
-        cap.release()
+    def process_frames_in_parallel(
+        self,
+        cap: cv2.VideoCapture,
+        frames: Iterator[int],
+        first_frame: Tuple[bool, Optional[np.ndarray]],
+        input_video_filepath: Union[str, Path],
+        num_threads: int,
+    ) -> Iterator[
+        Tuple[Dict[str, TrackedObject], Optional[np.ndarray], np.ndarray, float]
+    ]:
+        """
+        Process the frames of a video on a pool of threads, each with its own copy of the tracker.
+
+        Frames are read on the calling thread and at most `2 * num_threads` are in flight at once.
+
+        :return: Iterator of (tracked objects, annotated image, frame, timestamp in ms) for each frame, in order.
+        """
+        thread_local = threading.local()
+
+        def process_frame(
+            frame: np.ndarray, timestamp_ms: float
+        ) -> Tuple[Dict[str, TrackedObject], Optional[np.ndarray], np.ndarray, float]:
+            tracker = getattr(thread_local, "tracker", None)
+            if tracker is None:
+                tracker = thread_local.tracker = self.copy_for_thread()
+            tracker.process_image(frame, timestamp_ms=timestamp_ms)
+            return (
+                copy_tracked_objects(tracker.tracked_objects),
+                tracker.annotated_image,
+                frame,
+                timestamp_ms,
+            )
+
+        max_frames_in_flight = 2 * num_threads
+        with ThreadPoolExecutor(max_workers=num_threads) as executor:
+            pending_results = deque()
+            ret, frame = first_frame
+            for _frame_number in frames:
+                if not ret or frame is None:
+                    logger.error(
+                        f"Failed to load an image from: {str(input_video_filepath)}"
+                    )
+                    raise ValueError("Failed to load an image from: " + str(input_video_filepath))
+
+                pending_results.append(
+                    executor.submit(
+                        process_frame, frame, cap.get(cv2.CAP_PROP_POS_MSEC)
+                    )
+                )
+                if len(pending_results) >= max_frames_in_flight:
+                    yield self.collect_frame_result(pending_results.popleft().result())
+
+                ret, frame = cap.read()
+
+            while pending_results:
+                yield self.collect_frame_result(pending_results.popleft().result())
+
+    def collect_frame_result(
+        self,
+        frame_result: Tuple[
+            Dict[str, TrackedObject], Optional[np.ndarray], np.ndarray, float
+        ],
+    ) -> Tuple[Dict[str, TrackedObject], Optional[np.ndarray], np.ndarray, float]:
+        """
+        Make a frame processed on another thread the tracker's current frame.
+        """
+        self.tracked_objects, self.annotated_image, _, _ = frame_result
+        return frame_result
+
+    def write_frame_outputs(
+        self,
+        frame_number: int,
+        frame_result: Tuple[
+            Dict[str, TrackedObject], Optional[np.ndarray], np.ndarray, float
+        ],
+        image_size: Tuple[int, int],
+        frame_sinks: List[FrameSink],
+        video_handler: Optional[VideoHandler],
+        keep_recorded_data: bool,
+    ) -> None:
+        """
+        Record a processed frame, write it to the frame sinks and add it to the annotated video.
+        """
+        tracked_objects, annotated_image, frame, timestamp_ms = frame_result
+        if self.recorder is not None and keep_recorded_data:
+            self.recorder.record(tracked_objects)
+        if frame_sinks:
+            frame_array = self.recorder.tracked_objects_to_frame_array(
+                tracked_objects, image_size=image_size
+            )
+            for frame_sink in frame_sinks:
+                frame_sink.write_frame(frame_number, timestamp_ms / 1000, frame_array)
         if video_handler is not None:
-            video_handler.close()
+            video_handler.add_frame(
+                annotated_image if annotated_image is not None else frame
+            )
+
+    async def aiter_video_frames(
+        self,
+        input_video_filepath: Union[str, Path],
+        inference_executor: Optional[Executor] = None,
+    ) -> AsyncIterator[
+        Tuple[Dict[str, TrackedObject], Optional[np.ndarray], np.ndarray, float]
+    ]:
+        """
+        Asynchronously process the frames of a video one at a time, without blocking the event loop.
+
+        Frames are decoded on a thread of their own, the next frame is decoded while the current one is processed.
+        Processing runs on `inference_executor`, which can be shared between trackers to limit how many frames
+        are processed at once, e.g. on a single GPU. Cancelling the consuming task, or closing the iterator,
+        waits for the frame in progress to finish processing, so the tracker is never cleaned up under it.
+
+        :param input_video_filepath: Path to video file.
+        :param inference_executor: Executor to run `process_image` on, defaults to a thread of its own.
+        :return: Async iterator of (tracked objects, annotated image, frame, timestamp in ms) for each frame, in order.
+            The tracked objects are a copy per frame, which later frames don't change.
+        """
+        loop = asyncio.get_running_loop()
+        decode_executor = ThreadPoolExecutor(max_workers=1)
+        own_inference_executor = inference_executor is None
+        if own_inference_executor:
+            inference_executor = ThreadPoolExecutor(max_workers=1)
+
+        def read_frame() -> Tuple[bool, Optional[np.ndarray], float]:
+            ret, frame = cap.read()
+            return ret, frame, cap.get(cv2.CAP_PROP_POS_MSEC)
 
-        output_array = self.process_and_save_tracked_objects(
-            input_video_filepath, save_data_bool, image_size
+        def track_frame(
+            frame: np.ndarray, timestamp_ms: float
+        ) -> Tuple[Dict[str, TrackedObject], Optional[np.ndarray]]:
+            # copied on the inference thread, so the next frame never changes a result the consumer holds
+            self.process_image(frame, timestamp_ms=timestamp_ms)
+            return copy_tracked_objects(self.tracked_objects), self.annotated_image
+
+        cap = await loop.run_in_executor(
+            decode_executor, cv2.VideoCapture, str(input_video_filepath)
         )
+        inference_future = None
+        try:
+            if not cap.isOpened():
+                raise ValueError(f"Could not open video: {input_video_filepath}")
+            next_frame = loop.run_in_executor(decode_executor, read_frame)
+            while True:
+                ret, frame, timestamp_ms = await next_frame
+                if not ret or frame is None:
+                    break
+                next_frame = loop.run_in_executor(decode_executor, read_frame)
+
+                inference_future = inference_executor.submit(
+                    track_frame, frame, timestamp_ms
+                )
+                tracked_objects, annotated_image = await asyncio.wrap_future(
+                    inference_future
+                )
+                yield tracked_objects, annotated_image, frame, timestamp_ms
+        finally:
+            if inference_future is not None and not inference_future.done():
+                # a running frame can't be cancelled, wait for it to stop using the tracker
+                await asyncio.wait([asyncio.wrap_future(inference_future)])
+            # queued behind any read still in progress, so the capture is never released mid-read
+            decode_executor.submit(cap.release)
+            decode_executor.shutdown(wait=False)
+            if own_inference_executor:
+                inference_executor.shutdown(wait=False)
+
+    async def aprocess_video(
+        self,
+        input_video_filepath: Union[str, Path],
+        output_video_filepath: Optional[Union[str, Path]] = None,
+        save_data_bool: bool = False,
+        frame_sinks: Optional[List[FrameSink]] = None,
+        keep_recorded_data: bool = True,
+        inference_executor: Optional[Executor] = None,
+    ) -> Union[np.ndarray, None]:
+        """
+        Async version of `process_video`, decoding, processing and writing outputs on executor threads.
 
-        self.cleanup()
+        The event loop stays free while the video is processed, so many videos or cameras can be processed
+        concurrently and each one cancelled cleanly. When the call returns or raises, including on cancellation,
+        the frame sinks and annotated video are closed and the tracker is cleaned up. Only if the task is
+        cancelled again while it waits for that, the remaining steps finish in the background.
+
+        :param input_video_filepath: Path to video file.
+        :param output_video_filepath: Path to save annotated video to, does not save video if None.
+        :param save_data_bool: Whether to save the data to a file.
+        :param frame_sinks: Sinks that receive each frame's data as it is tracked, see `process_video`.
+        :param keep_recorded_data: Whether to keep every frame in the recorder.
+        :param inference_executor: Executor to run `process_image` on, see `aiter_video_frames`.
+        :return: Array of tracked keypoint data if tracker has an associated recorder and data was kept
+        """
+        frame_sinks = frame_sinks or []
+        if frame_sinks and self.recorder is None:
+            raise ValueError(
+                f"{self.__class__.__name__} has no recorder to convert frames for its frame sinks"
+            )
+
+        def open_outputs() -> Tuple[Tuple[int, int], Optional[VideoHandler]]:
+            cap = cv2.VideoCapture(str(input_video_filepath))
+            image_size = (
+                int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            )
+            fps = cap.get(cv2.CAP_PROP_FPS)
+            cap.release()
+            if output_video_filepath is None:
+                return image_size, None
+            return image_size, VideoHandler(
+                output_path=output_video_filepath, frame_size=image_size, fps=fps
+            )
+
+        loop = asyncio.get_running_loop()
+        encode_executor = ThreadPoolExecutor(max_workers=1)
+        video_handler = None
+        frame_results = self.aiter_video_frames(
+            input_video_filepath, inference_executor=inference_executor
+        )
+        try:
+            image_size, video_handler = await loop.run_in_executor(
+                encode_executor, open_outputs
+            )
+            frame_number = 0
+            async for frame_result in frame_results:
+                await loop.run_in_executor(
+                    encode_executor,
+                    partial(
+                        self.write_frame_outputs,
+                        frame_number=frame_number,
+                        frame_result=frame_result,
+                        image_size=image_size,
+                        frame_sinks=frame_sinks,
+                        video_handler=video_handler,
+                        keep_recorded_data=keep_recorded_data,
+                    ),
+                )
+                frame_number += 1
+
+            if keep_recorded_data:
+                output_array = await loop.run_in_executor(
+                    encode_executor,
+                    self.process_and_save_tracked_objects,
+                    input_video_filepath,
+                    save_data_bool,
+                    image_size,
+                )
+            else:
+                output_array = None
+        finally:
+            # stops decoding and waits for the frame being processed, so cleanup can't race it
+            await frame_results.aclose()
+            # queued behind any write still in progress
+            finalize_futures = [
+                encode_executor.submit(frame_sink.close) for frame_sink in frame_sinks
+            ]
+            if video_handler is not None:
+                finalize_futures.append(encode_executor.submit(video_handler.close))
+            finalize_futures.append(encode_executor.submit(self.cleanup))
+            encode_executor.shutdown(wait=False)
+            # shielded, so a second cancellation leaves the queued steps running instead of dropping them
+            await asyncio.shield(
+                asyncio.gather(*map(asyncio.wrap_future, finalize_futures))
+            )
 
         return output_array
 
@@ -161,15 +519,18 @@ class BaseTracker(ABC):
         if self.recorder is not None:
             self.recorder.clear_recorded_objects()
 
-    def demo(self) -> None:
+    def demo(self, headless: bool = False) -> None:
         """
         Run a demo of the tracker.
 
-        :param window_title: The title of the demo window.
+        :param headless: Run without a window, logging latency only.
         :return: None
         """
         camera_viewer = WebcamDemoViewer(
-            tracker=self, recorder=self.recorder, window_title=self.__class__.__name__
+            tracker=self,
+            recorder=self.recorder,
+            window_title=self.__class__.__name__,
+            headless=headless,
         )
         camera_viewer.run()
 
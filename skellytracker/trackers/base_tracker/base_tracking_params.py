@@ -1,6 +1,13 @@
+from typing import Optional
+
 from pydantic import BaseModel
 
+from skellytracker.trackers.base_tracker.output_precision import OutputDtype
+
 
 class BaseTrackingParams(BaseModel):
     num_processes: int = 1
+    num_threads_per_video: int = 1  # only used by trackers that are stateless between frames
     run_image_tracking: bool = True
+    output_dtype: OutputDtype = "float64"
+    output_scale: Optional[float] = None  # fixed point scale for integer output dtypes, defaults per dtype
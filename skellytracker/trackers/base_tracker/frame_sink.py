@@ -0,0 +1,165 @@
+from abc import ABC, abstractmethod
+import csv
+import json
+import logging
+from pathlib import Path
+from typing import List, Optional, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+AXIS_NAMES = ["x", "y", "z"]
+
+
+def get_column_names(
+    frame_array: np.ndarray, landmark_names: Optional[List[str]] = None
+) -> List[str]:
+    """
+    Name the values of a flattened frame array, e.g. `nose_x`, `nose_y` for a (points, 2) array.
+
+    :param frame_array: Data for a single frame.
+    :param landmark_names: Names of the points along the first axis, defaults to `point_<index>`.
+    :return: One name per value of the flattened frame array.
+    """
+    number_of_points = frame_array.shape[0] if frame_array.ndim > 0 else 1
+    if landmark_names is None or len(landmark_names) != number_of_points:
+        landmark_names = [f"point_{index}" for index in range(number_of_points)]
+
+    values_per_point = frame_array.size // max(number_of_points, 1)
+    if values_per_point == 1:
+        return list(landmark_names)
+    axis_names = (
+        AXIS_NAMES
+        if values_per_point <= len(AXIS_NAMES)
+        else [str(index) for index in range(values_per_point)]
+    )
+    return [
+        f"{landmark_name}_{axis_name}"
+        for landmark_name in landmark_names
+        for axis_name in axis_names[:values_per_point]
+    ]
+
+
+class FrameSink(ABC):
+    """
+    Receives tracking data one frame at a time while a video is processed.
+    """
+
+    @abstractmethod
+    def write_frame(
+        self, frame_number: int, timestamp_s: float, frame_array: np.ndarray
+    ) -> None:
+        """
+        Write the data of a single frame.
+
+        :param frame_number: Index of the frame in the video.
+        :param timestamp_s: Capture timestamp of the frame in seconds.
+        :param frame_array: Tracked data for the frame, as produced by the recorder.
+        """
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        """
+        Flush any buffered data and release the sink.
+        """
+        pass
+
+
+class FileFrameSink(FrameSink):
+    """
+    Base class for sinks that append rows to a text file, flushing every few frames so partial output survives interruption.
+    """
+
+    def __init__(
+        self,
+        file_path: Union[str, Path],
+        flush_interval_frames: int = 30,
+    ):
+        """
+        :param file_path: Path of the file to write to, overwritten if it exists.
+        :param flush_interval_frames: Number of frames between flushes to disk.
+        """
+        self.file_path = Path(file_path)
+        self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        self.file = open(self.file_path, "w", newline="")
+        self.flush_interval_frames = flush_interval_frames
+        self.frames_since_flush = 0
+
+    def frame_written(self) -> None:
+        self.frames_since_flush += 1
+        if self.frames_since_flush >= self.flush_interval_frames:
+            self.file.flush()
+            self.frames_since_flush = 0
+
+    def close(self) -> None:
+        if not self.file.closed:
+            self.file.close()
+            logger.info(f"Tracking data saved to {self.file_path}")
+
+
+class CSVFrameSink(FileFrameSink):
+    """
+    Writes one CSV row per frame: frame number, timestamp, then the flattened frame array.
+    """
+
+    def __init__(
+        self,
+        file_path: Union[str, Path],
+        landmark_names: Optional[List[str]] = None,
+        flush_interval_frames: int = 30,
+    ):
+        """
+        :param file_path: Path of the CSV file to write to, overwritten if it exists.
+        :param landmark_names: Names of the points along the first axis of the frame array, used for the header.
+        :param flush_interval_frames: Number of frames between flushes to disk.
+        """
+        super().__init__(
+            file_path=file_path, flush_interval_frames=flush_interval_frames
+        )
+        self.landmark_names = landmark_names
+        self.csv_writer = csv.writer(self.file)
+        self.header_written = False
+
+    def get_header(self, frame_array: np.ndarray) -> List[str]:
+        return ["frame_number", "timestamp_s"] + get_column_names(
+            frame_array, self.landmark_names
+        )
+
+    def get_row(
+        self, frame_number: int, timestamp_s: float, frame_array: np.ndarray
+    ) -> list:
+        return [frame_number, timestamp_s] + frame_array.ravel().tolist()
+
+    def write_frame(
+        self, frame_number: int, timestamp_s: float, frame_array: np.ndarray
+    ) -> None:
+        if not self.header_written:
+            self.csv_writer.writerow(self.get_header(frame_array))
+            self.header_written = True
+        self.csv_writer.writerow(self.get_row(frame_number, timestamp_s, frame_array))
+        self.frame_written()
+
+
+class NDJSONFrameSink(FileFrameSink):
+    """
+    Writes one JSON object per line and frame, with missing (NaN) values written as null.
+    """
+
+    def write_frame(
+        self, frame_number: int, timestamp_s: float, frame_array: np.ndarray
+    ) -> None:
+        frame_data = frame_array.astype(object)
+        frame_data[np.isnan(frame_array)] = None
+        self.file.write(
+            json.dumps(
+                {
+                    "frame_number": frame_number,
+                    "timestamp_s": timestamp_s,
+                    "data": frame_data.tolist(),
+                }
+            )
+            + "\n"
+        )
+        self.frame_written()
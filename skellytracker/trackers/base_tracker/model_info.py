@@ -1,4 +1,4 @@
-from typing import Dict, List, Optional, Union
+from typing import Dict, List, Optional, Tuple, Union
 
 
 class ModelInfo(dict):
@@ -11,3 +11,20 @@ class ModelInfo(dict):
     segment_connections: Optional[Dict[str, Dict[str, str]]] = None
     center_of_mass_definitions: Optional[Dict[str, Dict[str, float]]] = None
     joint_hierarchy: Optional[Dict[str, List[str]]] = None
+    # (start, stop) point indices of each landmark group in the output array, e.g. "body", "left_hand", "face"
+    landmark_groups: Optional[Dict[str, Tuple[int, int]]] = None
+    # name of every point in the output array, when `landmark_names` does not cover all of them
+    point_names: Optional[List[str]] = None
+
+    @classmethod
+    def get_point_names(cls) -> List[str]:
+        """
+        Name of every point in the output array, in order.
+
+        Points without a name in `point_names` or `landmark_names` are named `point_{index}`.
+        """
+        point_names = list(cls.point_names or cls.landmark_names)
+        return point_names + [
+            f"point_{index}"
+            for index in range(len(point_names), cls.num_tracked_points)
+        ]
@@ -0,0 +1,425 @@
+from collections import deque
+from dataclasses import dataclass
+import logging
+import select
+import socket
+import struct
+import threading
+import time
+from typing import Deque, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from skellytracker.trackers.base_tracker.frame_sink import FrameSink
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 5905
+
+# little endian: magic, version, camera id, frame number, timestamp in seconds, number of points, values per point
+FRAME_HEADER = struct.Struct("<4sBHqdIH")
+FRAME_MAGIC = b"SKTF"
+FRAME_FORMAT_VERSION = 1
+PAYLOAD_DTYPE = np.dtype("<f4")
+MAX_UDP_PAYLOAD_BYTES = 65507
+SEND_ERROR_LOG_INTERVAL_S = 5.0
+
+
+@dataclass
+class FrameMessage:
+    """
+    Tracking data of one frame, as sent over the network.
+    """
+
+    camera_id: int
+    frame_number: int
+    timestamp_s: float
+    frame_array: np.ndarray  # float32 (points, values per point), NaN for missing points
+
+
+def encode_frame_message(
+    camera_id: int, frame_number: int, timestamp_s: float, frame_array: np.ndarray
+) -> bytes:
+    """
+    Pack a frame into a fixed size header followed by the frame array as little endian float32.
+    """
+    frame_array = np.asarray(frame_array)
+    number_of_points = frame_array.shape[0] if frame_array.ndim > 0 else 1
+    payload = np.ascontiguousarray(
+        frame_array.reshape(number_of_points, -1), dtype=PAYLOAD_DTYPE
+    )
+    header = FRAME_HEADER.pack(
+        FRAME_MAGIC,
+        FRAME_FORMAT_VERSION,
+        camera_id,
+        frame_number,
+        timestamp_s,
+        payload.shape[0],
+        payload.shape[1],
+    )
+    return header + payload.tobytes()
+
+
+def decode_frame_header(header: bytes) -> Tuple[int, int, float, int, int]:
+    """
+    Unpack a frame header.
+
+    :return: Camera id, frame number, timestamp, number of points and values per point.
+    """
+    (
+        magic,
+        version,
+        camera_id,
+        frame_number,
+        timestamp_s,
+        number_of_points,
+        values_per_point,
+    ) = FRAME_HEADER.unpack(header)
+    if magic != FRAME_MAGIC:
+        raise ValueError(f"Not a skellytracker frame message, got magic {magic!r}")
+    if version > FRAME_FORMAT_VERSION:
+        raise ValueError(
+            f"Frame message version {version} is newer than supported version {FRAME_FORMAT_VERSION}"
+        )
+    return camera_id, frame_number, timestamp_s, number_of_points, values_per_point
+
+
+def get_payload_size(number_of_points: int, values_per_point: int) -> int:
+    return number_of_points * values_per_point * PAYLOAD_DTYPE.itemsize
+
+
+def decode_frame_message(message: bytes) -> FrameMessage:
+    """
+    Unpack a message created by `encode_frame_message`.
+    """
+    camera_id, frame_number, timestamp_s, number_of_points, values_per_point = (
+        decode_frame_header(message[: FRAME_HEADER.size])
+    )
+    payload = message[FRAME_HEADER.size :]
+    if len(payload) != get_payload_size(number_of_points, values_per_point):
+        raise ValueError(
+            f"Expected {get_payload_size(number_of_points, values_per_point)} payload bytes, got {len(payload)}"
+        )
+    return FrameMessage(
+        camera_id=camera_id,
+        frame_number=frame_number,
+        timestamp_s=timestamp_s,
+        frame_array=np.frombuffer(payload, dtype=PAYLOAD_DTYPE).reshape(
+            number_of_points, values_per_point
+        ),
+    )
+
+
+class UDPFrameSink(FrameSink):
+    """
+    Send each frame as one UDP datagram.
+
+    The socket is non-blocking, frames that can not be sent right away are dropped instead of slowing down tracking.
+    """
+
+    def __init__(
+        self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, camera_id: int = 0
+    ):
+        """
+        :param host: Address to send to.
+        :param port: Port to send to.
+        :param camera_id: Camera id included in every message.
+        """
+        self.address = (host, port)
+        self.camera_id = camera_id
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.setblocking(False)
+        self.sent_frames = 0
+        self.dropped_frames = 0
+        self.send_errors = 0
+        self.unlogged_send_errors = 0
+        self.last_send_error_log_time: Optional[float] = None
+
+    def write_frame(
+        self, frame_number: int, timestamp_s: float, frame_array: np.ndarray
+    ) -> None:
+        message = encode_frame_message(
+            self.camera_id, frame_number, timestamp_s, frame_array
+        )
+        if len(message) > MAX_UDP_PAYLOAD_BYTES:
+            logger.warning(
+                f"Frame {frame_number} is {len(message)} bytes, too large for a UDP datagram, use TCPFrameSink"
+            )
+            self.dropped_frames += 1
+            return
+        try:
+            self.socket.sendto(message, self.address)
+            self.sent_frames += 1
+        except (BlockingIOError, ConnectionRefusedError):
+            self.dropped_frames += 1
+        except OSError as error:
+            self.dropped_frames += 1
+            self.log_send_error(frame_number, error)
+
+    def log_send_error(self, frame_number: int, error: OSError) -> None:
+        """
+        Log a failed send, at most once every `SEND_ERROR_LOG_INTERVAL_S` so a persistent network error does not flood the log.
+        """
+        self.send_errors += 1
+        self.unlogged_send_errors += 1
+        now = time.perf_counter()
+        if (
+            self.last_send_error_log_time is not None
+            and now - self.last_send_error_log_time < SEND_ERROR_LOG_INTERVAL_S
+        ):
+            return
+        logger.warning(
+            f"Could not send frame {frame_number} to {self.address}: {error} "
+            f"({self.unlogged_send_errors} failed sends since the last warning)"
+        )
+        self.unlogged_send_errors = 0
+        self.last_send_error_log_time = now
+
+    def close(self) -> None:
+        self.socket.close()
+        logger.info(
+            f"Sent {self.sent_frames} frames to {self.address}, dropped {self.dropped_frames}"
+            f" ({self.send_errors} send errors)"
+        )
+
+
+class TCPClientConnection:
+    """
+    Sends queued messages to one connected client on its own thread.
+    """
+
+    def __init__(self, connection: socket.socket, max_queued_frames: int):
+        self.connection = connection
+        self.queue: Deque[bytes] = deque(maxlen=max_queued_frames)
+        self.condition = threading.Condition()
+        self.connected = True
+        self.dropped_frames = 0
+        self.thread = threading.Thread(target=self.send_loop, daemon=True)
+        self.thread.start()
+
+    def put(self, message: bytes) -> None:
+        with self.condition:
+            if len(self.queue) == self.queue.maxlen:
+                self.dropped_frames += 1
+            self.queue.append(message)
+            self.condition.notify()
+
+    def send_loop(self) -> None:
+        try:
+            while True:
+                with self.condition:
+                    self.condition.wait_for(lambda: self.queue or not self.connected)
+                    if not self.connected:
+                        break
+                    message = self.queue.popleft()
+                self.connection.sendall(message)
+        except OSError:
+            logger.info("Frame stream client disconnected")
+        finally:
+            self.connected = False
+            self.connection.close()
+
+    def close(self) -> None:
+        with self.condition:
+            self.connected = False
+            self.condition.notify()
+        try:
+            # unblocks a sendall to a client that stopped reading
+            self.connection.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.thread.join()
+
+
+class TCPFrameSink(FrameSink):
+    """
+    Serve frames to any number of TCP clients, e.g. a Blender or game engine preview.
+
+    Each client gets its own small queue, when a client can not keep up its oldest queued frames are dropped,
+    so a slow client never blocks tracking or other clients.
+    """
+
+    def __init__(
+        self,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        camera_id: int = 0,
+        max_queued_frames: int = 2,
+    ):
+        """
+        :param host: Address to listen on.
+        :param port: Port to listen on, 0 picks a free port (see `port`).
+        :param camera_id: Camera id included in every message.
+        :param max_queued_frames: Frames queued per client before the oldest are dropped.
+        """
+        self.camera_id = camera_id
+        self.max_queued_frames = max_queued_frames
+        self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server_socket.bind((host, port))
+        self.server_socket.listen()
+        self.port = self.server_socket.getsockname()[1]
+        self.clients: List[TCPClientConnection] = []
+        self.clients_lock = threading.Lock()
+        self.running = True
+        self.accept_thread = threading.Thread(target=self.accept_loop, daemon=True)
+        self.accept_thread.start()
+        logger.info(f"Serving tracking frames on {host}:{self.port}")
+
+    @property
+    def dropped_frames(self) -> int:
+        with self.clients_lock:
+            return sum(client.dropped_frames for client in self.clients)
+
+    def accept_loop(self) -> None:
+        while self.running:
+            readable, _, _ = select.select([self.server_socket], [], [], 0.1)
+            if not readable or not self.running:
+                continue
+            connection, address = self.server_socket.accept()
+            connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            logger.info(f"Frame stream client connected from {address}")
+            with self.clients_lock:
+                self.clients.append(
+                    TCPClientConnection(connection, self.max_queued_frames)
+                )
+
+    def write_frame(
+        self, frame_number: int, timestamp_s: float, frame_array: np.ndarray
+    ) -> None:
+        message = encode_frame_message(
+            self.camera_id, frame_number, timestamp_s, frame_array
+        )
+        with self.clients_lock:
+            self.clients = [client for client in self.clients if client.connected]
+            for client in self.clients:
+                client.put(message)
+
+    def close(self) -> None:
+        self.running = False
+        self.accept_thread.join()
+        self.server_socket.close()
+        with self.clients_lock:
+            for client in self.clients:
+                client.close()
+            self.clients = []
+
+
+class UDPFrameReceiver:
+    """
+    Receive frames sent by a `UDPFrameSink`.
+    """
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        """
+        :param host: Address to listen on.
+        :param port: Port to listen on, 0 picks a free port (see `port`).
+        """
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind((host, port))
+        self.port = self.socket.getsockname()[1]
+
+    def receive(self, timeout: Optional[float] = None) -> Optional[FrameMessage]:
+        """
+        Wait for the next frame, returning None on timeout.
+        """
+        self.socket.settimeout(timeout)
+        try:
+            message, _ = self.socket.recvfrom(MAX_UDP_PAYLOAD_BYTES)
+        except socket.timeout:
+            return None
+        return decode_frame_message(message)
+
+    def __iter__(self) -> Iterator[FrameMessage]:
+        while True:
+            yield self.receive()
+
+    def close(self) -> None:
+        self.socket.close()
+
+
+class TCPFrameReceiver:
+    """
+    Receive frames served by a `TCPFrameSink`.
+    """
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        self.socket = socket.create_connection((host, port))
+        # bytes of a message that has not fully arrived yet, kept across timeouts so the stream stays aligned
+        self.buffer = bytearray()
+
+    def fill_buffer(self, number_of_bytes: int) -> bool:
+        """
+        Read until the buffer holds `number_of_bytes`, returning False when the server closes the stream.
+
+        Raises `socket.timeout` with the bytes received so far left in the buffer.
+        """
+        while len(self.buffer) < number_of_bytes:
+            chunk = self.socket.recv(number_of_bytes - len(self.buffer))
+            if not chunk:
+                return False
+            self.buffer.extend(chunk)
+        return True
+
+    def receive(self, timeout: Optional[float] = None) -> Optional[FrameMessage]:
+        """
+        Wait for the next frame, returning None on timeout or when the server closes the stream.
+
+        A message cut off by the timeout is resumed by the next call.
+        """
+        self.socket.settimeout(timeout)
+        try:
+            if not self.fill_buffer(FRAME_HEADER.size):
+                return None
+            number_of_points, values_per_point = decode_frame_header(
+                bytes(self.buffer[: FRAME_HEADER.size])
+            )[3:]
+            message_size = FRAME_HEADER.size + get_payload_size(
+                number_of_points, values_per_point
+            )
+            if not self.fill_buffer(message_size):
+                return None
+        except socket.timeout:
+            return None
+        message = bytes(self.buffer[:message_size])
+        del self.buffer[:message_size]
+        return decode_frame_message(message)
+
+    def __iter__(self) -> Iterator[FrameMessage]:
+        while True:
+            frame_message = self.receive()
+            if frame_message is None:
+                return
+            yield frame_message
+
+    def close(self) -> None:
+        self.socket.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Print tracking frames streamed by a UDPFrameSink or TCPFrameSink"
+    )
+    parser.add_argument("--protocol", choices=["udp", "tcp"], default="udp")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    receiver = (
+        UDPFrameReceiver(args.host, args.port)
+        if args.protocol == "udp"
+        else TCPFrameReceiver(args.host, args.port)
+    )
+    try:
+        for frame_message in receiver:
+            print(
+                f"camera {frame_message.camera_id} frame {frame_message.frame_number} "
+                f"t={frame_message.timestamp_s:.3f}s points={frame_message.frame_array.shape[0]}"
+            )
+    except KeyboardInterrupt:
+        pass
+    finally:
+        receiver.close()
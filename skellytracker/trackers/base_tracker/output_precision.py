@@ -0,0 +1,154 @@
+from dataclasses import InitVar, asdict, dataclass
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Literal, Optional, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+OutputDtype = Literal["float64", "float32", "int16", "int32"]
+
+# fixed point values are stored as round(value * scale), these keep 1920x1080 pixel coordinates in range,
+# recorders of other values set their own `fixed_point_scales`
+DEFAULT_FIXED_POINT_SCALES = {"int16": 8.0, "int32": 1024.0}
+PRECISION_SIDECAR_SUFFIX = ".json"
+
+
+@dataclass
+class OutputPrecision:
+    """
+    Data type tracked data is output and saved in.
+
+    Float types store missing points as NaN.
+    Integer types store fixed point values `round(value * scale)`, with `missing_value` marking missing points.
+    Without a scale, the scale of the dtype in `default_scales` is used, which default to scales for pixels.
+    """
+
+    dtype: OutputDtype = "float64"
+    scale: Optional[float] = None
+    missing_value: Optional[int] = None
+    default_scales: InitVar[Optional[Dict[str, float]]] = None
+
+    def __post_init__(self, default_scales: Optional[Dict[str, float]]):
+        if self.is_fixed_point:
+            if self.scale is None:
+                self.scale = (default_scales or DEFAULT_FIXED_POINT_SCALES)[self.dtype]
+            if self.missing_value is None:
+                self.missing_value = int(np.iinfo(self.dtype).min)
+        else:
+            self.scale = None
+            self.missing_value = None
+
+    @property
+    def is_fixed_point(self) -> bool:
+        return np.issubdtype(np.dtype(self.dtype), np.integer)
+
+    @property
+    def working_dtype(self) -> np.dtype:
+        """
+        Float dtype recorders can build their arrays in before they are encoded.
+        """
+        if self.dtype in ("float32", "int16"):
+            return np.dtype(np.float32)
+        return np.dtype(np.float64)
+
+    def encode(self, array: np.ndarray) -> np.ndarray:
+        """
+        Convert a float array with NaN for missing points to the output dtype.
+        """
+        if not self.is_fixed_point:
+            return array.astype(self.dtype, copy=False)
+
+        integer_info = np.iinfo(self.dtype)
+        missing = np.isnan(array)
+        scaled = np.rint(np.where(missing, 0, array) * self.scale)
+        # the minimum is reserved for the missing value sentinel
+        clipped = np.clip(scaled, integer_info.min + 1, integer_info.max)
+        if not np.array_equal(clipped, scaled):
+            logger.warning(
+                f"Values outside the {self.dtype} range at scale {self.scale} were clipped, use a smaller scale or int32"
+            )
+        encoded = clipped.astype(self.dtype)
+        encoded[missing] = self.missing_value
+        return encoded
+
+    def decode(self, array: np.ndarray) -> np.ndarray:
+        """
+        Convert an array in the output dtype back to floats with NaN for missing points.
+        """
+        if not self.is_fixed_point:
+            return array
+        decoded = array / self.scale
+        decoded[array == self.missing_value] = np.nan
+        return decoded
+
+    @classmethod
+    def from_params(
+        cls, tracking_params, default_scales: Optional[Dict[str, float]] = None
+    ) -> "OutputPrecision":
+        """
+        Read the output precision from tracking params, defaulting to float64.
+
+        :param default_scales: Fixed point scale per dtype when the params set none, defaults to scales for pixels.
+        """
+        return cls(
+            dtype=getattr(tracking_params, "output_dtype", "float64"),
+            scale=getattr(tracking_params, "output_scale", None),
+            default_scales=default_scales,
+        )
+
+
+def get_precision_sidecar_path(file_path: Union[str, Path]) -> Path:
+    return Path(file_path).with_suffix(PRECISION_SIDECAR_SUFFIX)
+
+
+def save_tracking_array(
+    file_path: Union[str, Path],
+    array: np.ndarray,
+    output_precision: OutputPrecision,
+) -> None:
+    """
+    Save a tracking array as .npy, with a .json sidecar holding the scale and missing value of fixed point data.
+    """
+    np.save(file_path, array)
+    save_precision_sidecar(file_path, output_precision)
+
+
+def save_precision_sidecar(
+    file_path: Union[str, Path], output_precision: OutputPrecision
+) -> None:
+    """
+    Write the scale and missing value of fixed point data next to its .npy file, float data needs no sidecar.
+
+    A sidecar left by an earlier fixed point save to the same path is removed when float data is saved.
+    """
+    sidecar_path = get_precision_sidecar_path(file_path)
+    if output_precision.is_fixed_point:
+        sidecar_path.write_text(json.dumps(asdict(output_precision), indent=4))
+    elif sidecar_path.exists() and is_precision_sidecar(sidecar_path):
+        logger.info(f"Removing stale precision sidecar {sidecar_path}")
+        sidecar_path.unlink()
+
+
+def is_precision_sidecar(sidecar_path: Path) -> bool:
+    """
+    Whether a .json file holds a saved output precision, so unrelated files of the same name are left alone.
+    """
+    try:
+        sidecar = json.loads(sidecar_path.read_text())
+    except (OSError, ValueError):
+        return False
+    return isinstance(sidecar, dict) and set(sidecar) == {"dtype", "scale", "missing_value"}
+
+
+def load_tracking_array(file_path: Union[str, Path], **load_kwargs) -> np.ndarray:
+    """
+    Load a tracking array saved by `save_tracking_array`, decoding fixed point data back to floats.
+    """
+    array = np.load(file_path, **load_kwargs)
+    sidecar_path = get_precision_sidecar_path(file_path)
+    if np.issubdtype(array.dtype, np.integer) and sidecar_path.exists():
+        return OutputPrecision(**json.loads(sidecar_path.read_text())).decode(array)
+    return array
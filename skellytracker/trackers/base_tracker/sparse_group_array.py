@@ -0,0 +1,238 @@
+from dataclasses import dataclass
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ALL_POINTS_GROUP_NAME = "all"
+
+
+def pack_validity(validity: np.ndarray) -> np.ndarray:
+    """
+    Pack a (frames, groups) boolean array into (frames, ceil(groups / 8)) bytes, one bit per group.
+    """
+    return np.packbits(validity, axis=-1, bitorder="little")
+
+
+def unpack_validity(validity_bits: np.ndarray, number_of_groups: int) -> np.ndarray:
+    return np.unpackbits(
+        validity_bits, axis=-1, count=number_of_groups, bitorder="little"
+    ).astype(bool)
+
+
+@dataclass
+class SparseGroupArray:
+    """
+    Compact storage of a (frames, points, dimensions) tracking array whose landmark groups, e.g. hands and faces,
+    are missing in many frames.
+
+    A bitmask holds, per frame, whether each group was detected, and the values of every group are packed into a
+    (detected frames, group points, dimensions) array. Groups that are entirely missing in a frame take no space,
+    groups that are only partly missing are stored as is, so `to_dense` restores the dense array exactly.
+    Missing values are NaN in float data and `missing_value` in fixed point data.
+    """
+
+    shape: Tuple[int, int, int]
+    landmark_groups: Dict[str, Tuple[int, int]]
+    validity_bits: np.ndarray  # (frames, ceil(groups / 8)) uint8, bit g of a frame is set if group g is stored
+    group_values: Dict[str, np.ndarray]  # group name -> (detected frames, group points, dimensions)
+    missing_value: Optional[int] = None
+
+    @staticmethod
+    def check_landmark_groups(
+        landmark_groups: Dict[str, Tuple[int, int]], number_of_points: int
+    ) -> None:
+        """
+        Check that the groups cover every point exactly once, so the conversion is lossless.
+        """
+        covered_points = np.zeros(number_of_points, dtype=int)
+        for group_name, (start, stop) in landmark_groups.items():
+            if not 0 <= start < stop <= number_of_points:
+                raise ValueError(
+                    f"Landmark group {group_name} ({start}, {stop}) is outside the {number_of_points} points"
+                )
+            covered_points[start:stop] += 1
+        if not np.all(covered_points == 1):
+            raise ValueError(
+                f"Landmark groups must cover each of the {number_of_points} points exactly once, "
+                f"points {np.flatnonzero(covered_points != 1).tolist()} are not"
+            )
+
+    @classmethod
+    def from_group_values(
+        cls,
+        shape: Tuple[int, int, int],
+        landmark_groups: Dict[str, Tuple[int, int]],
+        validity: np.ndarray,
+        group_values: Dict[str, np.ndarray],
+        missing_value: Optional[int] = None,
+    ) -> "SparseGroupArray":
+        """
+        Build from already packed group values, for recorders that never build the dense array.
+
+        :param validity: (frames, groups) boolean array, in the order of `landmark_groups`.
+        :param group_values: Values of each group in the frames it is valid in.
+        """
+        cls.check_landmark_groups(landmark_groups, shape[1])
+        for group_index, (group_name, (start, stop)) in enumerate(
+            landmark_groups.items()
+        ):
+            expected_shape = (
+                int(np.count_nonzero(validity[:, group_index])),
+                stop - start,
+                shape[2],
+            )
+            if group_values[group_name].shape != expected_shape:
+                raise ValueError(
+                    f"Expected values of shape {expected_shape} for group {group_name}, "
+                    f"got {group_values[group_name].shape}"
+                )
+        return cls(
+            shape=tuple(shape),
+            landmark_groups=dict(landmark_groups),
+            validity_bits=pack_validity(validity),
+            group_values=group_values,
+            missing_value=missing_value,
+        )
+
+    @classmethod
+    def from_dense(
+        cls,
+        dense: np.ndarray,
+        landmark_groups: Optional[Dict[str, Tuple[int, int]]] = None,
+        missing_value: Optional[int] = None,
+    ) -> "SparseGroupArray":
+        """
+        :param dense: (frames, points, dimensions) array.
+        :param landmark_groups: (start, stop) points of each group, e.g. `ModelInfo.landmark_groups`.
+            Defaults to a single group of all points.
+        :param missing_value: Value marking missing points in fixed point data, float data uses NaN.
+        """
+        if dense.ndim != 3:
+            raise ValueError(
+                f"Expected a (frames, points, dimensions) array, got shape {dense.shape}"
+            )
+        if not landmark_groups:
+            landmark_groups = {ALL_POINTS_GROUP_NAME: (0, dense.shape[1])}
+        cls.check_landmark_groups(landmark_groups, dense.shape[1])
+
+        if np.issubdtype(dense.dtype, np.floating):
+            missing = np.isnan(dense)
+        elif missing_value is not None:
+            missing = dense == missing_value
+        else:
+            missing = np.zeros(dense.shape, dtype=bool)
+        missing_points = missing.all(axis=-1)
+
+        validity = np.empty((dense.shape[0], len(landmark_groups)), dtype=bool)
+        group_values = {}
+        for group_index, (group_name, (start, stop)) in enumerate(
+            landmark_groups.items()
+        ):
+            validity[:, group_index] = ~missing_points[:, start:stop].all(axis=-1)
+            group_values[group_name] = dense[validity[:, group_index], start:stop]
+        return cls(
+            shape=dense.shape,
+            landmark_groups=dict(landmark_groups),
+            validity_bits=pack_validity(validity),
+            group_values=group_values,
+            missing_value=missing_value,
+        )
+
+    @property
+    def group_names(self) -> List[str]:
+        return list(self.landmark_groups.keys())
+
+    @property
+    def dtype(self) -> np.dtype:
+        return next(iter(self.group_values.values())).dtype
+
+    @property
+    def validity(self) -> np.ndarray:
+        """
+        (frames, groups) boolean array of the groups stored in each frame, in the order of `group_names`.
+        """
+        return unpack_validity(self.validity_bits, len(self.landmark_groups))
+
+    @property
+    def nbytes(self) -> int:
+        return self.validity_bits.nbytes + sum(
+            values.nbytes for values in self.group_values.values()
+        )
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def get_fill_value(self) -> Union[float, int]:
+        if np.issubdtype(self.dtype, np.floating):
+            return np.nan
+        return 0 if self.missing_value is None else self.missing_value
+
+    def get_group(self, group_name: str) -> np.ndarray:
+        """
+        Dense (frames, group points, dimensions) array of one group.
+        """
+        if group_name not in self.landmark_groups:
+            raise KeyError(
+                f"{group_name} is not a landmark group, available groups: {self.group_names}"
+            )
+        start, stop = self.landmark_groups[group_name]
+        group_index = self.group_names.index(group_name)
+        group = np.full(
+            (self.shape[0], stop - start, self.shape[2]),
+            self.get_fill_value(),
+            dtype=self.dtype,
+        )
+        group[self.validity[:, group_index]] = self.group_values[group_name]
+        return group
+
+    def to_dense(self) -> np.ndarray:
+        dense = np.full(self.shape, self.get_fill_value(), dtype=self.dtype)
+        validity = self.validity
+        for group_index, (group_name, (start, stop)) in enumerate(
+            self.landmark_groups.items()
+        ):
+            dense[validity[:, group_index], start:stop] = self.group_values[group_name]
+        return dense
+
+    def save(self, file_path: Union[str, Path]) -> None:
+        """
+        Save as an uncompressed `.npz` file, readable without pickle.
+        """
+        np.savez(
+            file_path,
+            shape=np.array(self.shape),
+            group_names=np.array(self.group_names),
+            group_ranges=np.array(list(self.landmark_groups.values())).reshape(-1, 2),
+            validity_bits=self.validity_bits,
+            missing_value=np.array(
+                [] if self.missing_value is None else [self.missing_value]
+            ),
+            **{
+                f"group_values_{group_index}": values
+                for group_index, values in enumerate(self.group_values.values())
+            },
+        )
+
+    @classmethod
+    def load(cls, file_path: Union[str, Path]) -> "SparseGroupArray":
+        with np.load(file_path, allow_pickle=False) as data:
+            group_names = data["group_names"].tolist()
+            landmark_groups = {
+                group_name: (int(start), int(stop))
+                for group_name, (start, stop) in zip(group_names, data["group_ranges"])
+            }
+            missing_value = data["missing_value"]
+            return cls(
+                shape=tuple(int(size) for size in data["shape"]),
+                landmark_groups=landmark_groups,
+                validity_bits=data["validity_bits"],
+                group_values={
+                    group_name: data[f"group_values_{group_index}"]
+                    for group_index, group_name in enumerate(group_names)
+                },
+                missing_value=int(missing_value[0]) if missing_value.size else None,
+            )
@@ -1,4 +1,4 @@
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from typing import Any, Dict, Optional
 
 
@@ -13,3 +13,17 @@ class TrackedObject:
     pixel_y: Optional[float] = None
     depth_z: Optional[float] = None
     extra: Dict[str, Any] = field(default_factory=dict)
+
+
+def copy_tracked_objects(
+    tracked_objects: Dict[str, TrackedObject],
+) -> Dict[str, TrackedObject]:
+    """
+    Copy a tracked objects dictionary so the tracker can keep updating its own objects.
+
+    Values in `extra` are shared rather than deep copied, trackers replace them on every frame rather than mutating them.
+    """
+    return {
+        name: replace(tracked_object, extra=dict(tracked_object.extra))
+        for name, tracked_object in tracked_objects.items()
+    }
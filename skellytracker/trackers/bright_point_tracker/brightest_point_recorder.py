@@ -19,10 +19,15 @@ class BrightestPointRecorder(BaseRecorder):
         num_frames = len(self.recorded_objects)
         num_points = len(self.recorded_objects[0]) if num_frames > 0 else 0
 
-        self.recorded_objects_array = np.zeros((num_frames, num_points, 2))
+        recorded_objects_array = np.zeros(
+            (num_frames, num_points, 2), dtype=self.output_precision.working_dtype
+        )
         for i, recorded_object in enumerate(self.recorded_objects):
             for j, (pixel_x, pixel_y) in enumerate(recorded_object):
-                self.recorded_objects_array[i, j, 0] = pixel_x
-                self.recorded_objects_array[i, j, 1] = pixel_y
+                recorded_objects_array[i, j, 0] = pixel_x
+                recorded_objects_array[i, j, 1] = pixel_y
 
+        self.recorded_objects_array = self.output_precision.encode(
+            recorded_objects_array
+        )
         return self.recorded_objects_array
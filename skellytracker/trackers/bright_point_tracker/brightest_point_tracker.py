@@ -1,5 +1,5 @@
 import logging
-from typing import Dict
+from typing import Dict, List, Literal, Optional
 
 import cv2
 import numpy as np
@@ -10,11 +10,19 @@ from skellytracker.trackers.base_tracker.tracked_object import TrackedObject
 from skellytracker.trackers.bright_point_tracker.brightest_point_recorder import (
     BrightestPointRecorder,
 )
+from skellytracker.trackers.bright_point_tracker.point_motion_model import (
+    ConstantVelocityPointModel,
+    KalmanPointModel,
+    PointMotionModel,
+)
 
 UPPER_BOUND_COLOR = [255, 255, 255]
 
 LOWER_BOUND_COLOR = [40, 40, 40]
 
+# Number of times a search window doubles in size to take in a patch that crosses its edge
+MAXIMUM_WINDOW_GROWTH_STEPS = 2
+
 logger = logging.getLogger(__name__)
 
 
@@ -24,17 +32,120 @@ class BrightPatch(BaseModel):
     centroid_y: int
 
 
+def remove_claimed_patches(thresholded_image: np.ndarray, claimed_mask: np.ndarray) -> None:
+    """
+    Black out, in place, the bright patches of a thresholded image that touch any claimed pixel.
+    """
+    if not claimed_mask.any():
+        return
+    _, labels = cv2.connectedComponents(thresholded_image, connectivity=8)
+    claimed_labels = np.unique(labels[claimed_mask])
+    thresholded_image[np.isin(labels, claimed_labels[claimed_labels > 0])] = 0
+
+
 class BrightestPointTracker(BaseTracker):
-    def __init__(self, num_points: int = 1, luminance_threshold: int = 200):
+    def __init__(
+        self,
+        num_points: int = 1,
+        luminance_threshold: int = 200,
+        detection_engine: Literal["contours", "connected_components"] = "contours",
+        search_mode: Literal["full_frame", "predictive_roi"] = "full_frame",
+        search_window_radius: int = 20,
+        motion_model: Literal["constant_velocity", "kalman"] = "constant_velocity",
+        reacquire_interval_frames: int = 10,
+    ):
+        """
+        Track the centroids of the largest bright patches in an image.
+
+        :param num_points: Number of bright points to track.
+        :param luminance_threshold: Grayscale value above which a pixel counts as bright.
+        :param detection_engine: "contours" finds patches with `findContours` and `moments`,
+            "connected_components" uses a single `connectedComponentsWithStats` pass and numpy top-k selection,
+            which is faster when there are many bright patches in the image. Its centroids approximate the contour
+            engine's to within about a pixel, and patches of nearly equal size may be ranked differently.
+        :param search_mode: "full_frame" finds the largest patches in every frame.
+            "predictive_roi" only searches a small window around each point's predicted position,
+            falling back to a full frame scan for points that were lost. In this mode each point keeps its identity
+            across frames rather than being ordered by patch size, and tracked objects carry no "thresholdedimage"
+            since the full frame is not thresholded.
+        :param search_window_radius: Half width in pixels of the search window used in "predictive_roi" mode,
+            should be larger than a marker's radius plus its motion between frames. Windows grow to take in
+            patches that cross their edge. Within windows, patches are ranked by pixel count whatever the engine.
+        :param motion_model: How to predict each point's position in "predictive_roi" mode.
+        :param reacquire_interval_frames: In "predictive_roi" mode, how often lost points are searched for in the
+            full frame while other points are tracked. Points that were just lost are searched for right away.
+        """
         super().__init__(
             tracked_object_names=[f"brightest_point_{i}" for i in range(num_points)],
             recorder=BrightestPointRecorder(),
         )
 
+        if detection_engine not in ("contours", "connected_components"):
+            raise ValueError(f"Unknown detection_engine: {detection_engine}")
+        if search_mode not in ("full_frame", "predictive_roi"):
+            raise ValueError(f"Unknown search_mode: {search_mode}")
+        if motion_model not in ("constant_velocity", "kalman"):
+            raise ValueError(f"Unknown motion_model: {motion_model}")
+
         self.num_points = num_points
         self.luminance_threshold = luminance_threshold
+        self.detection_engine = detection_engine
+        self.search_mode = search_mode
+        self.search_window_radius = search_window_radius
+        self.motion_model = motion_model
+        self.reacquire_interval_frames = reacquire_interval_frames
+
+        self.point_models: List[Optional[PointMotionModel]] = [None] * num_points
+        self.frames_until_reacquisition = 0
+
+    @property
+    def is_stateless(self) -> bool:
+        # predictive search windows depend on the previous frames
+        return self.search_mode == "full_frame"
+
+    def copy_for_thread(self) -> "BrightestPointTracker":
+        return BrightestPointTracker(
+            num_points=self.num_points,
+            luminance_threshold=self.luminance_threshold,
+            detection_engine=self.detection_engine,
+            search_mode=self.search_mode,
+            search_window_radius=self.search_window_radius,
+            motion_model=self.motion_model,
+            reacquire_interval_frames=self.reacquire_interval_frames,
+        )
 
     def process_image(self, image: np.ndarray, **kwargs) -> Dict[str, TrackedObject]:
+        if self.search_mode == "predictive_roi":
+            point_centroids = self.track_points_in_search_windows(image)
+        else:
+            thresholded_image = self.threshold_image(image)
+            largest_centroids = self.find_largest_patches(thresholded_image)
+
+            point_centroids = np.full((self.num_points, 2), np.nan)
+            point_centroids[: len(largest_centroids)] = largest_centroids
+            for tracked_object in self.tracked_objects.values():
+                tracked_object.extra["thresholdedimage"] = thresholded_image
+
+        for i, (centroid_x, centroid_y) in enumerate(point_centroids):
+            if np.isnan(centroid_x):
+                self.tracked_objects[f"brightest_point_{i}"].pixel_x = (
+                    None  # TODO: Is this the right value for missing data?
+                )
+                self.tracked_objects[f"brightest_point_{i}"].pixel_y = None
+            else:
+                self.tracked_objects[f"brightest_point_{i}"].pixel_x = int(centroid_x)
+                self.tracked_objects[f"brightest_point_{i}"].pixel_y = int(centroid_y)
+
+        self.annotated_image = self.annotate_image(
+            image=image, tracked_objects=self.tracked_objects
+        )
+
+        return self.tracked_objects
+
+    def threshold_image(self, image: np.ndarray) -> np.ndarray:
+        """
+        Convert a BGR image to a binary image of its bright regions.
+        """
         # Convert the image to grayscale
         gray_image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
 
@@ -42,7 +153,146 @@ class BrightestPointTracker(BaseTracker):
         _, thresholded_image = cv2.threshold(
             gray_image, self.luminance_threshold, 255, cv2.THRESH_BINARY
         )
+        return thresholded_image
+
+    def find_largest_patches(
+        self, thresholded_image: np.ndarray, max_patches: Optional[int] = None
+    ) -> np.ndarray:
+        """
+        Find the centroids of the largest bright patches with the configured detection engine.
+        """
+        if self.detection_engine == "connected_components":
+            return self.find_largest_patches_connected_components(
+                thresholded_image, max_patches=max_patches
+            )
+        return self.find_largest_patches_contours(
+            thresholded_image, max_patches=max_patches
+        )
+
+    def track_points_in_search_windows(self, image: np.ndarray) -> np.ndarray:
+        """
+        Find each point in a small window around its predicted position.
+
+        Each patch is claimed by one point per frame, so points whose windows overlap don't lock onto the same patch.
+        Points that aren't found in their window are marked lost, and a full frame scan assigns them
+        to the largest patches that aren't already claimed. While some points are tracked, lost points are only
+        scanned for every `reacquire_interval_frames` frames, so a missing marker doesn't cost a full frame scan
+        on every frame.
+
+        :param image: An input image.
+        :return: Float array of shape (num_points, 2) with (x, y) centroids, NaN for points that weren't found.
+        """
+        point_centroids = np.full((self.num_points, 2), np.nan)
+        lost_points = []
+        claimed_mask = np.zeros(image.shape[:2], dtype=bool)
+
+        for i, point_model in enumerate(self.point_models):
+            if point_model is None:
+                lost_points.append(i)
+                continue
+            centroid = self.search_window(image, point_model.predict(), claimed_mask)
+            if centroid is None:
+                self.point_models[i] = None
+                lost_points.append(i)
+                # a point that was just lost may have jumped, look for it right away
+                self.frames_until_reacquisition = 0
+            else:
+                point_model.correct(*centroid)
+                point_centroids[i] = centroid
+
+        if not lost_points:
+            return point_centroids
+        if self.frames_until_reacquisition > 0 and len(lost_points) < self.num_points:
+            self.frames_until_reacquisition -= 1
+            return point_centroids
+
+        thresholded_image = self.threshold_image(image)
+        remove_claimed_patches(thresholded_image, claimed_mask)
+        candidates = self.find_largest_patches(
+            thresholded_image, max_patches=len(lost_points)
+        )
+        for i, candidate in zip(lost_points, candidates):
+            point_centroids[i] = candidate
+            self.point_models[i] = self.create_point_model(*candidate)
+        self.frames_until_reacquisition = self.reacquire_interval_frames - 1
+
+        return point_centroids
+
+    def search_window(
+        self,
+        image: np.ndarray,
+        predicted_position: np.ndarray,
+        claimed_mask: Optional[np.ndarray] = None,
+    ) -> Optional[np.ndarray]:
+        """
+        Find the largest bright patch in the window around a predicted position, growing the window
+        when the patch crosses its edge.
+
+        :param claimed_mask: Boolean mask of the image's pixels claimed by other points this frame. Patches touching
+            claimed pixels are skipped, and the pixels of the patch that is found are added to the mask.
+        :return: The (x, y) centroid in full image coordinates, or None if there is no bright patch in the window.
+        """
+        image_height, image_width = image.shape[:2]
+        center_x, center_y = np.round(predicted_position).astype(int)
+        radius = self.search_window_radius
+        for _ in range(MAXIMUM_WINDOW_GROWTH_STEPS + 1):
+            left = max(center_x - radius, 0)
+            right = min(center_x + radius + 1, image_width)
+            top = max(center_y - radius, 0)
+            bottom = min(center_y + radius + 1, image_height)
+            if left >= right or top >= bottom:
+                return None
+
+            # a single labeling of the window serves the claimed patch check, the patch choice and its claim
+            thresholded_window = self.threshold_image(image[top:bottom, left:right])
+            _, labels, stats, centroids = cv2.connectedComponentsWithStats(
+                thresholded_window, connectivity=8
+            )
+            areas = stats[:, cv2.CC_STAT_AREA].copy()
+            areas[0] = 0  # background
+            if claimed_mask is not None:
+                areas[labels[claimed_mask[top:bottom, left:right]]] = 0
+            label = int(np.argmax(areas))
+            if areas[label] == 0:
+                return None
+
+            patch_left, patch_top, patch_width, patch_height = stats[label, :4]
+            crosses_window_edge = (
+                (patch_left == 0 and left > 0)
+                or (patch_top == 0 and top > 0)
+                or (patch_left + patch_width == right - left and right < image_width)
+                or (patch_top + patch_height == bottom - top and bottom < image_height)
+            )
+            if not crosses_window_edge:
+                break
+            # the patch continues past the window, which would cut its centroid short
+            radius *= 2
+
+        if claimed_mask is not None:
+            claimed_mask[top:bottom, left:right] |= labels == label
+        # truncate like the detection engines do
+        return centroids[label].astype(np.int64) + (left, top)
+
+    def create_point_model(self, x: float, y: float) -> PointMotionModel:
+        if self.motion_model == "kalman":
+            return KalmanPointModel(x, y)
+        return ConstantVelocityPointModel(x, y)
+
+    def cleanup(self) -> None:
+        super().cleanup()
+        self.point_models = [None] * self.num_points
+        self.frames_until_reacquisition = 0
 
+    def find_largest_patches_contours(
+        self, thresholded_image: np.ndarray, max_patches: Optional[int] = None
+    ) -> np.ndarray:
+        """
+        Find the centroids of the largest bright patches using contours.
+
+        :param thresholded_image: Binary image of bright regions.
+        :param max_patches: Maximum number of patches to return, defaults to `num_points`.
+        :return: Integer array of shape (num_found, 2) with (x, y) centroids, ordered from largest to smallest patch.
+        """
         # Find contours of the bright regions
         bright_patches, _ = cv2.findContours(
             thresholded_image, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
@@ -66,26 +316,50 @@ class BrightestPointTracker(BaseTracker):
 
         largest_patches = sorted(
             patch_list, key=lambda patch: patch.area, reverse=True
-        )[: self.num_points]
-
-        for i, patch in enumerate(largest_patches):
-            self.tracked_objects[f"brightest_point_{i}"].pixel_x = patch.centroid_x
-            self.tracked_objects[f"brightest_point_{i}"].pixel_y = patch.centroid_y
-            self.tracked_objects[f"brightest_point_{i}"].extra[
-                "thresholdedimage"
-            ] = thresholded_image
-
-        for i in range(len(largest_patches), self.num_points):
-            self.tracked_objects[f"brightest_point_{i}"].pixel_x = (
-                None  # TODO: Is this the right value for missing data?
-            )
-            self.tracked_objects[f"brightest_point_{i}"].pixel_y = None
+        )[: max_patches or self.num_points]
 
-        self.annotated_image = self.annotate_image(
-            image=image, tracked_objects=self.tracked_objects
+        return np.array(
+            [[patch.centroid_x, patch.centroid_y] for patch in largest_patches],
+            dtype=np.int64,
+        ).reshape(-1, 2)
+
+    def find_largest_patches_connected_components(
+        self, thresholded_image: np.ndarray, max_patches: Optional[int] = None
+    ) -> np.ndarray:
+        """
+        Find the centroids of the largest bright patches using connected components.
+
+        Works entirely on the arrays returned by `connectedComponentsWithStats`, selecting the largest patches
+        with `argpartition` rather than sorting every patch.
+        The result approximates `find_largest_patches`: centroids are the mean of the patch pixels rather than the
+        moments of the outer contour polygon, so they can differ by about a pixel, and patches are ranked by pixel
+        count rather than contour area, so patches of nearly equal size may swap order.
+
+        :param thresholded_image: Binary image of bright regions.
+        :param max_patches: Maximum number of patches to return, defaults to `num_points`.
+        :return: Integer array of shape (num_found, 2) with (x, y) centroids, ordered from largest to smallest patch.
+        """
+        # 8-connectivity matches the connectivity findContours uses for its outer borders,
+        # Grana's block-based labeling was the fastest of OpenCV's algorithms on sparse highlight images
+        number_of_labels, _, stats, centroids = (
+            cv2.connectedComponentsWithStatsWithAlgorithm(
+                thresholded_image, 8, cv2.CV_32S, cv2.CCL_GRANA
+            )
         )
 
-        return self.tracked_objects
+        max_patches = max_patches or self.num_points
+
+        # label 0 is the background
+        areas = stats[1:, cv2.CC_STAT_AREA]
+        centroids = centroids[1:]
+        if areas.size > max_patches:
+            top_k_indices = np.argpartition(-areas, max_patches - 1)[:max_patches]
+        else:
+            top_k_indices = np.arange(number_of_labels - 1)
+        top_k_indices = top_k_indices[np.lexsort((top_k_indices, -areas[top_k_indices]))]
+
+        # truncate like the contour engine does
+        return centroids[top_k_indices].astype(np.int64)
 
     def annotate_image(
         self, image: np.ndarray, tracked_objects: Dict[str, TrackedObject], **kwargs
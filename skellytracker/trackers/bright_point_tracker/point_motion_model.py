@@ -0,0 +1,81 @@
+from abc import ABC, abstractmethod
+
+import cv2
+import numpy as np
+
+
+class PointMotionModel(ABC):
+    """
+    Predicts where a single tracked point will be in the next frame.
+
+    `predict` is called once per frame before searching, `correct` with the position that was found.
+    """
+
+    @abstractmethod
+    def predict(self) -> np.ndarray:
+        """
+        Predict the position of the point in the current frame.
+
+        :return: Predicted (x, y) position.
+        """
+        pass
+
+    @abstractmethod
+    def correct(self, x: float, y: float) -> None:
+        """
+        Update the model with the position the point was found at in the current frame.
+        """
+        pass
+
+
+class ConstantVelocityPointModel(PointMotionModel):
+    """
+    Assumes the point keeps moving with the velocity between its last two detections.
+    """
+
+    def __init__(self, x: float, y: float):
+        self.position = np.array([x, y], dtype=np.float64)
+        self.velocity = np.zeros(2, dtype=np.float64)
+
+    def predict(self) -> np.ndarray:
+        return self.position + self.velocity
+
+    def correct(self, x: float, y: float) -> None:
+        new_position = np.array([x, y], dtype=np.float64)
+        self.velocity = new_position - self.position
+        self.position = new_position
+
+
+class KalmanPointModel(PointMotionModel):
+    """
+    Constant velocity Kalman filter over the state (x, y, vx, vy), smoothing out detection jitter.
+    """
+
+    def __init__(
+        self,
+        x: float,
+        y: float,
+        process_noise: float = 1e-2,
+        measurement_noise: float = 1.0,
+    ):
+        self.kalman_filter = cv2.KalmanFilter(4, 2)
+        self.kalman_filter.transitionMatrix = np.array(
+            [[1, 0, 1, 0], [0, 1, 0, 1], [0, 0, 1, 0], [0, 0, 0, 1]], dtype=np.float32
+        )
+        self.kalman_filter.measurementMatrix = np.array(
+            [[1, 0, 0, 0], [0, 1, 0, 0]], dtype=np.float32
+        )
+        self.kalman_filter.processNoiseCov = (
+            np.eye(4, dtype=np.float32) * process_noise
+        )
+        self.kalman_filter.measurementNoiseCov = (
+            np.eye(2, dtype=np.float32) * measurement_noise
+        )
+        self.kalman_filter.errorCovPost = np.eye(4, dtype=np.float32)
+        self.kalman_filter.statePost = np.array([[x], [y], [0], [0]], dtype=np.float32)
+
+    def predict(self) -> np.ndarray:
+        return self.kalman_filter.predict()[:2, 0].astype(np.float64)
+
+    def correct(self, x: float, y: float) -> None:
+        self.kalman_filter.correct(np.array([[x], [y]], dtype=np.float32))
@@ -2,6 +2,7 @@ from skellytracker.trackers.base_tracker.model_info import ModelInfo
 from skellytracker.trackers.base_tracker.base_tracking_params import BaseTrackingParams
 
 import cv2
+from typing import Literal
 
 class CharucoModelInfo(ModelInfo):
     name = "charuco"
@@ -11,5 +12,7 @@ class CharucoTrackingParams(BaseTrackingParams):
     charuco_squares_x_in: int = 7
     charuco_squares_y_in: int = 5
     charuco_dict_id: int = cv2.aruco.DICT_4X4_250
+    charuco_detection_mode: Literal["full_resolution", "pyramid"] = "full_resolution"
+    charuco_detector_preset: Literal["default", "fast", "accurate"] = "default"
 
 
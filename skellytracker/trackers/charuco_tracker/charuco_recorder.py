@@ -1,23 +1,132 @@
-from copy import deepcopy
-from typing import Dict
+from typing import Dict, List, Optional, Tuple
 import numpy as np
 
 from skellytracker.trackers.base_tracker.base_recorder import BaseRecorder
+from skellytracker.trackers.base_tracker.output_precision import OutputPrecision
 from skellytracker.trackers.base_tracker.tracked_object import TrackedObject
 
+INITIAL_FRAME_CAPACITY = 1024
+
 
 class CharucoRecorder(BaseRecorder):
+    def __init__(
+        self,
+        tracked_object_names: Optional[List[str]] = None,
+        dtype: np.dtype = np.float64,
+        output_precision: Optional[OutputPrecision] = None,
+    ):
+        """
+        Record charuco corners straight into a NaN filled (frames, corners, 2) array, `corner_array`.
+
+        `recorded_objects` is still a list of each frame's tracked objects, but it is rebuilt from `corner_array`
+        every time it is read, so use `corner_array` to work with the recorded corners.
+
+        :param tracked_object_names: Corner ids in output order, defaults to the order of the first recorded frame.
+        :param dtype: Float dtype the corners are recorded in.
+        :param output_precision: Data type of the processed array, defaults to `dtype`.
+        """
+        super().__init__(
+            output_precision=output_precision
+            or OutputPrecision(dtype=np.dtype(dtype).name)
+        )
+        self.dtype = np.dtype(dtype)
+        self.slot_index: Dict[str, int] = {}
+        if tracked_object_names is not None:
+            self.set_slot_index(tracked_object_names)
+        self.corner_buffer = np.empty((0, len(self.slot_index), 2), dtype=self.dtype)
+        self.number_of_frames = 0
+
+    def set_slot_index(self, tracked_object_names: List[str]) -> None:
+        """
+        Precompute the output slot of each corner id.
+        """
+        self.slot_index = {name: slot for slot, name in enumerate(tracked_object_names)}
+
     def record(self, tracked_objects: Dict[str, TrackedObject]) -> None:
-        self.recorded_objects.append(
-            [deepcopy(tracked_object) for tracked_object in tracked_objects.values()]
+        if not self.slot_index:
+            self.set_slot_index(list(tracked_objects.keys()))
+        if self.number_of_frames == self.corner_buffer.shape[0]:
+            self.grow_corner_buffer()
+
+        self.fill_frame_corners(
+            self.corner_buffer[self.number_of_frames], tracked_objects
         )
+        self.number_of_frames += 1
 
-    def process_tracked_objects(self, **kwargs) -> np.ndarray:
-        self.recorded_objects_array = np.array(
+    @property
+    def corner_array(self) -> np.ndarray:
+        """
+        View of the (frames, corners, 2) corners recorded so far, NaN for corners that weren't detected.
+        """
+        return self.corner_buffer[: self.number_of_frames]
+
+    @property
+    def recorded_objects(self) -> List[List[TrackedObject]]:
+        """
+        Tracked objects of each recorded frame in corner order, built from `corner_array`.
+        """
+        names = list(self.slot_index)
+        return [
             [
-                [[tracked_object.pixel_x, tracked_object.pixel_y] for tracked_object in tracked_object_list]
-                for tracked_object_list in self.recorded_objects
+                TrackedObject(object_id=name)
+                if np.isnan(pixel_x)
+                else TrackedObject(object_id=name, pixel_x=float(pixel_x), pixel_y=float(pixel_y))
+                for name, (pixel_x, pixel_y) in zip(names, frame_corners)
             ]
+            for frame_corners in self.corner_array
+        ]
+
+    @recorded_objects.setter
+    def recorded_objects(self, recorded_objects: list) -> None:
+        # the base recorder resets its list here, corners are only ever recorded through `record`
+        if len(recorded_objects) > 0:
+            raise ValueError("CharucoRecorder records into corner_array, use record() to add frames")
+
+    def grow_corner_buffer(self) -> None:
+        """
+        Double the frame capacity of the corner buffer, new frames are NaN filled.
+        """
+        new_capacity = max(INITIAL_FRAME_CAPACITY, 2 * self.corner_buffer.shape[0])
+        corner_buffer = np.full(
+            (new_capacity, len(self.slot_index), 2), np.nan, dtype=self.dtype
         )
+        corner_buffer[: self.number_of_frames] = self.corner_buffer[
+            : self.number_of_frames
+        ]
+        self.corner_buffer = corner_buffer
+
+    def tracked_objects_to_frame_array(
+        self, tracked_objects: Dict[str, TrackedObject], **kwargs
+    ) -> np.ndarray:
+        if not self.slot_index:
+            self.set_slot_index(list(tracked_objects.keys()))
+        frame_corners = np.full((len(self.slot_index), 2), np.nan, dtype=self.dtype)
+        self.fill_frame_corners(frame_corners, tracked_objects)
+        return frame_corners
+
+    def fill_frame_corners(
+        self, frame_corners: np.ndarray, tracked_objects: Dict[str, TrackedObject]
+    ) -> None:
+        """
+        Write the detected corners of a frame into their slots of a (corners, 2) array.
+        """
+        for name, tracked_object in tracked_objects.items():
+            if tracked_object.pixel_x is not None and tracked_object.pixel_y is not None:
+                frame_corners[self.slot_index[name]] = (
+                    tracked_object.pixel_x,
+                    tracked_object.pixel_y,
+                )
+
+    def get_landmark_groups(self) -> Dict[str, Tuple[int, int]]:
+        # corners are detected independently, so each corner is its own group
+        return {name: (slot, slot + 1) for name, slot in self.slot_index.items()}
+
+    def process_tracked_objects(self, **kwargs) -> np.ndarray:
+        self.recorded_objects_array = self.output_precision.encode(self.corner_array)
 
         return self.recorded_objects_array
+
+    def clear_recorded_objects(self):
+        super().clear_recorded_objects()
+        self.corner_buffer = np.empty((0, len(self.slot_index), 2), dtype=self.dtype)
+        self.number_of_frames = 0
@@ -1,4 +1,4 @@
-from typing import Dict
+from typing import Dict, List, Literal, Optional, Tuple
 
 import cv2
 import numpy as np
@@ -10,6 +10,51 @@ from skellytracker.trackers.charuco_tracker.charuco_recorder import CharucoRecor
 
 default_dict_id = cv2.aruco.DICT_4X4_250
 
+# Overrides applied to cv2.aruco.DetectorParameters for each speed preset
+DETECTOR_PARAMETER_PRESETS = {
+    "default": {},
+    "fast": {
+        # only two adaptive threshold passes (3 and 23 pixel windows) instead of three
+        "adaptiveThreshWinSizeStep": 20,
+        "cornerRefinementMethod": cv2.aruco.CORNER_REFINE_NONE,
+    },
+    "accurate": {
+        # CORNER_REFINE_SUBPIX can snap marker corners to the neighbouring square on downscaled images,
+        # which throws off the charuco corner interpolation in pyramid mode
+        "adaptiveThreshWinSizeStep": 4,
+        "cornerRefinementMethod": cv2.aruco.CORNER_REFINE_CONTOUR,
+    },
+}
+
+
+def get_detector_parameters(
+    preset: Literal["default", "fast", "accurate"] = "default",
+) -> cv2.aruco.DetectorParameters:
+    """
+    Create aruco DetectorParameters for a speed preset.
+    """
+    if preset not in DETECTOR_PARAMETER_PRESETS:
+        raise ValueError(f"Unknown detector preset: {preset}")
+    detector_parameters = cv2.aruco.DetectorParameters()
+    for name, value in DETECTOR_PARAMETER_PRESETS[preset].items():
+        setattr(detector_parameters, name, value)
+    return detector_parameters
+
+
+def region_contains(
+    outer_region: Tuple[int, int, int, int], inner_region: Tuple[int, int, int, int]
+) -> bool:
+    """
+    Check whether a (left, top, right, bottom) region lies entirely inside another.
+    """
+    return (
+        outer_region[0] <= inner_region[0]
+        and outer_region[1] <= inner_region[1]
+        and inner_region[2] <= outer_region[2]
+        and inner_region[3] <= outer_region[3]
+    )
+
+
 class CharucoTracker(BaseTracker):
     def __init__(
         self,
@@ -18,12 +63,39 @@ class CharucoTracker(BaseTracker):
         dict_id: int = default_dict_id,
         square_length: float = 1,
         marker_length: float = 0.8,
+        detection_mode: Literal["full_resolution", "pyramid"] = "full_resolution",
+        pyramid_scale: float = 0.5,
+        reuse_board_region: bool = True,
+        board_region_padding: float = 0.25,
+        detector_preset: Literal["default", "fast", "accurate"] = "default",
     ):
+        """
+        Track the inner corners of a charuco board.
+
+        :param squares_x: Number of squares along the board's x axis.
+        :param squares_y: Number of squares along the board's y axis.
+        :param dict_id: Aruco dictionary id of the board's markers.
+        :param square_length: Length of a board square.
+        :param marker_length: Length of a board marker.
+        :param detection_mode: "full_resolution" runs `detectBoard` on the full frame.
+            "pyramid" detects markers on a downscaled image and only refines the charuco corners at full resolution.
+        :param pyramid_scale: Downscale factor for marker detection in "pyramid" mode.
+        :param reuse_board_region: In "pyramid" mode, search the previous frame's board region first,
+            falling back to full resolution detection on the full frame if the board isn't found there.
+        :param board_region_padding: Padding added around the board region, as a fraction of its size.
+        :param detector_preset: Speed preset for the aruco `DetectorParameters`, see `DETECTOR_PARAMETER_PRESETS`.
+        """
+        if detection_mode not in ("full_resolution", "pyramid"):
+            raise ValueError(f"Unknown detection_mode: {detection_mode}")
+        if not 0 < pyramid_scale <= 1:
+            raise ValueError(f"pyramid_scale must be in (0, 1], got {pyramid_scale}")
+
         number_of_charuco_markers = (squares_x - 1) * (squares_y - 1)
         tracked_object_names = [str(index) for index in range(number_of_charuco_markers)]
         dictionary = cv2.aruco.getPredefinedDictionary(dict_id)
-        super().__init__(    
-            recorder=CharucoRecorder(), tracked_object_names=tracked_object_names
+        super().__init__(
+            recorder=CharucoRecorder(tracked_object_names=tracked_object_names),
+            tracked_object_names=tracked_object_names,
         )
         self.board = cv2.aruco.CharucoBoard(
             size=(squares_x, squares_y),
@@ -33,18 +105,61 @@ class CharucoTracker(BaseTracker):
         )
 
         # Following most recent charuco detection documentation: https://docs.opencv.org/4.x/df/d4a/tutorial_charuco_detection.html
-        self.charuco_detector = cv2.aruco.CharucoDetector(self.board)
+        detector_parameters = get_detector_parameters(detector_preset)
+        self.charuco_detector = cv2.aruco.CharucoDetector(
+            self.board,
+            cv2.aruco.CharucoParameters(),
+            detector_parameters,
+        )
+        # the downscaled pass of pyramid mode only needs the markers
+        self.aruco_detector = cv2.aruco.ArucoDetector(dictionary, detector_parameters)
 
         self.tracked_object_names = tracked_object_names
         self.dictionary = dictionary
+        self.squares_x = squares_x
+        self.squares_y = squares_y
+        self.dict_id = dict_id
+        self.square_length = square_length
+        self.marker_length = marker_length
+        self.detector_preset = detector_preset
+
+        self.detection_mode = detection_mode
+        self.pyramid_scale = pyramid_scale
+        self.reuse_board_region = reuse_board_region
+        self.board_region_padding = board_region_padding
+        # (left, top, right, bottom) of the board in the previous frame, None if it wasn't found
+        self.board_region: Optional[Tuple[int, int, int, int]] = None
+        self.board_marker_points: Optional[np.ndarray] = None
+
+    @property
+    def is_stateless(self) -> bool:
+        # in pyramid mode the previous frame's board region is searched first
+        return self.detection_mode == "full_resolution" or not self.reuse_board_region
+
+    def copy_for_thread(self) -> "CharucoTracker":
+        return CharucoTracker(
+            squares_x=self.squares_x,
+            squares_y=self.squares_y,
+            dict_id=self.dict_id,
+            square_length=self.square_length,
+            marker_length=self.marker_length,
+            detection_mode=self.detection_mode,
+            pyramid_scale=self.pyramid_scale,
+            reuse_board_region=self.reuse_board_region,
+            board_region_padding=self.board_region_padding,
+            detector_preset=self.detector_preset,
+        )
 
     def process_image(self, image: np.ndarray, **kwargs) -> Dict[str, TrackedObject]:
         # Convert the image to grayscale
         gray_image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
 
-        charuco_corners, charuco_ids, _marker_corners, _marker_ids = (
-            self.charuco_detector.detectBoard(gray_image)
-        )
+        if self.detection_mode == "pyramid":
+            charuco_corners, charuco_ids = self.detect_board_pyramid(gray_image)
+        else:
+            charuco_corners, charuco_ids, _marker_corners, _marker_ids = (
+                self.charuco_detector.detectBoard(gray_image)
+            )
 
         self.reinitialize_tracked_objects()
 
@@ -54,12 +169,13 @@ class CharucoTracker(BaseTracker):
             and charuco_ids is not None
             and len(charuco_corners) > 3
         ):
-            # Create a TrackedObject for each corner
-            for id, corner in zip(charuco_ids, charuco_corners):
-                object_id = str(id).strip("[]")
-                self.tracked_objects[object_id] = TrackedObject(object_id=object_id)
-                self.tracked_objects[object_id].pixel_x = corner[0][0]
-                self.tracked_objects[object_id].pixel_y = corner[0][1]
+            # Charuco ids are the index of the corner in tracked_object_names
+            for slot, (pixel_x, pixel_y) in zip(
+                charuco_ids.ravel().tolist(), charuco_corners.reshape(-1, 2).tolist()
+            ):
+                tracked_object = self.tracked_objects[self.tracked_object_names[slot]]
+                tracked_object.pixel_x = pixel_x
+                tracked_object.pixel_y = pixel_y
 
         self.annotated_image = self.annotate_image(
             image=image, tracked_objects=self.tracked_objects
@@ -99,14 +215,147 @@ class CharucoTracker(BaseTracker):
 
         return annotated_image
 
+    def detect_board_pyramid(
+        self, gray_image: np.ndarray
+    ) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """
+        Detect the board coarse-to-fine, searching the previous frame's board region first if there is one.
+
+        :param gray_image: Full resolution grayscale image.
+        :return: Charuco corners and ids in full resolution image coordinates, as returned by `detectBoard`.
+        """
+        if self.reuse_board_region and self.board_region is not None:
+            search_region = self.board_region
+            marker_corners, marker_ids = self.detect_markers_in_region(
+                gray_image, search_region
+            )
+            # if the board comes close to the edge of the search region it may extend past it
+            if marker_ids is not None and region_contains(
+                search_region,
+                self.get_padded_region(
+                    np.concatenate(marker_corners).reshape(-1, 2),
+                    gray_image.shape,
+                    self.board_region_padding / 2,
+                ),
+            ):
+                return self.refine_board(gray_image, marker_corners, marker_ids)
+            return self.detect_board_full_resolution(gray_image)
+
+        image_height, image_width = gray_image.shape[:2]
+        marker_corners, marker_ids = self.detect_markers_in_region(
+            gray_image, (0, 0, image_width, image_height)
+        )
+        if marker_ids is None:
+            self.board_region = None
+            self.board_marker_points = None
+            return None, None
+        return self.refine_board(gray_image, marker_corners, marker_ids)
+
+    def detect_markers_in_region(
+        self, gray_image: np.ndarray, region: Tuple[int, int, int, int]
+    ) -> Tuple[Optional[List[np.ndarray]], Optional[np.ndarray]]:
+        """
+        Detect markers on a downscaled copy of a region.
+
+        :return: Marker corners in full resolution image coordinates and marker ids, None if there are no markers.
+        """
+        left, top, right, bottom = region
+        region_image = gray_image[top:bottom, left:right]
+        downscaled_image = cv2.resize(
+            region_image,
+            None,
+            fx=self.pyramid_scale,
+            fy=self.pyramid_scale,
+            interpolation=cv2.INTER_AREA,
+        )
+        marker_corners, marker_ids, _ = self.aruco_detector.detectMarkers(
+            downscaled_image
+        )
+        if marker_ids is None or len(marker_ids) == 0:
+            return None, None
+        return [
+            (corners / self.pyramid_scale + (left, top)).astype(np.float32)
+            for corners in marker_corners
+        ], marker_ids
+
+    def refine_board(
+        self,
+        gray_image: np.ndarray,
+        marker_corners: List[np.ndarray],
+        marker_ids: np.ndarray,
+    ) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """
+        Interpolate and refine the charuco corners at full resolution inside the board's bounding region.
+        Updates `board_region` for the next frame.
+        """
+        self.board_marker_points = np.concatenate(marker_corners).reshape(-1, 2)
+        board_left, board_top, board_right, board_bottom = self.get_padded_region(
+            self.board_marker_points, gray_image.shape, self.board_region_padding
+        )
+
+        charuco_corners, charuco_ids, _, _ = self.charuco_detector.detectBoard(
+            gray_image[board_top:board_bottom, board_left:board_right],
+            markerCorners=tuple(
+                corners - np.float32((board_left, board_top)) for corners in marker_corners
+            ),
+            markerIds=marker_ids,
+        )
+        if charuco_corners is not None:
+            charuco_corners = charuco_corners + np.float32((board_left, board_top))
+
+        self.board_region = (board_left, board_top, board_right, board_bottom)
+        return charuco_corners, charuco_ids
+
+    def detect_board_full_resolution(
+        self, gray_image: np.ndarray
+    ) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """
+        Detect the board on the full resolution image, updating `board_region` from its markers for the next frame.
+        """
+        charuco_corners, charuco_ids, marker_corners, marker_ids = (
+            self.charuco_detector.detectBoard(gray_image)
+        )
+        if marker_ids is None or len(marker_ids) == 0:
+            self.board_region = None
+            self.board_marker_points = None
+        else:
+            self.board_marker_points = np.concatenate(marker_corners).reshape(-1, 2)
+            self.board_region = self.get_padded_region(
+                self.board_marker_points, gray_image.shape, self.board_region_padding
+            )
+        return charuco_corners, charuco_ids
+
+    def get_padded_region(
+        self, points: np.ndarray, image_shape: Tuple[int, ...], padding_fraction: float
+    ) -> Tuple[int, int, int, int]:
+        """
+        Get the bounding box of a set of points, padded by a fraction of its size and clipped to the image.
+        """
+        image_height, image_width = image_shape[:2]
+        minimum = points.min(axis=0)
+        maximum = points.max(axis=0)
+        padding = (maximum - minimum) * padding_fraction + 1
+        left, top = np.floor(np.maximum(minimum - padding, 0)).astype(int)
+        right, bottom = np.ceil(
+            np.minimum(maximum + padding, (image_width, image_height))
+        ).astype(int)
+        return int(left), int(top), int(right), int(bottom)
+
+    def cleanup(self) -> None:
+        super().cleanup()
+        self.board_region = None
+        self.board_marker_points = None
+
     def reinitialize_tracked_objects(self) -> None:
         """
         Reinitialize tracked objects to clear previous frames data
 
-        Unlike self.tracked_objects.clear(), this will ensure every tracked object has a value for each frame, even if its empty
+        Unlike self.tracked_objects.clear(), this will ensure every tracked object has a value for each frame, even if its empty.
+        Each frame gets a new dictionary of new objects, so the objects returned for earlier frames keep their values.
         """
-        for name in self.tracked_object_names:
-            self.tracked_objects[name] = TrackedObject(object_id=name)
+        self.tracked_objects = {
+            name: TrackedObject(object_id=name) for name in self.tracked_object_names
+        }
 
 
 if __name__ == "__main__":
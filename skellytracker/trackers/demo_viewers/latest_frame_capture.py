@@ -0,0 +1,147 @@
+import logging
+from pathlib import Path
+import threading
+import time
+from typing import Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CaptureSource = Union[int, str, Path]
+
+
+class PacedVideoCapture:
+    """
+    Play a video file at its native frame rate, so it can stand in for a live camera.
+    """
+
+    def __init__(self, video_path: Union[str, Path], loop: bool = False):
+        """
+        :param video_path: Video to play.
+        :param loop: Start over at the end of the video instead of stopping.
+        """
+        self.cap = cv2.VideoCapture(str(video_path))
+        self.loop = loop
+        fps = self.cap.get(cv2.CAP_PROP_FPS)
+        self.frame_interval_s = 1 / fps if fps > 0 else 1 / 30
+        self.next_frame_time: Optional[float] = None
+
+    def isOpened(self) -> bool:
+        return self.cap.isOpened()
+
+    def get(self, property_id: int) -> float:
+        return self.cap.get(property_id)
+
+    def set(self, property_id: int, value: float) -> bool:
+        return self.cap.set(property_id, value)
+
+    def read(self):
+        if self.next_frame_time is None:
+            self.next_frame_time = time.perf_counter()
+        delay = self.next_frame_time - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        self.next_frame_time += self.frame_interval_s
+
+        ret, frame = self.cap.read()
+        if not ret and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read()
+        return ret, frame
+
+    def release(self) -> None:
+        self.cap.release()
+
+
+def open_capture_source(source: CaptureSource, loop_videos: bool = False):
+    """
+    Open a camera index with `cv2.VideoCapture`, or a video file as a `PacedVideoCapture`.
+    """
+    if isinstance(source, int):
+        return cv2.VideoCapture(source)
+    return PacedVideoCapture(source, loop=loop_videos)
+
+
+class LatestFrameCapture:
+    """
+    Read frames from a capture on a background thread, keeping only the newest one.
+
+    When the consumer is slower than the camera, frames it has not picked up yet are replaced by newer ones
+    instead of queuing in the driver buffer, so the consumer always works on a recent frame.
+    Replaced frames are counted in `dropped_frames`.
+    """
+
+    def __init__(self, cap):
+        """
+        :param cap: Opened `cv2.VideoCapture`, or any object with the same `read` method.
+        """
+        self.cap = cap
+        self.condition = threading.Condition()
+        self.frame: Optional[np.ndarray] = None
+        self.capture_time: float = 0.0
+        self.frame_number = -1
+        self.last_read_frame_number = -1
+        self.captured_frames = 0
+        self.dropped_frames = 0
+        self.running = False
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self) -> "LatestFrameCapture":
+        self.running = True
+        self.thread = threading.Thread(target=self.capture_loop, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def capture_loop(self) -> None:
+        while self.running:
+            ret, frame = self.cap.read()
+            capture_time = time.perf_counter()
+            with self.condition:
+                if not ret:
+                    logger.info("Capture returned no frame, stopping capture thread")
+                    self.running = False
+                    self.condition.notify_all()
+                    break
+                if self.frame_number > self.last_read_frame_number:
+                    self.dropped_frames += 1
+                self.frame = frame
+                self.capture_time = capture_time
+                self.frame_number += 1
+                self.captured_frames += 1
+                self.condition.notify_all()
+
+    def read(
+        self, timeout: Optional[float] = None
+    ) -> Tuple[bool, Optional[np.ndarray], float]:
+        """
+        Wait for a frame newer than the last one read.
+
+        :param timeout: Seconds to wait for a new frame, None to wait until one arrives or capture stops.
+        :return: Whether a frame was read, the frame, and the `time.perf_counter` time it was captured at.
+        """
+        with self.condition:
+            self.condition.wait_for(
+                lambda: self.frame_number > self.last_read_frame_number
+                or not self.running,
+                timeout=timeout,
+            )
+            if self.frame_number <= self.last_read_frame_number:
+                return False, None, 0.0
+            self.last_read_frame_number = self.frame_number
+            return True, self.frame, self.capture_time
+
+    def __enter__(self) -> "LatestFrameCapture":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
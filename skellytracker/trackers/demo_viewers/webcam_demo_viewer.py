@@ -1,6 +1,14 @@
 import logging
-from typing import Optional
+import time
+from typing import Dict, List, Optional, Union
 import cv2
+import numpy as np
+
+from skellytracker.trackers.base_tracker.frame_sink import FrameSink
+from skellytracker.trackers.demo_viewers.latest_frame_capture import (
+    LatestFrameCapture,
+    open_capture_source,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -21,9 +29,23 @@ class WebcamDemoViewer:
         recorder=None,
         window_title: Optional[str] = None,
         default_exposure: int = DEFAULT_EXPOSURE,
+        camera_id: Union[int, str] = 0,
+        headless: bool = False,
+        max_frames: Optional[int] = None,
+        latency_report_interval_frames: int = 100,
+        frame_sinks: Optional[List[FrameSink]] = None,
     ):
         """
         Initialize with a tracker and optional window title and default exposure.
+
+        Frames are captured on a separate thread that only keeps the newest frame, so tracking that is slower
+        than the camera drops stale frames instead of falling further and further behind.
+
+        :param camera_id: Camera index or video path to open, videos play at their native frame rate.
+        :param headless: Run without a window, e.g. on a machine without a display. Stop with Ctrl+C or `max_frames`.
+        :param max_frames: Stop after tracking this many frames, None to run until quit.
+        :param latency_report_interval_frames: Number of frames between latency log messages.
+        :param frame_sinks: Sinks that receive each frame's tracked data as soon as it is tracked, e.g. a `UDPFrameSink`.
         """
         self.tracker = tracker
         self.recorder = recorder
@@ -31,6 +53,13 @@ class WebcamDemoViewer:
         if window_title is None:
             window_title = f"{tracker.__class__.__name__}"
         self.window_title = window_title
+        self.camera_id = camera_id
+        self.headless = headless
+        self.max_frames = max_frames
+        self.latency_report_interval_frames = latency_report_interval_frames
+        self.frame_sinks = frame_sinks or []
+        self.latencies_ms: List[float] = []
+        self.dropped_frames = 0
 
     def _set_exposure(self, cap, exposure):
         """
@@ -49,55 +78,116 @@ class WebcamDemoViewer:
                 image, line, (10, y), cv2.FONT_HERSHEY_SIMPLEX, 0.75, (100, 0, 255), 2
             )
 
+    def latency_summary(self) -> Dict[str, float]:
+        """
+        Summarize capture to result latency and dropped frames of the frames tracked so far.
+        """
+        if not self.latencies_ms:
+            return {"frames": 0, "dropped_frames": self.dropped_frames}
+        latencies_ms = np.array(self.latencies_ms)
+        return {
+            "frames": len(latencies_ms),
+            "dropped_frames": self.dropped_frames,
+            "mean_latency_ms": float(latencies_ms.mean()),
+            "p95_latency_ms": float(np.percentile(latencies_ms, 95)),
+            "max_latency_ms": float(latencies_ms.max()),
+        }
+
+    def _log_latency(self) -> None:
+        summary = self.latency_summary()
+        if summary["frames"] == 0:
+            logger.info(f"No frames tracked, {summary['dropped_frames']} dropped")
+            return
+        logger.info(
+            f"{summary['frames']} frames tracked, {summary['dropped_frames']} dropped, "
+            f"latency mean {summary['mean_latency_ms']:.1f} ms, "
+            f"p95 {summary['p95_latency_ms']:.1f} ms, max {summary['max_latency_ms']:.1f} ms"
+        )
+
     def run(self):
         """
         Run the camera viewer.
         """
-        cap = cv2.VideoCapture(0)
+        cap = open_capture_source(self.camera_id)
         if not cap.isOpened():
             logger.error("Error: Could not open camera.")
             return
 
         exposure = self.default_exposure
         self._set_exposure(cap, exposure)
-
-        while True:
-            ret, frame = cap.read()
-
-            if not ret:
-                logger.error("Error: Failed to read frame.")
-                break
-
-            image_size = (frame.shape[1], frame.shape[0])
-
-            self.tracker.process_image(frame)
-            annotated_image = self.tracker.annotated_image
-            if self.recorder is not None:
-                self.recorder.record(tracked_objects=self.tracker.tracked_objects)
-
-            key = cv2.waitKey(1) & 0xFF
-            if key == KEY_QUIT:
-                break
-            elif key == KEY_INCREASE_EXPOSURE:
-                exposure += 1
-                self._set_exposure(cap, exposure)
-            elif key == KEY_DECREASE_EXPOSURE:
-                exposure -= 1
-                self._set_exposure(cap, exposure)
-            elif key == KEY_RESET_EXPOSURE:
-                exposure = self.default_exposure
-                self._set_exposure(cap, exposure)
-
-            self._show_overlay(
-                annotated_image,
-                f"Exposure: {exposure}\n"
-                f"Controls: \n`w`/`s`: exposure +/- \n'r': reset \n'q': quit",
-            )
-            cv2.imshow(self.window_title, annotated_image)
-
-        cap.release()
-        cv2.destroyAllWindows()
-
-        if self.recorder is not None:
+        self.latencies_ms = []
+        image_size = None
+
+        frame_capture = LatestFrameCapture(cap).start()
+        try:
+            while self.max_frames is None or len(self.latencies_ms) < self.max_frames:
+                ret, frame, capture_time = frame_capture.read()
+
+                if not ret:
+                    if isinstance(self.camera_id, int):
+                        logger.error("Error: Failed to read frame.")
+                    else:
+                        logger.info(f"Reached the end of {self.camera_id}")
+                    break
+
+                image_size = (frame.shape[1], frame.shape[0])
+
+                tracked_objects = self.tracker.process_image(frame)
+                annotated_image = self.tracker.annotated_image
+                if self.frame_sinks:
+                    frame_array = self.tracker.recorder.tracked_objects_to_frame_array(
+                        tracked_objects, image_size=image_size
+                    )
+                    for frame_sink in self.frame_sinks:
+                        frame_sink.write_frame(
+                            frame_capture.last_read_frame_number,
+                            capture_time,
+                            frame_array,
+                        )
+                if self.recorder is not None:
+                    self.recorder.record(tracked_objects=self.tracker.tracked_objects)
+
+                self.latencies_ms.append((time.perf_counter() - capture_time) * 1000)
+                self.dropped_frames = frame_capture.dropped_frames
+                if len(self.latencies_ms) % self.latency_report_interval_frames == 0:
+                    self._log_latency()
+
+                if self.headless:
+                    continue
+
+                key = cv2.waitKey(1) & 0xFF
+                if key == KEY_QUIT:
+                    break
+                elif key == KEY_INCREASE_EXPOSURE:
+                    exposure += 1
+                    self._set_exposure(cap, exposure)
+                elif key == KEY_DECREASE_EXPOSURE:
+                    exposure -= 1
+                    self._set_exposure(cap, exposure)
+                elif key == KEY_RESET_EXPOSURE:
+                    exposure = self.default_exposure
+                    self._set_exposure(cap, exposure)
+
+                self._show_overlay(
+                    annotated_image,
+                    f"Exposure: {exposure}\n"
+                    f"Latency: {self.latencies_ms[-1]:.0f} ms, dropped: {self.dropped_frames}\n"
+                    f"Controls: \n`w`/`s`: exposure +/- \n'r': reset \n'q': quit",
+                )
+                cv2.imshow(self.window_title, annotated_image)
+        except KeyboardInterrupt:
+            logger.info("Stopping webcam demo")
+        finally:
+            frame_capture.stop()
+            self.dropped_frames = frame_capture.dropped_frames
+            for frame_sink in self.frame_sinks:
+                frame_sink.close()
+            cap.release()
+            if not self.headless:
+                cv2.destroyAllWindows()
+
+        self._log_latency()
+
+        if self.recorder is not None and image_size is not None:
             self.recorder.process_tracked_objects(image_size=image_size)
             self.recorder.save("recorded_objects.npy")
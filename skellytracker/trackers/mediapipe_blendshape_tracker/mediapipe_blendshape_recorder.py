@@ -10,6 +10,9 @@ from skellytracker.trackers.mediapipe_blendshape_tracker.mediapipe_blendshape_mo
 
 
 class MediapipeBlendshapeRecorder(BaseRecorder):
+    # blendshape scores are in 0..1, not pixels, and are only a few values per frame
+    fixed_point_scales = None
+
     def record(self, tracked_objects: Dict[str, TrackedObject]) -> None:
         self.recorded_objects.append([deepcopy(tracked_objects["face"])])
 
@@ -19,17 +22,21 @@ class MediapipeBlendshapeRecorder(BaseRecorder):
             raise ValueError(
                 f"image_size must be provided to process tracked objects from {__class__.__name__}"
             )
-        self.recorded_objects_array = np.full(
+        recorded_objects_array = np.full(
             (
                 len(self.recorded_objects),
                 MediapipeBlendshapeModelInfo.num_tracked_points,
                 1,
             ),
             np.nan,
+            dtype=self.output_precision.working_dtype,
         )
 
         for i, tracked_objects in enumerate(self.recorded_objects):
             if blendshapes := tracked_objects[0].extra.get("blendshapes"):
-                self.recorded_objects_array[i, :, 0] = blendshapes
+                recorded_objects_array[i, :, 0] = blendshapes
 
+        self.recorded_objects_array = self.output_precision.encode(
+            recorded_objects_array
+        )
         return self.recorded_objects_array
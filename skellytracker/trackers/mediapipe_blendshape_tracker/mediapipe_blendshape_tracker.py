@@ -1,15 +1,17 @@
+import threading
+import time
 import cv2
-import requests
 import mediapipe as mp
 import numpy as np
 
-from typing import Dict, Union
+from typing import Dict, Literal, Optional, Union
 from pathlib import Path
 from mediapipe.tasks import python as mp_python
 from mediapipe.tasks.python import vision
 from mediapipe import solutions
 from mediapipe.framework.formats import landmark_pb2
 
+from skellytracker.system.model_cache import get_model_path
 from skellytracker.trackers.base_tracker.base_tracker import BaseTracker
 from skellytracker.trackers.base_tracker.tracked_object import TrackedObject
 from skellytracker.trackers.mediapipe_blendshape_tracker.mediapipe_blendshape_model_info import (
@@ -20,16 +22,33 @@ from skellytracker.trackers.mediapipe_blendshape_tracker.mediapipe_blendshape_re
 )
 
 
+RUNNING_MODES = {
+    "image": vision.RunningMode.IMAGE,
+    "video": vision.RunningMode.VIDEO,
+    "live_stream": vision.RunningMode.LIVE_STREAM,
+}
+
+
 class MediapipeBlendshapeTracker(BaseTracker):
     def __init__(
         self,
         model_path: Union[Path, str, None] = None,
+        running_mode: Literal["image", "video", "live_stream"] = "image",
     ):
+        """
+        Track facial blendshapes with the mediapipe FaceLandmarker.
+
+        :param model_path: Path to the face landmarker model, downloaded if not provided.
+        :param running_mode: "image" detects every frame independently.
+            "video" tracks the face between frames, which is faster, and needs monotonically increasing timestamps.
+            "live_stream" detects asynchronously and returns the latest finished result, dropping frames it can not keep up with.
+        """
         super().__init__(
             tracked_object_names=MediapipeBlendshapeModelInfo.tracked_object_names,
             recorder=MediapipeBlendshapeRecorder(),
         )
         self.model_info = MediapipeBlendshapeModelInfo
+        self.running_mode = running_mode
 
         # If model_path not provided, try default model path, and if that doesn't work download model
         if model_path is None:
@@ -38,24 +57,82 @@ class MediapipeBlendshapeTracker(BaseTracker):
         base_options = mp_python.BaseOptions(
             model_asset_path=str(model_path)
         )  # TODO: handle this path properly
-        options = vision.FaceLandmarkerOptions(
+        self.options = vision.FaceLandmarkerOptions(
             base_options=base_options,
+            running_mode=RUNNING_MODES[running_mode],
             output_face_blendshapes=True,
             output_facial_transformation_matrixes=True,
             num_faces=1,
+            result_callback=(
+                self.store_live_stream_result if running_mode == "live_stream" else None
+            ),
         )
-        self.detector = vision.FaceLandmarker.create_from_options(options)
+        self.latest_result_lock = threading.Lock()
+        self.create_detector()
+
+    def create_detector(self) -> None:
+        """
+        Create a fresh FaceLandmarker, which also resets the timestamps it has seen.
+        """
+        self.detector = vision.FaceLandmarker.create_from_options(self.options)
+        self.last_timestamp_ms = -1
+        self.latest_result: Optional[vision.FaceLandmarkerResult] = None
+
+    def store_live_stream_result(
+        self,
+        result: vision.FaceLandmarkerResult,
+        output_image: mp.Image,
+        timestamp_ms: int,
+    ) -> None:
+        """
+        Result callback for live stream mode, keeps only the most recent result.
+        """
+        with self.latest_result_lock:
+            self.latest_result = result
+
+    def get_timestamp_ms(self, timestamp_ms: Optional[float]) -> int:
+        """
+        Turn a capture timestamp into one mediapipe accepts, falling back to the wall clock if there is none.
+
+        Mediapipe requires timestamps to strictly increase, so repeated or out of order timestamps are nudged forward.
+        """
+        if timestamp_ms is None:
+            timestamp_ms = time.monotonic() * 1000
+        timestamp_ms = max(int(timestamp_ms), self.last_timestamp_ms + 1)
+        self.last_timestamp_ms = timestamp_ms
+        return timestamp_ms
+
+    def detect(
+        self, mediapipe_image: mp.Image, timestamp_ms: Optional[float] = None
+    ) -> Optional[vision.FaceLandmarkerResult]:
+        """
+        Run the detector in the configured running mode.
+
+        :return: Detection result, in live stream mode the latest finished result, which may be None.
+        """
+        if self.running_mode == "image":
+            return self.detector.detect(mediapipe_image)
+        if self.running_mode == "video":
+            return self.detector.detect_for_video(
+                mediapipe_image, self.get_timestamp_ms(timestamp_ms)
+            )
 
-    def process_image(self, image: np.ndarray, **kwargs) -> Dict[str, TrackedObject]:
+        self.detector.detect_async(mediapipe_image, self.get_timestamp_ms(timestamp_ms))
+        with self.latest_result_lock:
+            return self.latest_result
+
+    def process_image(
+        self, image: np.ndarray, timestamp_ms: Optional[float] = None, **kwargs
+    ) -> Dict[str, TrackedObject]:
         rgb_image = cv2.cvtColor(
             image, cv2.COLOR_BGR2RGB
         )  # TODO: may need to convert this into an `mp.Image`, but can't find documentation about that
 
         mediapipe_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_image)
 
-        results = self.detector.detect(mediapipe_image)
+        results = self.detect(mediapipe_image, timestamp_ms=timestamp_ms)
 
-        if len(results.face_blendshapes) == 0:
+        if results is None or len(results.face_blendshapes) == 0:
             self.annotated_image = image
             return {}
 
@@ -115,19 +192,15 @@ class MediapipeBlendshapeTracker(BaseTracker):
         return annotated_image
 
     def get_or_download_mediapipe_blendshape_model(self) -> Path:
-        model_path = Path(
-            "face_landmarker_v2_with_blendshapes.task"
-        )  # TODO: make this path absolute to skellytracker install
-        if not model_path.exists():
-            r = requests.get(
-                "https://storage.googleapis.com/mediapipe-models/face_landmarker/face_landmarker/float16/1/face_landmarker.task",
-                stream=True,
-                timeout=(5, 60),
-            )
-            r.raise_for_status()
-            model_path.write_bytes(r.content)
-        return model_path
-    
+        return get_model_path("face_landmarker.task")
+
+    def cleanup(self) -> None:
+        super().cleanup()
+        if self.running_mode != "image":
+            # timestamps restart with the next video, which the old detector would reject
+            self.detector.close()
+            self.create_detector()
+
 
 if __name__ == "__main__":
-    MediapipeBlendshapeTracker().demo()
+    MediapipeBlendshapeTracker(running_mode="live_stream").demo()
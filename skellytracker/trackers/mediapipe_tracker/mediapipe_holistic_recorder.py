@@ -1,20 +1,38 @@
 from copy import deepcopy
-from typing import Dict
+from typing import Dict, Optional, Sequence, Tuple
 import numpy as np
 
 from skellytracker.trackers.base_tracker.base_recorder import BaseRecorder
+from skellytracker.trackers.base_tracker.output_precision import OutputPrecision
+from skellytracker.trackers.base_tracker.sparse_group_array import SparseGroupArray
 from skellytracker.trackers.base_tracker.tracked_object import TrackedObject
 from skellytracker.trackers.mediapipe_tracker.mediapipe_model_info import (
+    MEDIAPIPE_LANDMARK_GROUPS,
+    MediapipeLandmarkGroup,
     MediapipeModelInfo,
+    get_mediapipe_model_info,
 )
 
 
 class MediapipeHolisticRecorder(BaseRecorder):
+    def __init__(
+        self,
+        landmark_groups: Sequence[MediapipeLandmarkGroup] = MEDIAPIPE_LANDMARK_GROUPS,
+        output_precision: Optional[OutputPrecision] = None,
+    ):
+        """
+        :param landmark_groups: Landmark groups ("body", "hands", "face") to record, the output array only holds
+            the points of these groups, laid out as in `get_mediapipe_model_info(landmark_groups)`.
+        :param output_precision: Data type of the processed array, float64 by default.
+        """
+        super().__init__(output_precision=output_precision)
+        self.model_info = get_mediapipe_model_info(landmark_groups)
+
     def record(self, tracked_objects: Dict[str, TrackedObject]) -> None:
         self.recorded_objects.append(
             [
                 deepcopy(tracked_objects[tracked_object_name])
-                for tracked_object_name in MediapipeModelInfo.tracked_object_names
+                for tracked_object_name in self.model_info.tracked_object_names
             ]
         )
 
@@ -24,12 +42,15 @@ class MediapipeHolisticRecorder(BaseRecorder):
             raise ValueError(
                 f"image_size must be provided to process tracked objects from {__class__.__name__}"
             )
-        self.recorded_objects_array = np.zeros(
+        # points a detection doesn't fill, e.g. the iris points of a face mesh without them, stay missing
+        recorded_objects_array = np.full(
             (
                 len(self.recorded_objects),
-                MediapipeModelInfo.num_tracked_points,
+                self.model_info.num_tracked_points,
                 3,
-            )
+            ),
+            np.nan,
+            dtype=self.output_precision.working_dtype,
         )
 
         for i, recorded_object_list in enumerate(self.recorded_objects):
@@ -37,27 +58,87 @@ class MediapipeHolisticRecorder(BaseRecorder):
             for recorded_object in recorded_object_list:
                 if recorded_object.extra["landmarks"] is not None:
                     for landmark_data in recorded_object.extra["landmarks"].landmark:
-                        self.recorded_objects_array[i, landmark_number, 0] = (
+                        recorded_objects_array[i, landmark_number, 0] = (
                             landmark_data.x * image_size[0]
                         )
-                        self.recorded_objects_array[i, landmark_number, 1] = (
+                        recorded_objects_array[i, landmark_number, 1] = (
                             landmark_data.y * image_size[1]
                         )
-                        self.recorded_objects_array[i, landmark_number, 2] = (
+                        recorded_objects_array[i, landmark_number, 2] = (
                             landmark_data.z * image_size[0]
                         )  # * image width per mediapipe docs
                         landmark_number += 1
                 else:
-                    if recorded_object.object_id == "pose_landmarks":
-                        number = MediapipeModelInfo.num_tracked_points_body
-                    elif recorded_object.object_id == "face_landmarks":
-                        number = MediapipeModelInfo.num_tracked_points_face
-                    elif recorded_object.object_id == "left_hand_landmarks":
-                        number = MediapipeModelInfo.num_tracked_points_left_hand
-                    else:
-                        number = MediapipeModelInfo.num_tracked_points_right_hand
+                    number = MediapipeModelInfo.num_tracked_points_per_object[
+                        recorded_object.object_id
+                    ]
                     for _ in range(number):
-                        self.recorded_objects_array[i, landmark_number, :] = np.nan
+                        recorded_objects_array[i, landmark_number, :] = np.nan
                         landmark_number += 1
 
+        self.recorded_objects_array = self.output_precision.encode(
+            recorded_objects_array
+        )
         return self.recorded_objects_array
+
+    def get_landmark_groups(self) -> Dict[str, Tuple[int, int]]:
+        return self.model_info.landmark_groups
+
+    def process_tracked_objects_sparse(self, **kwargs) -> SparseGroupArray:
+        """
+        Fill the sparse array straight from the recorded landmarks, a group is stored in the frames mediapipe
+        detected it in.
+        """
+        image_size = kwargs.get("image_size")
+        if image_size is None:
+            raise ValueError(
+                f"image_size must be provided to process tracked objects from {__class__.__name__}"
+            )
+        working_dtype = self.output_precision.working_dtype
+        # z is scaled by the image width per mediapipe docs
+        scale = np.array(
+            [image_size[0], image_size[1], image_size[0]], dtype=working_dtype
+        )
+
+        landmark_groups = self.get_landmark_groups()
+        validity = np.zeros(
+            (len(self.recorded_objects), len(landmark_groups)), dtype=bool
+        )
+        group_values = {}
+        # groups are in the order of the recorded tracked objects they come from
+        for group_index, (group_name, (start, stop)) in enumerate(
+            landmark_groups.items()
+        ):
+            for frame_index, recorded_object_list in enumerate(self.recorded_objects):
+                validity[frame_index, group_index] = (
+                    recorded_object_list[group_index].extra["landmarks"] is not None
+                )
+            # detections with fewer points than the group, e.g. a 468 point face mesh without irises,
+            # leave the remaining points missing like in the dense array
+            values = np.full(
+                (np.count_nonzero(validity[:, group_index]), stop - start, 3),
+                np.nan,
+                dtype=working_dtype,
+            )
+            for value_index, frame_index in enumerate(
+                np.flatnonzero(validity[:, group_index])
+            ):
+                landmarks = self.recorded_objects[frame_index][group_index].extra[
+                    "landmarks"
+                ].landmark
+                if len(landmarks) > stop - start:
+                    raise ValueError(
+                        f"Expected at most {stop - start} {group_name} landmarks, got {len(landmarks)}"
+                    )
+                values[value_index, : len(landmarks)] = [
+                    (landmark.x, landmark.y, landmark.z) for landmark in landmarks
+                ]
+            group_values[group_name] = self.output_precision.encode(values * scale)
+
+        return SparseGroupArray.from_group_values(
+            shape=(len(self.recorded_objects), self.model_info.num_tracked_points, 3),
+            landmark_groups=landmark_groups,
+            validity=validity,
+            group_values=group_values,
+            missing_value=self.output_precision.missing_value,
+        )
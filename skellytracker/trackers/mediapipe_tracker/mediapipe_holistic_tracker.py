@@ -1,7 +1,7 @@
 import cv2
 import mediapipe as mp
 import numpy as np
-from typing import Dict
+from typing import Dict, Sequence
 
 from skellytracker.trackers.base_tracker.base_tracker import BaseTracker
 from skellytracker.trackers.base_tracker.tracked_object import TrackedObject
@@ -9,7 +9,8 @@ from skellytracker.trackers.mediapipe_tracker.mediapipe_holistic_recorder import
     MediapipeHolisticRecorder,
 )
 from skellytracker.trackers.mediapipe_tracker.mediapipe_model_info import (
-    MediapipeModelInfo,
+    MEDIAPIPE_LANDMARK_GROUPS,
+    MediapipeLandmarkGroup,
 )
 
 
@@ -21,13 +22,26 @@ class MediapipeHolisticTracker(BaseTracker):
         min_tracking_confidence=0.5,
         static_image_mode=False,
         smooth_landmarks=True,
+        landmark_groups: Sequence[MediapipeLandmarkGroup] = MEDIAPIPE_LANDMARK_GROUPS,
     ):
+        """
+        :param landmark_groups: Landmark groups ("body", "hands", "face") to record and draw. Leaving out the face
+            skips its 478 points in the output and the drawing of the face mesh.
+        """
+        recorder = MediapipeHolisticRecorder(landmark_groups=landmark_groups)
         super().__init__(
-            tracked_object_names=MediapipeModelInfo.tracked_object_names,
-            recorder=MediapipeHolisticRecorder(),
+            tracked_object_names=recorder.model_info.tracked_object_names,
+            recorder=recorder,
         )
+        self.model_info = recorder.model_info
         self.mp_drawing = mp.solutions.drawing_utils
         self.mp_holistic = mp.solutions.holistic
+        self.landmark_connections = {
+            "pose_landmarks": self.mp_holistic.POSE_CONNECTIONS,
+            "right_hand_landmarks": self.mp_holistic.HAND_CONNECTIONS,
+            "left_hand_landmarks": self.mp_holistic.HAND_CONNECTIONS,
+            "face_landmarks": self.mp_holistic.FACEMESH_TESSELATION,
+        }
         self.holistic = self.mp_holistic.Holistic(
             model_complexity=model_complexity,
             min_detection_confidence=min_detection_confidence,
@@ -43,19 +57,11 @@ class MediapipeHolisticTracker(BaseTracker):
         # Process the image
         results = self.holistic.process(rgb_image)
 
-        # Update the tracking data
-        self.tracked_objects["pose_landmarks"].extra[
-            "landmarks"
-        ] = results.pose_landmarks
-        self.tracked_objects["face_landmarks"].extra[
-            "landmarks"
-        ] = results.face_landmarks
-        self.tracked_objects["left_hand_landmarks"].extra[
-            "landmarks"
-        ] = results.left_hand_landmarks
-        self.tracked_objects["right_hand_landmarks"].extra[
-            "landmarks"
-        ] = results.right_hand_landmarks
+        # Update the tracking data, the results have an attribute per tracked object name
+        for tracked_object_name in self.model_info.tracked_object_names:
+            self.tracked_objects[tracked_object_name].extra["landmarks"] = getattr(
+                results, tracked_object_name
+            )
 
         self.annotated_image = self.annotate_image(
             image=image, tracked_objects=self.tracked_objects
@@ -67,27 +73,13 @@ class MediapipeHolisticTracker(BaseTracker):
         self, image: np.ndarray, tracked_objects: Dict[str, TrackedObject], **kwargs
     ) -> np.ndarray:
         annotated_image = image.copy()
-        # Draw the pose, face, and hand landmarks on the image
-        self.mp_drawing.draw_landmarks(
-            annotated_image,
-            tracked_objects["pose_landmarks"].extra["landmarks"],
-            self.mp_holistic.POSE_CONNECTIONS,
-        )
-        self.mp_drawing.draw_landmarks(
-            annotated_image,
-            tracked_objects["face_landmarks"].extra["landmarks"],
-            self.mp_holistic.FACEMESH_TESSELATION,
-        )
-        self.mp_drawing.draw_landmarks(
-            annotated_image,
-            tracked_objects["left_hand_landmarks"].extra["landmarks"],
-            self.mp_holistic.HAND_CONNECTIONS,
-        )
-        self.mp_drawing.draw_landmarks(
-            annotated_image,
-            tracked_objects["right_hand_landmarks"].extra["landmarks"],
-            self.mp_holistic.HAND_CONNECTIONS,
-        )
+        # Draw the landmarks of the selected groups on the image
+        for tracked_object_name in self.model_info.tracked_object_names:
+            self.mp_drawing.draw_landmarks(
+                annotated_image,
+                tracked_objects[tracked_object_name].extra["landmarks"],
+                self.landmark_connections[tracked_object_name],
+            )
 
         return annotated_image
 
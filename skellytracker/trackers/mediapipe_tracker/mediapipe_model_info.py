@@ -1,10 +1,12 @@
-from typing import List, Literal
+from typing import List, Literal, Sequence, Type
 from mediapipe.python.solutions import holistic as mp_holistic
 from mediapipe.python.solutions.face_mesh import FACEMESH_NUM_LANDMARKS_WITH_IRISES
 
 from skellytracker.trackers.base_tracker.base_tracking_params import BaseTrackingParams
 from skellytracker.trackers.base_tracker.model_info import ModelInfo
 
+MediapipeLandmarkGroup = Literal["body", "hands", "face"]
+MEDIAPIPE_LANDMARK_GROUPS: List[MediapipeLandmarkGroup] = ["body", "hands", "face"]
 
 # values for segment weight and segment mass percentages taken from Winter anthropometry tables
 # https://imgur.com/a/aD74j
@@ -42,6 +44,41 @@ class MediapipeModelInfo(ModelInfo):
         "left_hand_landmarks",
         "face_landmarks",
     ]
+    # selectable landmark groups and the tracked objects they record
+    landmark_group_object_names = {
+        "body": ["pose_landmarks"],
+        "hands": ["right_hand_landmarks", "left_hand_landmarks"],
+        "face": ["face_landmarks"],
+    }
+    num_tracked_points_per_object = {
+        "pose_landmarks": num_tracked_points_body,
+        "right_hand_landmarks": num_tracked_points_right_hand,
+        "left_hand_landmarks": num_tracked_points_left_hand,
+        "face_landmarks": num_tracked_points_face,
+    }
+    landmark_groups = {
+        "body": (0, num_tracked_points_body),
+        "right_hand": (
+            num_tracked_points_body,
+            num_tracked_points_body + num_tracked_points_right_hand,
+        ),
+        "left_hand": (
+            num_tracked_points_body + num_tracked_points_right_hand,
+            num_tracked_points_body
+            + num_tracked_points_right_hand
+            + num_tracked_points_left_hand,
+        ),
+        "face": (
+            num_tracked_points - num_tracked_points_face,
+            num_tracked_points,
+        ),
+    }
+    point_names = (
+        body_landmark_names
+        + [f"right_hand_{name}" for name in hand_landmark_names]
+        + [f"left_hand_{name}" for name in hand_landmark_names]
+        + [f"face_{index}" for index in range(num_tracked_points_face)]
+    )
     virtual_markers_definitions = {
         "head_center": {
             "marker_names": ["left_ear", "right_ear"],
@@ -199,6 +236,96 @@ class MediapipeTrackingParams(BaseTrackingParams):
     buffer_size_method: Literal["buffer_by_box_size", "buffer_by_image_size"] = (
         "buffer_by_box_size"
     )
+    landmark_groups: List[MediapipeLandmarkGroup] = MEDIAPIPE_LANDMARK_GROUPS
+
+
+def get_mediapipe_model_info(
+    landmark_groups: Sequence[MediapipeLandmarkGroup] = MEDIAPIPE_LANDMARK_GROUPS,
+) -> Type[MediapipeModelInfo]:
+    """
+    Model info for the output layout of a selection of mediapipe landmark groups.
+
+    The selected groups keep the order of the full layout (body, right hand, left hand, face), so
+    `landmark_groups`, `point_names` and the `num_tracked_points_*` counts (0 for unselected groups) index the
+    reduced output array. Without the body, the segment, center of mass and joint definitions are dropped.
+
+    :param landmark_groups: Any of "body", "hands" and "face".
+    :return: `MediapipeModelInfo` when all groups are selected, a subclass of it otherwise.
+    """
+    unknown_groups = set(landmark_groups) - set(MEDIAPIPE_LANDMARK_GROUPS)
+    if unknown_groups or not landmark_groups:
+        raise ValueError(
+            f"Landmark groups must be a nonempty selection of {MEDIAPIPE_LANDMARK_GROUPS}, got {list(landmark_groups)}"
+        )
+    if set(landmark_groups) == set(MEDIAPIPE_LANDMARK_GROUPS):
+        return MediapipeModelInfo
+
+    selected_object_names = [
+        object_name
+        for group in MEDIAPIPE_LANDMARK_GROUPS
+        if group in landmark_groups
+        for object_name in MediapipeModelInfo.landmark_group_object_names[group]
+    ]
+    full_group_names = {
+        "pose_landmarks": "body",
+        "right_hand_landmarks": "right_hand",
+        "left_hand_landmarks": "left_hand",
+        "face_landmarks": "face",
+    }
+    output_groups = {}
+    point_names = []
+    for object_name in selected_object_names:
+        group_name = full_group_names[object_name]
+        start, stop = MediapipeModelInfo.landmark_groups[group_name]
+        output_groups[group_name] = (
+            len(point_names),
+            len(point_names) + stop - start,
+        )
+        point_names += MediapipeModelInfo.point_names[start:stop]
+
+    has_body = "body" in landmark_groups
+    has_hands = "hands" in landmark_groups
+    has_face = "face" in landmark_groups
+    landmark_names = []
+    if has_body:
+        landmark_names = MediapipeModelInfo.body_landmark_names + (
+            MediapipeModelInfo.hand_landmark_names if has_hands else []
+        )
+    body_definitions = {
+        definition_name: (
+            getattr(MediapipeModelInfo, definition_name) if has_body else None
+        )
+        for definition_name in [
+            "virtual_markers_definitions",
+            "segment_connections",
+            "center_of_mass_definitions",
+            "joint_hierarchy",
+        ]
+    }
+    return type(
+        f"Mediapipe{''.join(group.title() for group in landmark_groups)}ModelInfo",
+        (MediapipeModelInfo,),
+        {
+            "landmark_names": landmark_names,
+            "num_tracked_points_body": (
+                MediapipeModelInfo.num_tracked_points_body if has_body else 0
+            ),
+            "num_tracked_points_right_hand": (
+                MediapipeModelInfo.num_tracked_points_right_hand if has_hands else 0
+            ),
+            "num_tracked_points_left_hand": (
+                MediapipeModelInfo.num_tracked_points_left_hand if has_hands else 0
+            ),
+            "num_tracked_points_face": (
+                MediapipeModelInfo.num_tracked_points_face if has_face else 0
+            ),
+            "num_tracked_points": len(point_names),
+            "tracked_object_names": selected_object_names,
+            "landmark_groups": output_groups,
+            "point_names": point_names,
+            **body_definitions,
+        },
+    )
 
 
 def mediapipe_body_names_match_expected(
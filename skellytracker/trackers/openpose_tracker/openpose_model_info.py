@@ -47,6 +47,29 @@ class OpenPoseModelInfo(ModelInfo):
         + num_tracked_points_face
     )
     tracked_object_names = ["pose_landmarks"]
+    landmark_groups = {
+        "body": (0, num_tracked_points_body),
+        "left_hand": (
+            num_tracked_points_body,
+            num_tracked_points_body + num_tracked_points_left_hand,
+        ),
+        "right_hand": (
+            num_tracked_points_body + num_tracked_points_left_hand,
+            num_tracked_points_body
+            + num_tracked_points_left_hand
+            + num_tracked_points_right_hand,
+        ),
+        "face": (
+            num_tracked_points - num_tracked_points_face,
+            num_tracked_points,
+        ),
+    }
+    point_names = (
+        body_landmark_names
+        + [f"left_hand_{index}" for index in range(num_tracked_points_left_hand)]
+        + [f"right_hand_{index}" for index in range(num_tracked_points_right_hand)]
+        + [f"face_{index}" for index in range(num_tracked_points_face)]
+    )
     virtual_markers_definitions = {
         "head_center": {
             "marker_names": ["left_ear", "right_ear"],
@@ -162,3 +185,5 @@ class OpenPoseTrackingParams(BaseTrackingParams):
     track_face: bool = True
     write_video: bool = True
     output_resolution: str = "-1x-1"
+    incremental_ingestion: bool = False
+    openpose_executable_path: Optional[str] = None
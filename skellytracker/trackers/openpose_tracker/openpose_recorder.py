@@ -1,48 +1,61 @@
 import json
-from typing import Dict, Union
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, Union
 import numpy as np
 from pathlib import Path
 import re
-from tqdm import tqdm
 
 from skellytracker.trackers.base_tracker.base_recorder import BaseCumulativeRecorder
 from skellytracker.trackers.openpose_tracker.openpose_model_info import (
     OpenPoseModelInfo,
 )
 
+logger = logging.getLogger(__name__)
+
+KEYPOINTS_FILE_SUFFIX = "_keypoints.json"
+FRAME_INDEX_DIGITS = 12
+KEYPOINTS_CACHE_SUFFIX = "_keypoints_cache.npz"
+KEYPOINTS_CACHE_VERSION = 1
+
 
 class OpenPoseRecorder(BaseCumulativeRecorder):
     def __init__(
         self,
         track_hands: bool = False,
         track_faces: bool = False,
+        num_workers: Optional[int] = None,
+        use_cache: bool = True,
     ):
+        """
+        Recorder that loads the per frame JSON files written by OpenPose.
+
+        :param track_hands: Whether hand keypoints are included in the output.
+        :param track_faces: Whether face keypoints are included in the output.
+        :param num_workers: Number of threads used to read JSON files, defaults to the ThreadPoolExecutor default.
+        :param use_cache: Whether to read and write a consolidated keypoints cache next to the JSON folder.
+        """
         super().__init__()
         self.track_hands = track_hands
         self.track_faces = track_faces
+        self.num_workers = num_workers
+        self.use_cache = use_cache
 
     def extract_frame_index(self, filename: str) -> Union[int, None]:
         """Extract the numeric part indicating the frame index from the filename."""
+        # OpenPose names files `<video>_<12 digit frame>_keypoints.json`, so slice before falling back to a regex
+        if filename.endswith(KEYPOINTS_FILE_SUFFIX):
+            frame_digits = filename[
+                -len(KEYPOINTS_FILE_SUFFIX) - FRAME_INDEX_DIGITS : -len(KEYPOINTS_FILE_SUFFIX)
+            ]
+            if frame_digits.isdigit():
+                return int(frame_digits)
         match = re.search(r"_(\d{12})_keypoints", filename)
         return int(match.group(1)) if match else None
 
-    def parse_openpose_jsons(self, json_directory: Union[Path, str]) -> np.ndarray:
-        # Remove the iteration over subdirectories and focus on a single directory
-        json_directory = Path(json_directory)
-        files = list(Path(json_directory).glob("*.json"))
-        num_frames = len(files)
-        frame_indices = [
-            index
-            for f in files
-            if (index := self.extract_frame_index(f.name)) is not None
-        ]
-        frame_indices.sort()
-
-        if len(frame_indices) != num_frames:
-            raise ValueError(
-                f"Invalid number of frames in {json_directory}: expected {num_frames} != {len(frame_indices)} frames in file"
-            )
-
+    @property
+    def num_markers(self) -> int:
         num_markers = OpenPoseModelInfo.num_tracked_points_body
         if self.track_hands:
             num_markers += (
@@ -51,23 +64,262 @@ class OpenPoseRecorder(BaseCumulativeRecorder):
             )
         if self.track_faces:
             num_markers += OpenPoseModelInfo.num_tracked_points_face
+        return num_markers
 
-        # Initialize a single camera array since we're only processing one video at a time
-        data_array = np.full((num_frames, num_markers, 3), np.nan)
+    def get_landmark_groups(self) -> Dict[str, Tuple[int, int]]:
+        # the output holds the first `num_markers` points of the full layout
+        return {
+            group_name: (start, min(stop, self.num_markers))
+            for group_name, (start, stop) in OpenPoseModelInfo.landmark_groups.items()
+            if start < self.num_markers
+        }
 
-        # Process each JSON file in the directory
-        for file_index, json_file in enumerate(
-            tqdm(files, desc=f"Processing {json_directory.name} JSONs")
-        ):
-            with open(json_file) as f:
-                data = json.load(f)
+    def scan_json_directory(
+        self, json_directory: Path
+    ) -> Tuple[List[Tuple[int, str]], Dict[str, int]]:
+        """
+        List the keypoint files in a directory with their frame indices.
+
+        :return: (frame index, file path) pairs sorted by frame index, and a manifest describing the directory contents.
+        """
+        indexed_files = []
+        latest_mtime_ns = 0
+        total_size = 0
+        with os.scandir(json_directory) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".json"):
+                    continue
+                frame_index = self.extract_frame_index(entry.name)
+                if frame_index is None:
+                    raise ValueError(
+                        f"Could not read frame index from {entry.name} in {json_directory}"
+                    )
+                stat = entry.stat()
+                latest_mtime_ns = max(latest_mtime_ns, stat.st_mtime_ns)
+                total_size += stat.st_size
+                indexed_files.append((frame_index, entry.path))
+        indexed_files.sort()
+
+        manifest = {
+            "cache_version": KEYPOINTS_CACHE_VERSION,
+            "number_of_files": len(indexed_files),
+            "latest_mtime_ns": latest_mtime_ns,
+            "total_size": total_size,
+            "track_hands": self.track_hands,
+            "track_faces": self.track_faces,
+        }
+        return indexed_files, manifest
+
+    def load_keypoints_file(self, json_file: Union[Path, str]) -> Optional[np.ndarray]:
+        """
+        Load the keypoints of the first person in a single OpenPose JSON file.
 
-            if data["people"]:
-                keypoints = self.extract_keypoints(data["people"][0])
-                data_array[frame_indices[file_index], :, :] = keypoints
+        :return: Keypoints array, or None if no person was detected.
+        """
+        with open(json_file, "rb") as f:
+            data = json.loads(f.read())
+
+        if not data["people"]:
+            return None
+        return self.extract_keypoints(data["people"][0])[: self.num_markers]
+
+    @staticmethod
+    def get_cache_path(json_directory: Union[Path, str]) -> Path:
+        """
+        Path of the consolidated keypoints cache, stored next to the JSON folder.
+        """
+        json_directory = Path(json_directory)
+        return json_directory.with_name(json_directory.name + KEYPOINTS_CACHE_SUFFIX)
+
+    def load_cache(
+        self, json_directory: Path, manifest: Dict[str, int]
+    ) -> Optional[np.ndarray]:
+        """
+        Load the keypoints cache if it was written from the same JSON files and settings.
+
+        :return: Cached data array, or None if there is no valid cache.
+        """
+        cache_path = self.get_cache_path(json_directory)
+        if not cache_path.exists():
+            return None
+        try:
+            with np.load(cache_path) as cache:
+                if json.loads(str(cache["manifest"])) != manifest:
+                    logger.info(f"Keypoints cache {cache_path} is stale, reparsing JSONs")
+                    return None
+                return cache["data"]
+        except (OSError, KeyError, ValueError) as e:
+            logger.warning(f"Could not read keypoints cache {cache_path}: {e}")
+            return None
+
+    def save_cache(
+        self, json_directory: Path, data_array: np.ndarray, manifest: Dict[str, int]
+    ) -> None:
+        """
+        Write the parsed keypoints and the manifest they were parsed from to a single .npz file.
+        """
+        cache_path = self.get_cache_path(json_directory)
+        temporary_path = cache_path.with_name(cache_path.name + ".tmp")
+        try:
+            with open(temporary_path, "wb") as f:
+                np.savez(f, data=data_array, manifest=np.array(json.dumps(manifest)))
+            os.replace(temporary_path, cache_path)
+        except OSError as e:
+            logger.warning(f"Could not write keypoints cache {cache_path}: {e}")
+            temporary_path.unlink(missing_ok=True)
+
+    def parse_openpose_jsons(self, json_directory: Union[Path, str]) -> np.ndarray:
+        json_directory = Path(json_directory)
+        indexed_files, manifest = self.scan_json_directory(json_directory)
+
+        if self.use_cache:
+            cached_array = self.load_cache(json_directory, manifest)
+            if cached_array is not None:
+                logger.info(f"Loaded {json_directory.name} keypoints from cache")
+                return cached_array
+
+        num_frames = indexed_files[-1][0] + 1 if indexed_files else 0
+        if num_frames != len(indexed_files):
+            logger.warning(
+                f"{json_directory} has {len(indexed_files)} JSON files for {num_frames} frames, missing frames will be NaN"
+            )
+
+        data_array = np.full((num_frames, self.num_markers, 3), np.nan)
+
+        logger.info(f"Processing {len(indexed_files)} {json_directory.name} JSONs")
+        with ThreadPoolExecutor(max_workers=self.num_workers) as executor:
+            all_keypoints = executor.map(
+                self.load_keypoints_file, [json_file for _, json_file in indexed_files]
+            )
+            for (frame_index, _), keypoints in zip(indexed_files, all_keypoints):
+                if keypoints is not None:
+                    data_array[frame_index] = keypoints
+
+        if self.use_cache:
+            self.save_cache(json_directory, data_array, manifest)
 
         return data_array
 
+    def start_incremental_ingestion(
+        self, json_directory: Union[Path, str], num_frames: int
+    ) -> None:
+        """
+        Prepare to ingest JSON files while OpenPose is still writing them.
+
+        :param json_directory: Folder OpenPose writes its JSON files to.
+        :param num_frames: Expected number of frames, used to preallocate the output array.
+        """
+        self.incremental_json_directory = Path(json_directory)
+        self.incremental_seen_files = set()
+        self.incremental_last_frame_index = -1
+        self.recorded_objects_array = np.full(
+            (num_frames, self.num_markers, 3), np.nan
+        )
+
+    def ingest_new_jsons(self, final_sweep: bool = False) -> int:
+        """
+        Load JSON files that appeared since the last call into the preallocated output array.
+
+        Files that can not be decoded yet are assumed to be partially written and are retried on the next call,
+        unless this is the final sweep.
+
+        :param final_sweep: Whether OpenPose has exited, so every file should be complete.
+        :return: Number of newly ingested files.
+        """
+        new_files = []
+        with os.scandir(self.incremental_json_directory) as entries:
+            for entry in entries:
+                if (
+                    not entry.name.endswith(".json")
+                    or entry.name in self.incremental_seen_files
+                ):
+                    continue
+                frame_index = self.extract_frame_index(entry.name)
+                if frame_index is None:
+                    raise ValueError(
+                        f"Could not read frame index from {entry.name} in {self.incremental_json_directory}"
+                    )
+                new_files.append((frame_index, entry.name, entry.path))
+
+        if not new_files:
+            return 0
+
+        with ThreadPoolExecutor(max_workers=self.num_workers) as executor:
+            loaded_files = list(
+                executor.map(
+                    lambda new_file: self.try_load_keypoints_file(
+                        new_file[2], final_sweep
+                    ),
+                    new_files,
+                )
+            )
+
+        number_ingested = 0
+        for (frame_index, name, _), (is_complete, keypoints) in zip(
+            new_files, loaded_files
+        ):
+            if not is_complete:
+                continue
+            if frame_index >= self.recorded_objects_array.shape[0]:
+                self.grow_recorded_objects_array(frame_index + 1)
+            if keypoints is not None:
+                self.recorded_objects_array[frame_index] = keypoints
+            self.incremental_seen_files.add(name)
+            self.incremental_last_frame_index = max(
+                self.incremental_last_frame_index, frame_index
+            )
+            number_ingested += 1
+        return number_ingested
+
+    def try_load_keypoints_file(
+        self, json_file: Union[Path, str], final_sweep: bool
+    ) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        Load a JSON file that may still be being written.
+
+        A partially written file can be cut off inside a multibyte character or inside a keypoint list,
+        so decoding and reshaping errors are treated like an incomplete JSON document.
+
+        :return: Whether the file was complete, and its keypoints.
+        """
+        try:
+            return True, self.load_keypoints_file(json_file)
+        except (UnicodeDecodeError, ValueError, KeyError):
+            if final_sweep:
+                raise
+            return False, None
+
+    def grow_recorded_objects_array(self, num_frames: int) -> None:
+        """
+        Extend the preallocated output array with NaN frames, when OpenPose writes more frames than expected.
+        """
+        additional_frames = np.full(
+            (
+                num_frames - self.recorded_objects_array.shape[0],
+                *self.recorded_objects_array.shape[1:],
+            ),
+            np.nan,
+        )
+        self.recorded_objects_array = np.concatenate(
+            [self.recorded_objects_array, additional_frames]
+        )
+
+    def finish_incremental_ingestion(self) -> np.ndarray:
+        """
+        Run the final sweep once OpenPose has exited and trim the output array to the frames that were written.
+
+        :return: Array of tracked keypoints, matching the output of `parse_openpose_jsons`.
+        """
+        self.ingest_new_jsons(final_sweep=True)
+        data_array = self.recorded_objects_array[
+            : self.incremental_last_frame_index + 1
+        ]
+        if self.use_cache:
+            _, manifest = self.scan_json_directory(self.incremental_json_directory)
+            self.save_cache(self.incremental_json_directory, data_array, manifest)
+        self.recorded_objects_array = self.output_precision.encode(data_array)
+        return self.recorded_objects_array
+
     def extract_keypoints(self, person_data: Dict[str, np.ndarray]) -> np.ndarray:
         """Extract and organize keypoints from person data."""
 
@@ -112,5 +364,7 @@ class OpenPoseRecorder(BaseCumulativeRecorder):
         Convert the recorded JSON data into the structured numpy array format.
         """
         # In this case, the recorded_objects are already in the desired format, so we simply return them.
-        self.recorded_objects_array = self.parse_openpose_jsons(output_json_path)
+        self.recorded_objects_array = self.output_precision.encode(
+            self.parse_openpose_jsons(output_json_path)
+        )
         return self.recorded_objects_array
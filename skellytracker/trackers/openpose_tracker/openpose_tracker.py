@@ -1,9 +1,64 @@
+import logging
+import shutil
 import subprocess
+import time
 from pathlib import Path
-from typing import Optional, Union
+from typing import List, Optional, Union
+
+import cv2
+import numpy as np
+from tqdm import tqdm
+
 from skellytracker.trackers.base_tracker.base_tracker import BaseCumulativeTracker
 from skellytracker.trackers.openpose_tracker.openpose_recorder import OpenPoseRecorder
 
+logger = logging.getLogger(__name__)
+
+# Relative to the OpenPose root folder: the Windows portable demo, then a Linux/macOS CMake build
+OPENPOSE_EXECUTABLE_CANDIDATES = [
+    Path("bin") / "OpenPoseDemo.exe",
+    Path("build") / "examples" / "openpose" / "openpose.bin",
+]
+OPENPOSE_EXECUTABLE_NAMES = ["OpenPoseDemo", "openpose.bin"]
+
+
+def resolve_openpose_executable(
+    openpose_root_folder_path: Union[str, Path],
+    openpose_executable_path: Optional[Union[str, Path]] = None,
+) -> Path:
+    """
+    Find the OpenPose executable for this platform.
+
+    :param openpose_root_folder_path: Path to the OpenPose root folder.
+    :param openpose_executable_path: Explicit path to the executable, relative paths are resolved against the root folder.
+    :return: Path to the OpenPose executable.
+    :raise FileNotFoundError: If no OpenPose executable can be found.
+    """
+    openpose_root_folder_path = Path(openpose_root_folder_path)
+    if openpose_executable_path is not None:
+        executable_path = openpose_root_folder_path / openpose_executable_path
+        if not executable_path.is_file():
+            raise FileNotFoundError(
+                f"OpenPose executable not found at {executable_path}"
+            )
+        return executable_path
+
+    for candidate in OPENPOSE_EXECUTABLE_CANDIDATES:
+        executable_path = openpose_root_folder_path / candidate
+        if executable_path.is_file():
+            return executable_path
+
+    for executable_name in OPENPOSE_EXECUTABLE_NAMES:
+        found_executable = shutil.which(executable_name)
+        if found_executable is not None:
+            return Path(found_executable)
+
+    raise FileNotFoundError(
+        f"Could not find an OpenPose executable in {openpose_root_folder_path}, "
+        f"looked for {[str(candidate) for candidate in OPENPOSE_EXECUTABLE_CANDIDATES]} "
+        f"and {OPENPOSE_EXECUTABLE_NAMES} on the PATH"
+    )
+
 
 class OpenPoseTracker(BaseCumulativeTracker):
     def __init__(
@@ -15,6 +70,10 @@ class OpenPoseTracker(BaseCumulativeTracker):
         track_hands: bool = True,
         track_faces: bool = True,
         output_resolution: str = "-1x-1",
+        incremental_ingestion: bool = False,
+        ingestion_poll_interval_seconds: float = 0.5,
+        write_video: bool = True,
+        openpose_executable_path: Optional[Union[str, Path]] = None,
     ):
         """
         Initialize the OpenPoseTracker.
@@ -27,6 +86,10 @@ class OpenPoseTracker(BaseCumulativeTracker):
         :param track_hands: Whether to track hands.
         :param track_faces: Whether to track faces.
         :param output_resolution: Output resolution for video.
+        :param incremental_ingestion: Whether to load JSON files while OpenPose is still running, instead of after it exits.
+        :param ingestion_poll_interval_seconds: How often to check for new JSON files during incremental ingestion.
+        :param write_video: Whether OpenPose renders an annotated video, disable to only write JSON data, which is much faster.
+        :param openpose_executable_path: Path to the OpenPose executable, relative to the root folder, found automatically by default.
         """
         super().__init__(
             tracked_object_names=[],
@@ -44,6 +107,10 @@ class OpenPoseTracker(BaseCumulativeTracker):
         self.track_hands = track_hands
         self.track_faces = track_faces
         self.output_resolution = output_resolution
+        self.incremental_ingestion = incremental_ingestion
+        self.ingestion_poll_interval_seconds = ingestion_poll_interval_seconds
+        self.write_video = write_video
+        self.openpose_executable_path = openpose_executable_path
 
     def set_track_hands(self, track_hands: bool):
         self._track_hands = track_hands
@@ -61,7 +128,7 @@ class OpenPoseTracker(BaseCumulativeTracker):
         input_video_filepath: Union[str, Path],
         output_video_filepath: Union[str, Path],
         save_data_bool: bool = False,
-        use_tqdm: bool = True,  # TODO: this is unused, replace with an openpose flag or remove
+        use_tqdm: bool = True,
         **kwargs,
     ):
         """
@@ -71,7 +138,7 @@ class OpenPoseTracker(BaseCumulativeTracker):
         :param input_video_filepath: Path to the input video file.
         :param output_video_filepath: Path to the output video file.
         :param save_data_bool: Whether to save the data.
-        :param use_tqdm: Whether to use tqdm progress bar.
+        :param use_tqdm: Whether to use tqdm progress bar, only used with incremental ingestion.
         :return: The output array, or None if recorder isn't initialized in tracker.
         """
         # Extract video name without extension to use as a unique folder name
@@ -85,9 +152,64 @@ class OpenPoseTracker(BaseCumulativeTracker):
         unique_json_output_path = Path(self.output_json_folder_path) / video_name
         unique_json_output_path.mkdir(parents=True, exist_ok=True)
 
-        # Full path to the OpenPose executable
-        openpose_executable_path = (
-            self.openpose_root_folder_path / "bin" / "OpenPoseDemo.exe"
+        openpose_command = self.build_openpose_command(
+            input_video_filepath=input_video_filepath,
+            output_video_filepath=output_video_filepath,
+            json_output_path=unique_json_output_path,
+        )
+
+        if self.incremental_ingestion and self.recorder is not None:
+            output_array = self.run_openpose_with_incremental_ingestion(
+                openpose_command=openpose_command,
+                input_video_filepath=input_video_filepath,
+                json_output_path=unique_json_output_path,
+                use_tqdm=use_tqdm,
+            )
+            if output_array is None:
+                return None
+        else:
+            # Update the subprocess command to use the unique output directory
+            try:
+                subprocess.run(  # noqa: S603
+                    openpose_command,
+                    shell=False,
+                    cwd=self.openpose_root_folder_path,  # Set the current working directory for the subprocess
+                    check=True,
+                )
+            except subprocess.CalledProcessError as e:
+                logger.error(f"OpenPose failed: {e}")
+                return None
+
+            if self.recorder is not None:
+                output_array = self.recorder.process_tracked_objects(
+                    output_json_path=unique_json_output_path
+                )
+            else:
+                output_array = None
+
+        if self.recorder is not None and save_data_bool:
+            self.recorder.save(
+                file_path=str(Path(input_video_filepath).with_suffix(".npy"))
+            )
+
+        return output_array
+
+    def build_openpose_command(
+        self,
+        input_video_filepath: Union[str, Path],
+        output_video_filepath: Union[str, Path],
+        json_output_path: Path,
+    ) -> List[str]:
+        """
+        Build the OpenPose command line for a video.
+
+        :param input_video_filepath: Path to the input video file.
+        :param output_video_filepath: Path to the output video file, unused if write_video is False.
+        :param json_output_path: Folder OpenPose writes its JSON files to.
+        :return: OpenPose command as a list of arguments.
+        """
+        openpose_executable_path = resolve_openpose_executable(
+            self.openpose_root_folder_path, self.openpose_executable_path
         )
 
         openpose_command = [
@@ -95,45 +217,87 @@ class OpenPoseTracker(BaseCumulativeTracker):
             "--video",
             str(input_video_filepath),
             "--write_json",
-            str(unique_json_output_path),
+            str(json_output_path),
             "--net_resolution",
             str(self.net_resolution),
             "--number_people_max",
             str(self.number_people_max),
-            "--write_video",
-            str(output_video_filepath),
-            "--output_resolution",
-            str(self.output_resolution),
         ]
 
+        if self.write_video:
+            openpose_command += [
+                "--write_video",
+                str(output_video_filepath),
+                "--output_resolution",
+                str(self.output_resolution),
+            ]
+        else:
+            # data only: skip rendering keypoints onto frames and opening a display window
+            openpose_command += ["--render_pose", "0", "--display", "0"]
+
         if self.track_hands:
             openpose_command.append("--hand")
         if self.track_faces:
             openpose_command.append("--face")
 
-        # Update the subprocess command to use the unique output directory
+        return openpose_command
+
+    def run_openpose_with_incremental_ingestion(
+        self,
+        openpose_command: List[str],
+        input_video_filepath: Union[str, Path],
+        json_output_path: Path,
+        use_tqdm: bool = True,
+    ) -> Optional[np.ndarray]:
+        """
+        Run OpenPose in the background and load its JSON files into the recorder as they are written.
+
+        :param openpose_command: Command to start OpenPose with.
+        :param input_video_filepath: Path to the input video file, used to preallocate the output array.
+        :param json_output_path: Folder OpenPose writes its JSON files to.
+        :param use_tqdm: Whether to show progress based on the JSON files seen.
+        :return: The output array, or None if OpenPose failed.
+        """
+        cap = cv2.VideoCapture(str(input_video_filepath))
+        num_frames = max(int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), 0)
+        cap.release()
+
+        self.recorder.start_incremental_ingestion(
+            json_directory=json_output_path, num_frames=num_frames
+        )
+        progress_bar = tqdm(
+            total=num_frames or None,
+            desc=f"Processing {json_output_path.name} with OpenPose",
+            disable=not use_tqdm,
+        )
+
+        process = subprocess.Popen(  # noqa: S603
+            openpose_command,
+            shell=False,
+            cwd=self.openpose_root_folder_path,  # Set the current working directory for the subprocess
+        )
         try:
-            subprocess.run(  # noqa: S603
-                openpose_command,
-                shell=False,
-                cwd=self.openpose_root_folder_path,  # Set the current working directory for the subprocess
-                check=True,
-            )
-        except subprocess.CalledProcessError as e:
-            print(f"Error: {e}")
-            return None
+            while process.poll() is None:
+                progress_bar.update(self.recorder.ingest_new_jsons())
+                time.sleep(self.ingestion_poll_interval_seconds)
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
 
-        if self.recorder is not None:
-            output_array = self.recorder.process_tracked_objects(
-                output_json_path=unique_json_output_path
+        if process.returncode != 0:
+            progress_bar.close()
+            logger.error(
+                f"OpenPose failed: {subprocess.CalledProcessError(process.returncode, openpose_command)}"
             )
-            if save_data_bool:
-                self.recorder.save(
-                    file_path=str(Path(input_video_filepath).with_suffix(".npy"))
-                )
-        else:
-            output_array = None
+            return None
 
+        output_array = self.recorder.finish_incremental_ingestion()
+        progress_bar.update(len(self.recorder.incremental_seen_files) - progress_bar.n)
+        progress_bar.close()
+        logger.info(
+            f"Ingested {len(self.recorder.incremental_seen_files)} OpenPose JSONs from {json_output_path}"
+        )
         return output_array
 
 
@@ -1,6 +1,7 @@
 import numpy as np
 from ultralytics import SAM
 
+from skellytracker.system.model_cache import get_ultralytics_model
 from skellytracker.trackers.base_tracker.base_tracker import BaseTracker
 
 
@@ -8,7 +9,7 @@ class SAMTracker(BaseTracker):
     def __init__(self):
         super().__init__(recorder=None, tracked_object_names=["segmentation"])
 
-        self.model = SAM("sam_b.pt")
+        self.model = SAM(get_ultralytics_model("sam_b.pt"))
 
     def process_image(self, image, **kwargs):
         results = self.model.predict(image)
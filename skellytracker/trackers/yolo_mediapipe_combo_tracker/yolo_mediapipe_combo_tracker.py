@@ -3,16 +3,18 @@ import numpy as np
 import copy
 import mediapipe as mp
 import torch
-from typing import Dict, Literal, Tuple
+from typing import Dict, Literal, Sequence, Tuple
 from ultralytics import YOLO
 
+from skellytracker.system.model_cache import get_ultralytics_model
 from skellytracker.trackers.base_tracker.base_tracker import BaseTracker
 from skellytracker.trackers.base_tracker.tracked_object import TrackedObject
 from skellytracker.trackers.mediapipe_tracker.mediapipe_holistic_recorder import (
     MediapipeHolisticRecorder,
 )
 from skellytracker.trackers.mediapipe_tracker.mediapipe_model_info import (
-    MediapipeModelInfo,
+    MEDIAPIPE_LANDMARK_GROUPS,
+    MediapipeLandmarkGroup,
 )
 from skellytracker.trackers.yolo_object_tracker.yolo_object_model_info import (
     yolo_object_model_dictionary,
@@ -32,13 +34,22 @@ class YOLOMediapipeComboTracker(BaseTracker):
         buffer_size_method: Literal[
             "buffer_by_box_size", "buffer_by_image_size"
         ] = "buffer_by_box_size",
+        landmark_groups: Sequence[MediapipeLandmarkGroup] = MEDIAPIPE_LANDMARK_GROUPS,
     ):
+        recorder = MediapipeHolisticRecorder(landmark_groups=landmark_groups)
         super().__init__(
-            tracked_object_names=MediapipeModelInfo.tracked_object_names,
-            recorder=MediapipeHolisticRecorder(),
+            tracked_object_names=recorder.model_info.tracked_object_names,
+            recorder=recorder,
         )
+        self.model_info = recorder.model_info
         self.mp_drawing = mp.solutions.drawing_utils
         self.mp_holistic = mp.solutions.holistic
+        self.landmark_connections = {
+            "pose_landmarks": self.mp_holistic.POSE_CONNECTIONS,
+            "right_hand_landmarks": self.mp_holistic.HAND_CONNECTIONS,
+            "left_hand_landmarks": self.mp_holistic.HAND_CONNECTIONS,
+            "face_landmarks": self.mp_holistic.FACEMESH_TESSELATION,
+        }
         self.holistic = self.mp_holistic.Holistic(
             model_complexity=model_complexity,
             min_detection_confidence=min_detection_confidence,
@@ -48,7 +59,7 @@ class YOLOMediapipeComboTracker(BaseTracker):
         )
 
         pytorch_model = yolo_object_model_dictionary[model_size]
-        self.model = YOLO(pytorch_model)
+        self.model = YOLO(get_ultralytics_model(pytorch_model))
         self.bounding_box_buffer_percentage = bounding_box_buffer_percentage
         self.buffer_size_method = buffer_size_method
 
@@ -104,18 +115,10 @@ class YOLOMediapipeComboTracker(BaseTracker):
         self._rescale_cropped_data(
             image, box_left, box_top, box_right, box_bottom, mediapipe_results
         )
-        self.tracked_objects["pose_landmarks"].extra[
-            "landmarks"
-        ] = mediapipe_results.pose_landmarks
-        self.tracked_objects["face_landmarks"].extra[
-            "landmarks"
-        ] = mediapipe_results.face_landmarks
-        self.tracked_objects["left_hand_landmarks"].extra[
-            "landmarks"
-        ] = mediapipe_results.left_hand_landmarks
-        self.tracked_objects["right_hand_landmarks"].extra[
-            "landmarks"
-        ] = mediapipe_results.right_hand_landmarks
+        for tracked_object_name in self.model_info.tracked_object_names:
+            self.tracked_objects[tracked_object_name].extra["landmarks"] = getattr(
+                mediapipe_results, tracked_object_name
+            )
 
         bbox_image = buffered_yolo_results[0].plot()
 
@@ -191,27 +194,13 @@ class YOLOMediapipeComboTracker(BaseTracker):
     def annotate_image(
         self, image: np.ndarray, tracked_objects: Dict[str, TrackedObject], **kwargs
     ) -> np.ndarray:
-        # Draw the pose, face, and hand landmarks on the image
-        self.mp_drawing.draw_landmarks(
-            image,
-            tracked_objects["pose_landmarks"].extra["landmarks"],
-            self.mp_holistic.POSE_CONNECTIONS,
-        )
-        self.mp_drawing.draw_landmarks(
-            image,
-            tracked_objects["face_landmarks"].extra["landmarks"],
-            self.mp_holistic.FACEMESH_TESSELATION,
-        )
-        self.mp_drawing.draw_landmarks(
-            image,
-            tracked_objects["left_hand_landmarks"].extra["landmarks"],
-            self.mp_holistic.HAND_CONNECTIONS,
-        )
-        self.mp_drawing.draw_landmarks(
-            image,
-            tracked_objects["right_hand_landmarks"].extra["landmarks"],
-            self.mp_holistic.HAND_CONNECTIONS,
-        )
+        # Draw the landmarks of the selected groups on the image
+        for tracked_object_name in self.model_info.tracked_object_names:
+            self.mp_drawing.draw_landmarks(
+                image,
+                tracked_objects[tracked_object_name].extra["landmarks"],
+                self.landmark_connections[tracked_object_name],
+            )
 
         return image
 
@@ -11,8 +11,13 @@ class YOLOObjectRecorder(BaseRecorder):
         self.recorded_objects.append(deepcopy(tracked_objects["object"]))
 
     def process_tracked_objects(self, **kwargs) -> np.ndarray:
-        self.recorded_objects_array = np.zeros((len(self.recorded_objects), 4))
+        recorded_objects_array = np.zeros(
+            (len(self.recorded_objects), 4), dtype=self.output_precision.working_dtype
+        )
         for i, recorded_object in enumerate(self.recorded_objects):
-            self.recorded_objects_array[i, :] = recorded_object.extra["boxes_xyxy"]
+            recorded_objects_array[i, :] = recorded_object.extra["boxes_xyxy"]
 
+        self.recorded_objects_array = self.output_precision.encode(
+            recorded_objects_array
+        )
         return self.recorded_objects_array
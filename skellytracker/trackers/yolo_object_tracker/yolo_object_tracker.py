@@ -2,6 +2,7 @@ import numpy as np
 from typing import Dict
 from ultralytics import YOLO
 
+from skellytracker.system.model_cache import get_ultralytics_model
 from skellytracker.trackers.base_tracker.base_tracker import BaseTracker
 from skellytracker.trackers.base_tracker.tracked_object import TrackedObject
 from skellytracker.trackers.yolo_object_tracker.yolo_object_model_info import (
@@ -22,7 +23,7 @@ class YOLOObjectTracker(BaseTracker):
         super().__init__(tracked_object_names=["object"], recorder=YOLOObjectRecorder())
 
         pytorch_model = yolo_object_model_dictionary[model_size]
-        self.model = YOLO(pytorch_model)
+        self.model = YOLO(get_ultralytics_model(pytorch_model))
         self.confidence_threshold = confidence_threshold
         # TODO: When we expose this in freemocap, replace this with an int/list[int] to decide which class to track
         # TODO: Will also need to parameterize the "max_det" and setup tracker to take multiple tracked objects
@@ -34,6 +34,7 @@ class YOLOModelInfo(ModelInfo):
         "left_ankle",
         "right_ankle",
     ]
+    landmark_groups = {"body": (0, num_tracked_points)}
     virtual_markers_definitions = {
         "head_center": {
             "marker_names": ["left_ear", "right_ear"],
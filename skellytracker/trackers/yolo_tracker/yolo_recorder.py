@@ -12,18 +12,22 @@ class YOLORecorder(BaseRecorder):
         self.recorded_objects.append(deepcopy(tracked_objects["tracked_person"]))
 
     def process_tracked_objects(self, **kwargs) -> np.ndarray:
-        self.recorded_objects_array = np.zeros(
-            (len(self.recorded_objects), YOLOModelInfo.num_tracked_points, 3)
+        recorded_objects_array = np.zeros(
+            (len(self.recorded_objects), YOLOModelInfo.num_tracked_points, 3),
+            dtype=self.output_precision.working_dtype,
         )
 
         for i, recorded_object in enumerate(self.recorded_objects):
             for j in range(YOLOModelInfo.num_tracked_points):
-                self.recorded_objects_array[i, j, 0] = recorded_object.extra[
+                recorded_objects_array[i, j, 0] = recorded_object.extra[
                     "landmarks"
                 ][0, j, 0]
-                self.recorded_objects_array[i, j, 1] = recorded_object.extra[
+                recorded_objects_array[i, j, 1] = recorded_object.extra[
                     "landmarks"
                 ][0, j, 1]
-                self.recorded_objects_array[i, j, 2] = np.nan
+                recorded_objects_array[i, j, 2] = np.nan
 
+        self.recorded_objects_array = self.output_precision.encode(
+            recorded_objects_array
+        )
         return self.recorded_objects_array
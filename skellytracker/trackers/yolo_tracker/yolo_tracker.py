@@ -2,6 +2,7 @@ import numpy as np
 from typing import Dict
 from ultralytics import YOLO
 
+from skellytracker.system.model_cache import get_ultralytics_model
 from skellytracker.trackers.base_tracker.base_tracker import BaseTracker
 from skellytracker.trackers.base_tracker.tracked_object import TrackedObject
 from skellytracker.trackers.yolo_tracker.yolo_model_info import YOLOModelInfo
@@ -13,7 +14,7 @@ class YOLOPoseTracker(BaseTracker):
         super().__init__(tracked_object_names=[], recorder=YOLORecorder())
 
         pytorch_model = YOLOModelInfo.model_dictionary[model_size]
-        self.model = YOLO(pytorch_model)
+        self.model = YOLO(get_ultralytics_model(pytorch_model))
 
     def process_image(self, image: np.ndarray, **kwargs) -> Dict[str, TrackedObject]:
         # "max_det=1" argument to limit to single person tracking for now
@@ -0,0 +1,349 @@
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Literal, Optional, Union
+import zlib
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CHUNKED_STORE_SUFFIX = ".chunks"
+INDEX_FILE_NAME = "index.json"
+FORMAT_VERSION = 1
+DEFAULT_CHUNK_FRAMES = 256
+ZLIB_COMPRESSION_LEVEL = 6
+
+Codec = Literal["zlib", "none"]
+
+
+def shuffle_bytes(array: np.ndarray) -> bytes:
+    """
+    Group the bytes of every element by significance, so the similar high bytes of neighbouring floats (and NaNs)
+    end up next to each other and compress much better.
+    """
+    itemsize = array.dtype.itemsize
+    return np.ascontiguousarray(array).view(np.uint8).reshape(-1, itemsize).T.tobytes()
+
+
+def unshuffle_bytes(data: bytes, dtype: np.dtype, shape: tuple) -> np.ndarray:
+    """
+    Undo `shuffle_bytes`.
+    """
+    dtype = np.dtype(dtype)
+    byte_planes = np.frombuffer(data, dtype=np.uint8).reshape(dtype.itemsize, -1)
+    return np.ascontiguousarray(byte_planes.T).view(dtype).reshape(shape)
+
+
+def encode_chunk(array: np.ndarray, codec: Codec, shuffle: bool) -> bytes:
+    data = shuffle_bytes(array) if shuffle else np.ascontiguousarray(array).tobytes()
+    if codec == "zlib":
+        return zlib.compress(data, ZLIB_COMPRESSION_LEVEL)
+    return data
+
+
+def decode_chunk(
+    data: bytes, codec: Codec, shuffle: bool, dtype: np.dtype, shape: tuple
+) -> np.ndarray:
+    if codec == "zlib":
+        data = zlib.decompress(data)
+    if shuffle:
+        return unshuffle_bytes(data, dtype, shape)
+    return np.frombuffer(data, dtype=dtype).reshape(shape)
+
+
+def get_chunked_store_path(file_path: Union[str, Path]) -> Path:
+    """
+    Path of the chunked store that replaces a `.npy` output file.
+    """
+    return Path(file_path).with_suffix(CHUNKED_STORE_SUFFIX)
+
+
+class ChunkedTrackingStoreWriter:
+    """
+    Writes (cameras, frames, points, dimensions) tracking data into a folder of compressed chunks and a JSON index.
+
+    Frames are appended per camera and written out in chunks of `chunk_frames` frames.
+    The index is rewritten after every chunk, so an interrupted run leaves a readable store,
+    and an existing store can be reopened with `append=True` to append to it.
+    """
+
+    def __init__(
+        self,
+        store_path: Union[str, Path],
+        number_of_cameras: int,
+        number_of_points: int,
+        number_of_dimensions: int,
+        dtype: Union[str, np.dtype] = np.float64,
+        chunk_frames: int = DEFAULT_CHUNK_FRAMES,
+        codec: Codec = "zlib",
+        shuffle: bool = True,
+        metadata: Optional[Dict[str, Any]] = None,
+        append: bool = False,
+    ):
+        """
+        :param store_path: Folder to write the store to.
+        :param number_of_cameras: Number of cameras in the store.
+        :param number_of_points: Number of tracked points per frame.
+        :param number_of_dimensions: Number of values per tracked point.
+        :param dtype: Data type of the stored values.
+        :param chunk_frames: Number of frames per chunk.
+        :param codec: "zlib" for lossless compression, or "none".
+        :param shuffle: Whether to byte shuffle chunks before compressing them.
+        :param metadata: JSON serializable information stored in the index, e.g. tracker name, params, landmark names.
+        :param append: Whether to append to a store already in `store_path`, otherwise it is replaced.
+        """
+        self.store_path = Path(store_path)
+        self.store_path.mkdir(parents=True, exist_ok=True)
+
+        index_path = self.store_path / INDEX_FILE_NAME
+        if index_path.exists() and not append:
+            logger.info(f"Replacing existing store at {self.store_path}")
+            self.remove_store_files()
+        if index_path.exists():
+            self.index = json.loads(index_path.read_text())
+            expected_shape = [number_of_cameras, number_of_points, number_of_dimensions]
+            stored_shape = [self.index["shape"][0], *self.index["shape"][2:]]
+            if stored_shape != expected_shape or np.dtype(self.index["dtype"]) != np.dtype(dtype):
+                raise ValueError(
+                    f"Existing store at {self.store_path} has shape {self.index['shape']} and dtype {self.index['dtype']}, "
+                    f"can not append {expected_shape} {np.dtype(dtype)} data"
+                )
+            if metadata:
+                self.index["metadata"].update(metadata)
+        else:
+            self.index = {
+                "format_version": FORMAT_VERSION,
+                "shape": [number_of_cameras, 0, number_of_points, number_of_dimensions],
+                "dtype": np.dtype(dtype).str,
+                "chunk_frames": chunk_frames,
+                "codec": codec,
+                "shuffle": shuffle,
+                "metadata": metadata or {},
+                "chunks": [],
+            }
+
+        self.dtype = np.dtype(self.index["dtype"])
+        self.frame_shape = tuple(self.index["shape"][2:])
+        self.frames_written = [0] * number_of_cameras
+        for chunk in self.index["chunks"]:
+            self.frames_written[chunk["camera"]] = max(
+                self.frames_written[chunk["camera"]],
+                chunk["start_frame"] + chunk["number_of_frames"],
+            )
+        self.pending_frames: List[List[np.ndarray]] = [[] for _ in range(number_of_cameras)]
+        self.number_of_pending_frames = [0] * number_of_cameras
+
+    def remove_store_files(self) -> None:
+        """
+        Delete the index and chunks of an existing store, leaving any other files in the folder alone.
+        """
+        for chunk_path in self.store_path.glob("*.chunk"):
+            chunk_path.unlink()
+        (self.store_path / INDEX_FILE_NAME).unlink()
+
+    def append(self, camera_index: int, frames: np.ndarray) -> None:
+        """
+        Append frames to the end of a camera's data.
+
+        :param camera_index: Camera to append to.
+        :param frames: Array of shape (frames, points, dimensions), or a single (points, dimensions) frame.
+        """
+        frames = np.asarray(frames, dtype=self.dtype)
+        if frames.shape == self.frame_shape:
+            frames = frames[np.newaxis]
+        if frames.shape[1:] != self.frame_shape:
+            raise ValueError(
+                f"Expected frames of shape {self.frame_shape}, got {frames.shape[1:]}"
+            )
+
+        self.pending_frames[camera_index].append(frames)
+        self.number_of_pending_frames[camera_index] += frames.shape[0]
+        chunk_frames = self.index["chunk_frames"]
+        if self.number_of_pending_frames[camera_index] >= chunk_frames:
+            pending = np.concatenate(self.pending_frames[camera_index])
+            full_chunks = pending.shape[0] // chunk_frames * chunk_frames
+            for start in range(0, full_chunks, chunk_frames):
+                self.write_chunk(camera_index, pending[start : start + chunk_frames])
+            self.pending_frames[camera_index] = [pending[full_chunks:]]
+            self.number_of_pending_frames[camera_index] = pending.shape[0] - full_chunks
+            self.write_index()
+
+    def write_chunk(self, camera_index: int, frames: np.ndarray) -> None:
+        start_frame = self.frames_written[camera_index]
+        file_name = f"camera_{camera_index:03d}_frame_{start_frame:09d}.chunk"
+        data = encode_chunk(frames, self.index["codec"], self.index["shuffle"])
+        (self.store_path / file_name).write_bytes(data)
+
+        self.index["chunks"].append(
+            {
+                "camera": camera_index,
+                "start_frame": start_frame,
+                "number_of_frames": frames.shape[0],
+                "file": file_name,
+                "crc32": zlib.crc32(data),
+                "stored_bytes": len(data),
+            }
+        )
+        self.frames_written[camera_index] = start_frame + frames.shape[0]
+        self.index["shape"][1] = max(self.index["shape"][1], self.frames_written[camera_index])
+
+    def write_index(self) -> None:
+        index_path = self.store_path / INDEX_FILE_NAME
+        temporary_path = index_path.with_name(INDEX_FILE_NAME + ".tmp")
+        temporary_path.write_text(json.dumps(self.index, indent=1))
+        os.replace(temporary_path, index_path)
+
+    def flush(self) -> None:
+        """
+        Write out the frames that do not fill a whole chunk yet.
+        """
+        for camera_index, pending_frames in enumerate(self.pending_frames):
+            if self.number_of_pending_frames[camera_index] > 0:
+                self.write_chunk(camera_index, np.concatenate(pending_frames))
+            self.pending_frames[camera_index] = []
+            self.number_of_pending_frames[camera_index] = 0
+        self.write_index()
+
+    def close(self) -> None:
+        self.flush()
+        logger.info(f"Tracking data saved to {self.store_path}")
+
+    def __enter__(self) -> "ChunkedTrackingStoreWriter":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+class ChunkedTrackingStore:
+    """
+    Reads a store written by `ChunkedTrackingStoreWriter`, decompressing only the chunks a read overlaps.
+
+    Frames without a chunk read as NaN (or 0 for integer data).
+    """
+
+    def __init__(self, store_path: Union[str, Path], verify_checksums: bool = True):
+        """
+        :param store_path: Folder of the store.
+        :param verify_checksums: Whether to check each chunk against its checksum when it is read.
+        """
+        self.store_path = Path(store_path)
+        self.index = json.loads((self.store_path / INDEX_FILE_NAME).read_text())
+        if self.index["format_version"] > FORMAT_VERSION:
+            raise ValueError(
+                f"{self.store_path} uses format version {self.index['format_version']}, "
+                f"this version of skellytracker reads up to {FORMAT_VERSION}"
+            )
+        self.verify_checksums = verify_checksums
+        self.dtype = np.dtype(self.index["dtype"])
+        self.shape = tuple(self.index["shape"])
+        self.metadata: Dict[str, Any] = self.index["metadata"]
+
+    def __len__(self) -> int:
+        return self.shape[1]
+
+    def read_chunk(self, chunk: Dict[str, Any]) -> np.ndarray:
+        data = (self.store_path / chunk["file"]).read_bytes()
+        if self.verify_checksums and zlib.crc32(data) != chunk["crc32"]:
+            raise ValueError(f"Checksum mismatch in {self.store_path / chunk['file']}")
+        return decode_chunk(
+            data,
+            self.index["codec"],
+            self.index["shuffle"],
+            self.dtype,
+            (chunk["number_of_frames"], *self.shape[2:]),
+        )
+
+    def read(
+        self,
+        start_frame: int = 0,
+        end_frame: Optional[int] = None,
+        cameras: Optional[List[int]] = None,
+    ) -> np.ndarray:
+        """
+        Read a window of frames.
+
+        :param start_frame: First frame to read.
+        :param end_frame: Frame to stop before, defaults to the end of the data.
+        :param cameras: Cameras to read, defaults to all cameras.
+        :return: Array of shape (cameras, frames, points, dimensions).
+        """
+        end_frame = self.shape[1] if end_frame is None else min(end_frame, self.shape[1])
+        start_frame = max(start_frame, 0)
+        cameras = list(range(self.shape[0])) if cameras is None else list(cameras)
+
+        fill_value = np.nan if np.issubdtype(self.dtype, np.floating) else 0
+        output = np.full(
+            (len(cameras), max(end_frame - start_frame, 0), *self.shape[2:]),
+            fill_value,
+            dtype=self.dtype,
+        )
+        for chunk in self.index["chunks"]:
+            if chunk["camera"] not in cameras:
+                continue
+            chunk_start = chunk["start_frame"]
+            chunk_end = chunk_start + chunk["number_of_frames"]
+            overlap_start = max(chunk_start, start_frame)
+            overlap_end = min(chunk_end, end_frame)
+            if overlap_start >= overlap_end:
+                continue
+            chunk_frames = self.read_chunk(chunk)
+            output[
+                cameras.index(chunk["camera"]),
+                overlap_start - start_frame : overlap_end - start_frame,
+            ] = chunk_frames[overlap_start - chunk_start : overlap_end - chunk_start]
+        return output
+
+    def __getitem__(self, key) -> np.ndarray:
+        """
+        Slice the store like an array of cameras and frames, e.g. `store[:, 100:200]` or `store[2]`.
+
+        Frame slices must be contiguous, points and dimensions can be sliced on the returned array.
+        """
+        if not isinstance(key, tuple):
+            key = (key,)
+        if len(key) > 2:
+            raise IndexError(
+                "Index cameras and frames, then slice points and dimensions on the result"
+            )
+        frame_key = key[1] if len(key) > 1 else slice(None)
+        if not isinstance(frame_key, slice) or frame_key.step not in (None, 1):
+            raise IndexError("Only contiguous frame slices are supported")
+
+        start_frame, end_frame, _ = frame_key.indices(self.shape[1])
+        cameras = np.arange(self.shape[0])[key[0]]
+        output = self.read(
+            start_frame, end_frame, cameras=np.atleast_1d(cameras).tolist()
+        )
+        return output[0] if np.ndim(cameras) == 0 else output
+
+    def to_array(self) -> np.ndarray:
+        return self.read()
+
+
+def save_chunked_tracking_data(
+    file_path: Union[str, Path],
+    tracking_data: np.ndarray,
+    metadata: Optional[Dict[str, Any]] = None,
+    **writer_kwargs: Any,
+) -> Path:
+    """
+    Save a whole (cameras, frames, points, dimensions) array as a chunked store, replacing any store in its place.
+
+    :return: Path to the store.
+    """
+    store_path = Path(file_path)
+    with ChunkedTrackingStoreWriter(
+        store_path,
+        number_of_cameras=tracking_data.shape[0],
+        number_of_points=tracking_data.shape[2],
+        number_of_dimensions=tracking_data.shape[3],
+        dtype=tracking_data.dtype,
+        metadata=metadata,
+        **writer_kwargs,
+    ) as writer:
+        for camera_index, camera_data in enumerate(tracking_data):
+            writer.append(camera_index, camera_data)
+    return store_path
@@ -0,0 +1,168 @@
+import json
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Type, Union
+
+import numpy as np
+
+from skellytracker.trackers.base_tracker.model_info import ModelInfo
+from skellytracker.trackers.base_tracker.output_precision import (
+    OutputPrecision,
+    get_precision_sidecar_path,
+)
+
+logger = logging.getLogger(__name__)
+
+FrameSelection = Union[None, int, slice, Tuple[int, int]]
+CameraSelection = Union[None, int, slice]
+
+
+class TrackingOutputReader:
+    """
+    Memory maps a saved `.npy` tracking output and selects cameras, frames, landmark groups and landmarks by name.
+
+    Works with (cameras, frames, points, dimensions) output of `process_list_of_videos` and
+    (frames, points, dimensions) output of `process_video`. Selections made of integers, slices, frame ranges,
+    a landmark group or contiguous landmarks are views into the memory map, so only the pages they touch are ever
+    read from disk. Selecting non contiguous landmarks copies just the selected points.
+    """
+
+    def __init__(
+        self,
+        file_path: Union[str, Path],
+        model_info: Optional[Union[ModelInfo, Type[ModelInfo]]] = None,
+        mmap_mode: Optional[str] = "r",
+    ):
+        """
+        :param file_path: Path to the `.npy` output file.
+        :param model_info: Model info, or model info class, of the tracker that produced the file,
+            for its point names and landmark groups. Points are named `point_{index}` without it.
+        :param mmap_mode: Memory map mode passed to `np.load`, None loads the whole file into memory.
+        """
+        self.file_path = Path(file_path)
+        self.data: np.ndarray = np.load(self.file_path, mmap_mode=mmap_mode)
+        if self.data.ndim not in (3, 4):
+            raise ValueError(
+                f"Expected (frames, points, dims) or (cameras, frames, points, dims) data in {self.file_path}, "
+                f"got shape {self.data.shape}"
+            )
+        self.has_cameras = self.data.ndim == 4
+        self.number_of_points = self.data.shape[-2]
+
+        if model_info is None:
+            self.point_names = [f"point_{index}" for index in range(self.number_of_points)]
+            self.landmark_groups: Dict[str, Tuple[int, int]] = {}
+        else:
+            if model_info.num_tracked_points != self.number_of_points:
+                raise ValueError(
+                    f"{model_info.name} tracks {model_info.num_tracked_points} points, "
+                    f"but {self.file_path} has {self.number_of_points}"
+                )
+            self.point_names = model_info.get_point_names()
+            self.landmark_groups = dict(model_info.landmark_groups or {})
+        self.point_index: Dict[str, int] = {}
+        for index, name in enumerate(self.point_names):
+            self.point_index.setdefault(name, index)
+
+        self.output_precision: Optional[OutputPrecision] = None
+        sidecar_path = get_precision_sidecar_path(self.file_path)
+        if np.issubdtype(self.data.dtype, np.integer) and sidecar_path.exists():
+            self.output_precision = OutputPrecision(**json.loads(sidecar_path.read_text()))
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return self.data.shape
+
+    @property
+    def number_of_frames(self) -> int:
+        return self.data.shape[-3]
+
+    @property
+    def number_of_cameras(self) -> Optional[int]:
+        return self.data.shape[0] if self.has_cameras else None
+
+    def get_landmark_index(self, landmark_name: str) -> int:
+        if landmark_name not in self.point_index:
+            raise KeyError(f"{landmark_name} is not a point of {self.file_path.name}")
+        return self.point_index[landmark_name]
+
+    def get_group_slice(self, group_name: str) -> slice:
+        if group_name not in self.landmark_groups:
+            raise KeyError(
+                f"{group_name} is not a landmark group, available groups: {list(self.landmark_groups)}"
+            )
+        return slice(*self.landmark_groups[group_name])
+
+    def get_group_names(self, group_name: str) -> List[str]:
+        return self.point_names[self.get_group_slice(group_name)]
+
+    def get_points_key(
+        self, group: Optional[str], landmarks: Optional[Union[str, Sequence[str]]]
+    ) -> Union[int, slice, List[int]]:
+        if group is not None and landmarks is not None:
+            raise ValueError("Select either a landmark group or landmarks, not both")
+        if group is not None:
+            return self.get_group_slice(group)
+        if landmarks is None:
+            return slice(None)
+        if isinstance(landmarks, str):
+            return self.get_landmark_index(landmarks)
+        indices = [self.get_landmark_index(name) for name in landmarks]
+        if indices and np.all(np.diff(indices) == 1):
+            # consecutive landmarks are a slice, which keeps the selection a view
+            return slice(indices[0], indices[-1] + 1)
+        return indices
+
+    @staticmethod
+    def get_frames_key(frames: FrameSelection) -> Union[int, slice]:
+        if frames is None:
+            return slice(None)
+        if isinstance(frames, tuple):
+            return slice(*frames)
+        return frames
+
+    def select(
+        self,
+        cameras: CameraSelection = None,
+        frames: FrameSelection = None,
+        group: Optional[str] = None,
+        landmarks: Optional[Union[str, Sequence[str]]] = None,
+    ) -> np.ndarray:
+        """
+        Select part of the output, as a view of the memory map unless `landmarks` are not consecutive points.
+
+        :param cameras: Camera index or slice of cameras, must be None for data without a camera axis.
+        :param frames: Frame index, slice or (start, stop) range of frames.
+        :param group: Name of a landmark group of the model info, e.g. "body", "left_hand" or "face".
+        :param landmarks: A point name, which drops the points axis, or a list of point names.
+        :return: The selection, in the stored dtype. Use `decode` to convert fixed point data to floats.
+        """
+        key: Tuple[Union[int, slice, List[int]], ...] = (
+            self.get_frames_key(frames),
+            self.get_points_key(group, landmarks),
+        )
+        if self.has_cameras:
+            key = (slice(None) if cameras is None else cameras,) + key
+        elif cameras is not None:
+            raise ValueError(f"{self.file_path.name} has no camera axis to select cameras from")
+        return self.data[key]
+
+    def get_group(self, group_name: str, **selection) -> np.ndarray:
+        """
+        View of one landmark group, e.g. `reader.get_group("body", frames=(1000, 2000))`.
+        """
+        return self.select(group=group_name, **selection)
+
+    def get_landmark(self, landmark_name: str, **selection) -> np.ndarray:
+        """
+        View of one landmark, with the points axis dropped.
+        """
+        return self.select(landmarks=landmark_name, **selection)
+
+    def decode(self, array: np.ndarray) -> np.ndarray:
+        """
+        Convert a selection of fixed point data to floats with NaN for missing points, float data is returned as is.
+        """
+        if self.output_precision is None:
+            return array
+        return self.output_precision.decode(array)